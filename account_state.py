@@ -0,0 +1,171 @@
+import time
+import logging
+import threading
+from collections import namedtuple
+from metrics import METRICS
+
+# ==========================================
+#        ACCOUNT STATE CACHE
+# ==========================================
+# Balance + open positions are refreshed on a background thread and published as
+# one immutable AccountSnapshot. Last prices are pushed in by whoever already has
+# them (the candle feed). Our own fills update the snapshot straight away and
+# trigger an early refresh, so the signal -> order path never waits on a read.
+
+ACCOUNT_REFRESH = 30      # Seconds between background balance/position refreshes
+PRICE_MAX_AGE = 60        # Older noted prices fall back to fetch_ticker
+REFRESH_WAIT = 10         # Seconds a read of a stale snapshot waits for the background refresh
+
+AccountSnapshot = namedtuple('AccountSnapshot', ['balance', 'positions', 'updated_at'])
+
+def parse_usdt_balance(balance_data):
+    """Free USDT from a ccxt fetch_balance() result (unified field first, raw Binance assets second)."""
+    if 'USDT' in balance_data:
+        return float(balance_data['USDT']['free'])
+    elif 'info' in balance_data and 'assets' in balance_data['info']:
+        for asset in balance_data['info']['assets']:
+            if asset['asset'] == 'USDT':
+                return float(asset['availableBalance'])
+    return 0.0
+
+def market_symbol(symbol):
+    """'BTC/USDT:USDT' (ccxt's swap symbol) -> 'BTC/USDT' (what the swarm trades)."""
+    return symbol.split(':')[0]
+
+def parse_positions(positions):
+    """{symbol: contracts} for every position with contracts > 0."""
+    open_positions = {}
+    for pos in positions:
+        contracts = float(pos.get('contracts') or 0)
+        if contracts > 0:
+            open_positions[market_symbol(pos['symbol'])] = contracts
+    return open_positions
+
+class AccountState(threading.Thread):
+    """
+    Cached balance, positions and last prices for the trading path.
+
+    Reads never block while the snapshot is fresh. A snapshot older than
+    `stale_after` (startup, or the background refresh failing) wakes the thread
+    and waits for its refresh; the exchange instance is only ever used by one
+    thread at a time. Without a running thread it is refreshed inline.
+    """
+
+    def __init__(self, exchange, interval=ACCOUNT_REFRESH, stale_after=None):
+        super().__init__(name="account", daemon=True)
+        self.exchange = exchange
+        self.interval = interval
+        self.stale_after = stale_after or 3 * interval
+        self._snapshot = AccountSnapshot(0.0, {}, 0.0)
+        self._prices = {}             # symbol -> (price, noted_at)
+        self._lock = threading.Lock() # Serializes refreshes and fill updates
+        self._wake = threading.Event()
+        self._rest = threading.Lock() # The exchange instance is not thread-safe
+        self._refreshed = threading.Condition()
+        self._refreshes = 0           # Background refresh attempts, for readers waiting on one
+        self._fills = 0               # Bumped by on_fill; a refresh that raced a fill is dropped
+        self._stopped = False
+        self.rest_calls = 0
+        self.log = logging.getLogger()
+
+    def snapshot(self):
+        return self._snapshot
+
+    # --- Refresh ---
+    def refresh(self):
+        """One balance + positions round-trip; publishes a new snapshot."""
+        fills = self._fills
+        with self._rest, METRICS.time('account_refresh'):
+            balance_data = self.exchange.fetch_balance()
+            positions = self.exchange.fetch_positions()
+        self.rest_calls += 2
+        with self._lock:
+            # A fill landed mid-request: these numbers may predate it, the woken thread refetches
+            if fills == self._fills:
+                self._snapshot = AccountSnapshot(parse_usdt_balance(balance_data), parse_positions(positions), time.time())
+        return self._snapshot
+
+    def _fresh_snapshot(self):
+        snap = self._snapshot
+        if time.time() - snap.updated_at <= self.stale_after:
+            return snap
+        if not self.is_alive():
+            return self.refresh()
+        with self._refreshed:
+            seen = self._refreshes
+            self._wake.set()
+            self._refreshed.wait_for(lambda: self._refreshes > seen, REFRESH_WAIT)
+        snap = self._snapshot
+        age = time.time() - snap.updated_at
+        if age > self.stale_after:
+            raise RuntimeError(f"account snapshot is {age:.0f}s old and the background refresh has not caught up")
+        return snap
+
+    # --- Reads ---
+    def balance(self):
+        try:
+            return self._fresh_snapshot().balance
+        except Exception as e:
+            self.log.error(f"Balance Check Error: {e}")
+            return 0.0
+
+    def has_position(self, symbol):
+        try:
+            return symbol in self._fresh_snapshot().positions
+        except Exception as e:
+            self.log.error(f"Position Check Error: {e}")
+            return True
+
+    def note_price(self, symbol, price):
+        self._prices[symbol] = (float(price), time.time())
+
+    def last_price(self, symbol):
+        price, noted_at = self._prices.get(symbol, (None, 0.0))
+        if time.time() - noted_at > PRICE_MAX_AGE:
+            with self._rest, METRICS.time('ticker'):
+                price = self.exchange.fetch_ticker(symbol)['last']
+            self.rest_calls += 1
+            self.note_price(symbol, price)
+        return price
+
+    # --- Our own orders ---
+    def on_fill(self, symbol, side, amount, price):
+        """
+        Applies a fill to the snapshot right away (position size, and the full notional
+        as cash spent, which is conservative under leverage), then wakes the background
+        thread to fetch the exchange's real numbers.
+        """
+        with self._lock:
+            self._fills += 1
+            snap = self._snapshot
+            positions = dict(snap.positions)
+            contracts = positions.get(symbol, 0.0) + (amount if side == 'buy' else -amount)
+            if contracts > 0:
+                positions[symbol] = contracts
+            else:
+                positions.pop(symbol, None)
+            cash = snap.balance - amount * price if side == 'buy' else snap.balance + amount * price
+            self._snapshot = AccountSnapshot(max(cash, 0.0), positions, snap.updated_at)
+        self._wake.set()
+
+    def request_refresh(self):
+        """Wakes the background thread for an early refresh (e.g. an order we could not confirm)."""
+        self._wake.set()
+
+    # --- Background thread ---
+    def run(self):
+        while not self._stopped:
+            self._wake.clear()      # Before the refresh: a wake-up during it gets another one
+            try:
+                self.refresh()
+            except Exception as e:
+                METRICS.inc('account_errors')
+                self.log.error(f"[Account] Refresh Error: {e}")
+            with self._refreshed:
+                self._refreshes += 1
+                self._refreshed.notify_all()
+            self._wake.wait(self.interval)
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
@@ -0,0 +1,586 @@
+import time
+import os
+import sys
+import json
+import gc
+import argparse
+import platform
+import asyncio
+import tempfile
+import subprocess
+import numpy as np
+from train_risk_agent import TradingEnv, LaneVecEnv, DATA_FILE, build_feature_matrix
+from candle_buffer import CandleBuffer
+from market_data import save_columnar, columnar_path, load_candles, data_exists, index_to_ms
+from vector_backtest import backtest_frame
+from risk_policy import NumpyPolicy, RISK_POLICY_PATH, random_observations
+from universe_scanner import UniverseScanner
+from account_state import AccountState
+from order_executor import OrderExecutor
+from metrics import MetricsRegistry
+import sentinel_agent
+from sentinel_agent import HeadlineCache, get_news_posts, analyze_headlines
+from timeframes import ROLLUP_TIMEFRAMES, timeframe_ms, rollup_arrays, update_rollups
+from replay import replay_candles
+from mock_exchange import MockExchange, load_test, print_load_report
+from stand_ins import (
+    SYNTHETIC_ROWS, make_synthetic_candles, to_frame, candle_rows, legacy_observation, legacy_pct_change,
+    UniverseReplayExchange, universe_rows, run_feed, StandInNews, StandInLLM, InFlight, stand_in_sentinel,
+)
+import main_swarm
+
+# Timings only: the parity checks behind these numbers are the test_*.py modules (python -m pytest).
+
+# --- CONFIGURATION ---
+BENCH_STEPS = 20_000
+BENCH_LANES = 256
+RESULTS_FILE = 'bench_results.json'
+REGRESSION_THRESHOLD = 0.20     # A metric more than 20% worse than the baseline is a regression
+THRESHOLDS = {                  # Noisier metrics get more slack: single-digit-us timings swing +-30% between runs
+    'env_reset_us': 0.50,
+    'sniper_check_us': 0.50,
+    'policy_single_us': 0.50,
+    'live_observation_us': 0.50,
+    'feature_update_us': 0.50,
+    'columnar_load_ms': 0.50,
+    'csv_load_ms': 0.30,
+    'fvg_backtrader_bars_per_sec': 0.30,
+}
+
+def load_bench_candles():
+    if data_exists(DATA_FILE):
+        print(f"Using {DATA_FILE}")
+        df = load_candles(DATA_FILE)
+        return df.reset_index(drop=True).assign(timestamp=index_to_ms(df.index))
+    print(f"{DATA_FILE} not found, using {SYNTHETIC_ROWS} synthetic candles")
+    return make_synthetic_candles()
+
+# ==========================================
+#        BENCHMARKS
+# ==========================================
+def bench_legacy_steps(df, n_steps):
+    start = time.perf_counter()
+    step = 100
+    for _ in range(n_steps):
+        step += 1
+        legacy_pct_change(df, step)
+        legacy_observation(df, step)
+    return n_steps / (time.perf_counter() - start)
+
+def bench_env_steps(env, n_steps):
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 4, n_steps)
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _, _ = env.step(int(action))
+        if done:
+            env.reset()
+    return n_steps / (time.perf_counter() - start)
+
+def bench_streaming_features(df):
+    """Risk observation on the live window: DataFrame rolling vs the streaming features."""
+    rows = candle_rows(df.iloc[-main_swarm.CANDLE_HISTORY:])
+    candles = CandleBuffer(main_swarm.CANDLE_HISTORY)
+    candles.update(rows)
+    frame = to_frame(df.iloc[-main_swarm.CANDLE_HISTORY:])
+    window_us = per_call(lambda: legacy_live_observation(frame), 200) * 1e6
+    stream_us = per_call(candles.features.observation, 20_000) * 1e6
+    update_us = per_call(lambda: candles.features.update(rows[-1]), 20_000) * 1e6
+    print(f"Risk observation: DataFrame rolling {window_us:.1f} us | streaming {stream_us:.1f} us "
+          f"(+{update_us:.1f} us per candle update)")
+
+def legacy_live_observation(df):
+    """The original run_swarm feature code, kept as the timing reference (its SMA includes the current bar)."""
+    df = df.copy()
+    df['sma_20'] = df['close'].rolling(window=20).mean()
+    current = df.iloc[-1]
+    prev = df.iloc[-2]
+    return np.array([
+        current['close'] / current['sma_20'],
+        np.log(current['volume'] + 1) / 10.0,
+        (current['close'] - prev['close']) / prev['close'] * 100,
+        (current['high'] - current['low']) / current['close'] * 100,
+    ], dtype=np.float32)
+
+def bench_timeframe_rollups(df):
+    """4h over the dataset (vs pandas resample), the dataset cache (full vs incremental) and the live update."""
+    rows = candle_rows(df)
+    ts = df['timestamp'].to_numpy(dtype=np.int64)
+    columns = [df[col].to_numpy() for col in ['open', 'high', 'low', 'close', 'volume']]
+    agg = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'candles.csv')
+        frame = to_frame(df)
+        cut = len(frame) - 500
+        start = time.perf_counter()
+        update_rollups(frame.iloc[:cut], csv_path)
+        full_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        update_rollups(frame, csv_path, since=int(ts[cut - 1]))          # The last stored candle is re-fetched
+        incremental_ms = (time.perf_counter() - start) * 1000
+
+    resample_ms = per_call(lambda: to_frame(df).resample('4h').agg(agg), 3) * 1000
+    rollup_ms = per_call(lambda: rollup_arrays(ts, *columns, timeframe_ms('4h')), 3) * 1000
+    base = CandleBuffer(main_swarm.CANDLE_HISTORY)
+    rolled = CandleBuffer(main_swarm.CANDLE_HISTORY, timeframes=ROLLUP_TIMEFRAMES)
+    base.update(rows[:2])
+    rolled.update(rows[:2])
+    base_us = per_call(lambda: base.update([rows[1]]), 20_000) * 1e6
+    rolled_us = per_call(lambda: rolled.update([rows[1]]), 20_000) * 1e6
+    print(f"Rollups: 4h over the dataset {rollup_ms:.1f} ms (pandas resample {resample_ms:.1f} ms) | "
+          f"cache full {full_ms:.0f} ms, incremental {incremental_ms:.0f} ms | live update "
+          f"{base_us:.1f} -> {rolled_us:.1f} us per candle")
+
+def bench_lane_steps(df, n_lanes, n_steps):
+    lane_env = LaneVecEnv(df, n_lanes, episode_length=2000)
+    actions = np.random.default_rng(0).integers(0, 4, (n_steps, n_lanes))
+    lane_env.reset()
+    start = time.perf_counter()
+    for t in range(n_steps):
+        lane_env.step(actions[t])
+    return n_steps * n_lanes / (time.perf_counter() - start)
+
+def bench_stream_feed(df, n_candles=200):
+    """Candle close -> decision latency through the stand-in kline stream."""
+    closes, _, latencies = asyncio.run(run_feed(candle_rows(df.iloc[:100 + n_candles])))
+    print(f"Stream: {len(closes)} candle closes, close->decision p50 "
+          f"{np.percentile(latencies, 50):.2f} ms / max {max(latencies):.2f} ms")
+
+# Runs in a fresh interpreter so load time and memory are not polluted by this process
+_LOAD_PROBE = """
+import sys, time, json
+import numpy as np
+from market_data import load_candles
+start = time.perf_counter()
+df = load_candles(sys.argv[1])
+total = float(sum(np.asarray(df[c]).sum() for c in ['open', 'high', 'low', 'close', 'volume']))
+elapsed = time.perf_counter() - start
+mem = {}
+try:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('RssAnon', 'RssFile')):
+                mem[line.split(':')[0]] = int(line.split()[1]) / 1024
+except OSError:
+    pass
+print(json.dumps({'seconds': elapsed, 'rows': len(df), 'mem': mem}))
+"""
+
+def _probe_load(csv_path):
+    out = subprocess.run(
+        [sys.executable, '-c', _LOAD_PROBE, csv_path], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def bench_data_loading(df):
+    """CSV parse vs memory-mapped columnar store: load time and private (anon) vs shared (file) RSS."""
+    frame = to_frame(df)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'candles.csv')
+        frame.to_csv(csv_path)
+        csv_result = _probe_load(csv_path)
+        save_columnar(frame, columnar_path(csv_path))
+        cols_result = _probe_load(csv_path)
+
+    print(f"--- Dataset load ({csv_result['rows']:,} rows, fresh process) ---")
+    for name, result in [("CSV (pd.read_csv)", csv_result), ("Columnar (mmap)", cols_result)]:
+        mem = result['mem']
+        mem_txt = f" | private {mem['RssAnon']:.0f} MB, shared-file {mem['RssFile']:.0f} MB" if mem else ""
+        print(f"{name:<18} {result['seconds'] * 1000:>8.1f} ms{mem_txt}")
+
+def bench_vector_backtest(n_bars=20_000):
+    """backtrader's FVGStrategy vs the NumPy engine on the same volatile candles."""
+    frame = to_frame(make_synthetic_candles(n_bars, seed=2, volatility=0.01))
+    bt_rate = bench_backtrader(frame)
+    start = time.perf_counter()
+    result = backtest_frame(frame)
+    np_seconds = time.perf_counter() - start
+    bt_seconds = n_bars / bt_rate
+    print(f"--- FVG backtest ({n_bars:,} bars, {len(result.trades)} trades) ---")
+    print(f"backtrader: {bt_seconds * 1000:>9.1f} ms | NumPy: {np_seconds * 1000:>7.1f} ms | "
+          f"{bt_seconds / np_seconds:.0f}x faster")
+
+# ==========================================
+#        UNIVERSE SCANNING
+# ==========================================
+def bench_universe_cycle(sizes=(1, 8, 32, 64), latency=0.03, n_cycles=3):
+    """One polling cycle (fetch + Sniper + Risk Brain) per universe size: one-by-one vs concurrent + batched."""
+    policy = NumpyPolicy(RISK_POLICY_PATH) if os.path.exists(RISK_POLICY_PATH) else None
+    print(f"--- Universe cycle ({latency * 1000:.0f} ms per request) ---")
+    for n_symbols in sizes:
+        rows = universe_rows(n_symbols)
+        exchange = UniverseReplayExchange(rows, latency)
+
+        buffers = {symbol: CandleBuffer(1000) for symbol in rows}
+        start = time.perf_counter()
+        for _ in range(n_cycles):
+            for symbol, candles in buffers.items():
+                candles.sync(exchange, symbol, '15m')
+                signal, _ = main_swarm.sniper_check(candles)
+                if signal == "BUY" and policy is not None:
+                    policy.predict(main_swarm.build_risk_observation(candles))
+        sequential = (time.perf_counter() - start) / n_cycles
+
+        scanner = UniverseScanner(lambda: exchange, rows, '15m')
+        start = time.perf_counter()
+        for _ in range(n_cycles):
+            scanner.update()
+            candidates = scanner.scan()
+            if candidates and policy is not None:
+                policy.predict(np.stack([obs for _, _, obs in candidates]))
+        batched = (time.perf_counter() - start) / n_cycles
+        scanner.close()
+        print(f"{n_symbols:>3} symbols | one-by-one {sequential * 1000:>8.1f} ms | "
+              f"universe {batched * 1000:>7.1f} ms")
+
+# ==========================================
+#        ORDER PATH (ACCOUNT CACHE)
+# ==========================================
+class AccountReplayExchange:
+    """Stand-in for the signed account endpoints: fixed latency, counts every request."""
+
+    def __init__(self, latency=0.05, balance=1000.0, price=30000.0):
+        self.latency = latency
+        self.balance = balance
+        self.price = price
+        self.contracts = 0.0
+        self.calls = 0
+
+    def _request(self):
+        self.calls += 1
+        time.sleep(self.latency)
+
+    def fetch_balance(self):
+        self._request()
+        return {'USDT': {'free': self.balance}}
+
+    def fetch_positions(self, symbols=None):
+        self._request()
+        return [{'symbol': 'BTC/USDT:USDT', 'contracts': self.contracts}]
+
+    def fetch_ticker(self, symbol):
+        self._request()
+        return {'last': self.price}
+
+    def create_order(self, symbol, type, side, amount):
+        self._request()
+        self.contracts += amount
+        self.balance -= amount * self.price
+        return {'id': str(self.calls), 'filled': amount, 'average': self.price}
+
+def bench_order_path(latency=0.05, n_orders=5):
+    """
+    How long execute_trade holds up the decision loop, and requests per order: direct
+    REST reads, the account cache, and the executor's pre-sized fire-and-forget orders.
+    """
+    results = {}
+    for mode in ('direct', 'cached', 'executor'):
+        exchange = AccountReplayExchange(latency)
+        main_swarm.exchange = exchange
+        main_swarm.account = main_swarm.executor = None
+        if mode != 'direct':
+            main_swarm.account = AccountState(exchange)
+        if mode == 'executor':
+            main_swarm.executor = OrderExecutor(exchange, main_swarm.account).start()
+        seconds = []
+        for _ in range(n_orders):
+            exchange.contracts = 0.0          # Flat again, so every signal trades
+            if main_swarm.account is not None:
+                main_swarm.account.refresh()      # Background refresh + candle feed, outside the timed path
+                main_swarm.account.note_price('BTC/USDT', exchange.price)
+            if main_swarm.executor is not None:
+                main_swarm.executor.prepare('BTC/USDT')
+            calls = exchange.calls
+            start = time.perf_counter()
+            main_swarm.execute_trade("1.0%")
+            seconds.append(time.perf_counter() - start)
+            while main_swarm.executor is not None and main_swarm.executor.busy:
+                time.sleep(0.001)
+            if exchange.contracts <= 0:
+                raise AssertionError(f"{mode}: execute_trade did not place the order")
+        results[mode] = (np.median(seconds), exchange.calls - calls)
+    to_send = np.median([lat.to_send for lat in main_swarm.executor.latencies])
+    main_swarm.executor.stop()
+    main_swarm.exchange = main_swarm.account = main_swarm.executor = None
+
+    print(f"--- Signal -> order ({latency * 1000:.0f} ms per request) ---")
+    for mode, (seconds, calls) in results.items():
+        print(f"{mode:<8} {seconds * 1000:>8.3f} ms loop blocked | {calls} requests per order")
+    print(f"executor: signal -> order sent {to_send * 1e6:.0f} us, then one {latency * 1000:.0f} ms round-trip")
+
+# ==========================================
+#        METRICS
+# ==========================================
+def bench_metrics(n=200_000):
+    """Per-record cost of a stage timer."""
+    registry = MetricsRegistry()
+    start = time.perf_counter()
+    for _ in range(n):
+        with registry.time('noop'):
+            pass
+    per_record = (time.perf_counter() - start) / n
+    print(f"Metrics: stage timer costs {per_record * 1e6:.2f} us per record")
+    print("\n".join(registry.summary()))
+
+# ==========================================
+#        SENTINEL
+# ==========================================
+def bench_sentinel(lookback=12 * 3600):
+    """News pages fetched side by side, then LLM scoring one headline per request vs batched (stand-in servers)."""
+    with stand_in_sentinel() as now:
+        start = time.perf_counter()
+        posts = get_news_posts(lookback, max_pages=StandInNews.pages, now=now)
+        fetch_seconds = time.perf_counter() - start
+        print(f"Sentinel: {len(posts)} headlines from {len(StandInNews.requested)} page requests "
+              f"({StandInNews.in_flight.peak} at once) in {fetch_seconds * 1000:.0f} ms")
+        for name, batch_size, concurrency in (('per-headline', 1, 1), ('batched', sentinel_agent.LLM_BATCH_SIZE,
+                                                                        sentinel_agent.LLM_CONCURRENCY)):
+            StandInLLM.in_flight = InFlight()
+            start = time.perf_counter()
+            analyze_headlines(posts, HeadlineCache(path=None), now, batch_size, concurrency)
+            print(f"LLM scoring {name:<12} {StandInLLM.in_flight.total:>3} requests | "
+                  f"{time.perf_counter() - start:.2f}s")
+
+# ==========================================
+#        RECORD + REPLAY
+# ==========================================
+def bench_replay(n_bars=20_000):
+    frame = to_frame(make_synthetic_candles(n_bars, seed=8, volatility=0.006))
+    start = time.perf_counter()
+    replay, _ = replay_candles(frame)
+    elapsed = time.perf_counter() - start
+    print(f"Replay: {n_bars:,} bars ({len(replay.decisions)} decisions) | "
+          f"{n_bars / elapsed:,.0f} decision passes/sec")
+
+# ==========================================
+#        MOCK EXCHANGE
+# ==========================================
+def bench_mock_load(clients=8, seconds=3.0):
+    """Throughput and tail latency of the swarm's request mix: clean, then with injected latency + 503s."""
+    mock = MockExchange(to_frame(make_synthetic_candles(5000, seed=12)), speed=900, balance=10 ** 7,
+                        weight_per_minute=10 ** 9, seed=1)       # Throughput, not the 429 path (test_mock_exchange)
+    url = mock.serve(0)
+    print_load_report(load_test(url, clients, seconds), f"Mock exchange, {clients} clients, no injection")
+    mock.latency, mock.jitter, mock.error_rate = 0.02, 0.01, 0.05
+    print_load_report(load_test(url, clients, seconds),
+                      f"Mock exchange, {clients} clients, 20 ms + exp(10 ms) latency, 5% 503s")
+    mock.shutdown()
+
+# ==========================================
+#        BENCHMARK SUITE (JSON + REGRESSIONS)
+# ==========================================
+# Tracked numbers only (no parity checks), so two commits can be compared:
+#   python benchmarks.py --suite --out before.json
+#   (change / checkout)
+#   python benchmarks.py --suite --out after.json --baseline before.json
+#   python benchmarks.py --compare before.json after.json
+
+def per_call(fn, number, repeat=7):
+    """
+    Best seconds per call over `repeat` batches of `number` calls (like timeit:
+    GC off, and the minimum is the run least disturbed by the rest of the machine).
+    """
+    times = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    if gc_was_enabled:
+        gc.enable()
+    return min(times)
+
+def git_revision():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        return rev + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(df, quick=False):
+    """{metric: {'value', 'unit', 'better'}} for the project's hot paths (GC off while measuring)."""
+    gc.collect()
+    gc.disable()
+    try:
+        return _suite_results(df, quick)
+    finally:
+        gc.enable()
+
+def _suite_results(df, quick):
+    scale = 0.1 if quick else 1.0
+    n = lambda count: max(1, int(count * scale))
+    results = {}
+
+    def add(name, value, unit, better):
+        results[name] = {'value': float(value), 'unit': unit, 'better': better}
+        print(f"{name:<30} {value:>14,.{3 if value < 100 else 0}f} {unit}")
+
+    print(f"--- Benchmark suite ({len(df):,} candles{', quick' if quick else ''}) ---")
+    # Training env
+    env = TradingEnv(df)
+    add('env_step_per_sec', max([bench_env_steps(env, n(BENCH_STEPS * 5)) for _ in range(3)]), 'steps/s', 'higher')
+    add('env_reset_us', per_call(env.reset, n(20_000)) * 1e6, 'us', 'lower')
+    add('lane_env_step_per_sec', max([bench_lane_steps(df, BENCH_LANES, n(BENCH_STEPS // 10)) for _ in range(3)]),
+        'steps/s', 'higher')
+    add('feature_matrix_rows_per_sec', len(df) / per_call(lambda: build_feature_matrix(df), 1), 'rows/s', 'higher')
+
+    # Live decision path on the live-sized window
+    candles = CandleBuffer(main_swarm.CANDLE_HISTORY)
+    candles.update(candle_rows(df.iloc[-main_swarm.CANDLE_HISTORY:]))
+    add('live_observation_us', per_call(lambda: main_swarm.build_risk_observation(candles), n(50_000)) * 1e6,
+        'us', 'lower')
+    last_row = candle_rows(df.iloc[-1:])[0]
+    add('feature_update_us', per_call(lambda: candles.features.update(last_row), n(50_000)) * 1e6, 'us', 'lower')
+    add('sniper_check_us', per_call(lambda: main_swarm.sniper_check(candles), n(50_000)) * 1e6, 'us', 'lower')
+
+    # Risk policy inference
+    if os.path.exists(RISK_POLICY_PATH):
+        policy = NumpyPolicy(RISK_POLICY_PATH)
+        obs = random_observations(256)[:256]
+        add('policy_single_us', per_call(lambda: policy.predict(obs[0]), n(20_000)) * 1e6, 'us', 'lower')
+        add('policy_batch256_us', per_call(lambda: policy.predict(obs), n(2_000)) * 1e6, 'us', 'lower')
+    else:
+        print(f"(no {RISK_POLICY_PATH}: policy inference skipped)")
+
+    # FVG backtests: the NumPy engine on the whole set, backtrader's FVGStrategy on a slice
+    frame = to_frame(df)
+    add('fvg_vector_bars_per_sec', len(frame) / per_call(lambda: backtest_frame(frame), 1), 'bars/s', 'higher')
+    add('fvg_backtrader_bars_per_sec', bench_backtrader(frame.iloc[:n(10_000)]), 'bars/s', 'higher')
+
+    # Dataset load, fresh process
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'candles.csv')
+        frame.to_csv(csv_path)
+        add('csv_load_ms', _probe_load(csv_path)['seconds'] * 1000, 'ms', 'lower')
+        save_columnar(frame, columnar_path(csv_path))
+        add('columnar_load_ms', _probe_load(csv_path)['seconds'] * 1000, 'ms', 'lower')
+    return results
+
+def bench_backtrader(frame):
+    import backtrader as bt
+    from sniper_backtest import FVGStrategy
+
+    class QuietFVGStrategy(FVGStrategy):
+        def log(self, txt, dt=None):
+            pass
+
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(QuietFVGStrategy)
+    cerebro.adddata(bt.feeds.PandasData(dataname=frame, openinterest=None,
+                                        timeframe=bt.TimeFrame.Minutes, compression=15))
+    cerebro.broker.setcash(10000)
+    start = time.perf_counter()
+    cerebro.run()
+    return len(frame) / (time.perf_counter() - start)
+
+def save_results(results, path, data_label):
+    report = {
+        'meta': {
+            'commit': git_revision(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+            'data': data_label,
+        },
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to: {path}")
+    return report
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Prints old vs new per metric. A metric regresses when it is worse than the
+    baseline by more than its threshold (THRESHOLDS, else `threshold`).
+    Returns the list of regressed metric names.
+    """
+    old, new = baseline['results'], current['results']
+    print(f"--- {baseline['meta'].get('commit')} -> {current['meta'].get('commit')} ---")
+    if baseline['meta'].get('data') != current['meta'].get('data'):
+        print(f"⚠️ Different data: {baseline['meta'].get('data')} vs {current['meta'].get('data')}")
+    regressions = []
+    for name in sorted(set(old) | set(new)):
+        if name not in old or name not in new:
+            print(f"{name:<30} {'only in ' + ('new' if name in new else 'baseline'):>40}")
+            continue
+        before, after = old[name]['value'], new[name]['value']
+        change = (after - before) / before if before else 0.0
+        worse = -change if new[name]['better'] == 'higher' else change
+        limit = THRESHOLDS.get(name, threshold)
+        status = "❌ REGRESSION" if worse > limit else ("🚀" if worse < -limit else "")
+        if worse > limit:
+            regressions.append(name)
+        print(f"{name:<30} {before:>14,.3f} -> {after:>14,.3f} {new[name]['unit']:<8} {change:>+7.1%} {status}")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+    else:
+        print("✅ No regressions")
+    return regressions
+
+def run_benchmarks():
+    df = load_bench_candles()
+    env = TradingEnv(df)
+
+    legacy_n = min(BENCH_STEPS, env.MAX_STEPS - 101) // 10
+    legacy_sps = bench_legacy_steps(df, legacy_n)
+    new_sps = bench_env_steps(env, BENCH_STEPS)
+
+    print("--- TradingEnv.step throughput ---")
+    print(f"Before (.iloc per step):  {legacy_sps:>12,.0f} steps/sec")
+    print(f"After  (feature matrix):  {new_sps:>12,.0f} steps/sec")
+    print(f"Speedup: {new_sps / legacy_sps:.1f}x")
+
+    lane_sps = bench_lane_steps(df, BENCH_LANES, BENCH_STEPS // 10)
+    print(f"LaneVecEnv ({BENCH_LANES} lanes): {lane_sps:>12,.0f} steps/sec")
+
+    bench_streaming_features(df)
+    bench_timeframe_rollups(df)
+    bench_stream_feed(df)
+    bench_data_loading(df)
+    bench_vector_backtest()
+    bench_universe_cycle()
+    bench_order_path()
+    bench_metrics()
+    bench_sentinel()
+    bench_replay()
+    bench_mock_load()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks for the swarm's hot paths (parity checks: python -m pytest).")
+    parser.add_argument('--suite', action='store_true', help="Only the tracked benchmark suite (saved as JSON)")
+    parser.add_argument('--quick', action='store_true', help="Suite with 10%% of the iterations")
+    parser.add_argument('--out', default=RESULTS_FILE, help="Where --suite writes its results")
+    parser.add_argument('--baseline', default=None, help="Results JSON to compare the --suite run against")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help="Compare two results files")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown that counts as a regression (default 0.20)")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.compare:
+        regressions = compare_results(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        sys.exit(1 if regressions else 0)
+    elif args.suite:
+        df = load_bench_candles()
+        data_label = DATA_FILE if data_exists(DATA_FILE) else f"synthetic {len(df)} rows"
+        report = save_results(run_suite(df, args.quick), args.out, data_label)
+        if args.baseline:
+            sys.exit(1 if compare_results(load_results(args.baseline), report, args.threshold) else 0)
+    else:
+        run_benchmarks()
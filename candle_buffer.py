@@ -0,0 +1,171 @@
+import numpy as np
+from indicators import StreamingFeatures
+from timeframes import ROLLUP_TIMEFRAMES, timeframe_ms
+
+# Column layout of every candle row (same order as ccxt fetch_ohlcv, minus the timestamp)
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+class CandleBuffer:
+    """
+    Fixed-capacity, array-backed ring buffer of OHLCV candles for the live loop.
+
+    Every candle is written twice (slot i and slot i + capacity), so the latest
+    N candles are ALWAYS one contiguous slice. Reads like `buffer.close[-20:]`
+    are NumPy views: no copies, no DataFrames.
+    `features` (StreamingFeatures) follows every accepted row, so the Risk Brain's
+    observation is ready without touching the window. With `timeframes`, `rollup`
+    (TimeframeRollup) does the same for higher-timeframe candles: buffer.rollup['4h'].
+    """
+
+    def __init__(self, capacity=1000, features=True, timeframes=()):
+        self.capacity = capacity
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._data = np.zeros((2 * capacity, 5), dtype=np.float64)
+        self._head = 0      # Slot the next NEW candle goes into (0..capacity-1)
+        self._count = 0
+        self.features = StreamingFeatures() if features else None
+        self.rollup = TimeframeRollup(timeframes, capacity) if timeframes else None
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def empty(self):
+        return self._count == 0
+
+    @property
+    def last_timestamp(self):
+        return int(self._ts[self._end - 1]) if self._count else None
+
+    # --- Window views (oldest -> newest, last row is the still-forming candle) ---
+    @property
+    def _end(self):
+        return self._head + self.capacity if self._head < self._count else self._head
+
+    def _window(self):
+        return slice(self._end - self._count, self._end)
+
+    @property
+    def timestamp(self):
+        return self._ts[self._window()]
+
+    @property
+    def ohlcv(self):
+        return self._data[self._window()]
+
+    @property
+    def open(self):
+        return self._data[self._window(), OPEN]
+
+    @property
+    def high(self):
+        return self._data[self._window(), HIGH]
+
+    @property
+    def low(self):
+        return self._data[self._window(), LOW]
+
+    @property
+    def close(self):
+        return self._data[self._window(), CLOSE]
+
+    @property
+    def volume(self):
+        return self._data[self._window(), VOLUME]
+
+    # --- Writes ---
+    def _write(self, slot, candle):
+        self._ts[slot] = self._ts[slot + self.capacity] = candle[0]
+        self._data[slot] = self._data[slot + self.capacity] = candle[1:6]
+
+    def update(self, candles):
+        """
+        Merges ccxt-style [timestamp, o, h, l, c, v] rows.
+        A row with the last stored timestamp overwrites the forming candle in place,
+        newer rows are appended (evicting the oldest), older rows are ignored.
+        Returns the number of NEW candles appended.
+        """
+        appended = 0
+        for candle in candles:
+            ts = candle[0]
+            last_ts = self.last_timestamp
+            if last_ts is not None and ts < last_ts:
+                continue
+            if self.features is not None:
+                self.features.update(candle)
+            if self.rollup is not None:
+                self.rollup.update(candle)
+            if last_ts is not None and ts == last_ts:
+                self._write((self._head - 1) % self.capacity, candle)
+                continue
+            self._write(self._head, candle)
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            appended += 1
+        return appended
+
+    def sync(self, exchange, symbol, timeframe):
+        """
+        Seeds the buffer with `capacity` candles on the first call; afterwards only
+        fetches candles since the last stored one (the forming candle + any new ones).
+        """
+        if self.empty:
+            return self.update(exchange.fetch_ohlcv(symbol, timeframe, limit=self.capacity))
+        return self.update(self.fetch_new(exchange, symbol, timeframe))
+
+    def fetch_new(self, exchange, symbol, timeframe):
+        """Rows from the last stored candle onwards (the forming candle + any new ones), not applied yet."""
+        rows, since = [], self.last_timestamp
+        while True:
+            batch = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=self.capacity)
+            rows += batch
+            # A full page means we were offline for a while: keep paging forward
+            if len(batch) < self.capacity or batch[-1][0] <= batch[0][0]:
+                return rows
+            since = batch[-1][0]
+
+class TimeframeRollup:
+    """
+    Higher-timeframe candles rolled up from a base candle stream (same row rules as
+    CandleBuffer.update). A base candle is folded into its bucket once, when it closes;
+    the forming one is merged on top, so each update only rewrites the open bucket.
+    rollup['4h'] is a CandleBuffer whose last row is the open (partial) bucket.
+    """
+
+    def __init__(self, timeframes=ROLLUP_TIMEFRAMES, capacity=1000):
+        self.frames = {tf: CandleBuffer(capacity, features=False) for tf in timeframes}
+        self._ms = {tf: timeframe_ms(tf) for tf in timeframes}
+        self._closed = dict.fromkeys(timeframes)   # tf -> [bucket, o, h, l, c, v] of the closed candles in the open bucket
+        self._bar = None                            # Current base candle (forming)
+
+    def __getitem__(self, timeframe):
+        return self.frames[timeframe]
+
+    def update(self, candle):
+        ts = int(candle[0])
+        if self._bar is not None:
+            if ts < self._bar[0]:
+                return
+            if ts > self._bar[0]:
+                self._fold(self._bar)
+        bar = self._bar = (ts, *map(float, candle[1:6]))
+        for tf, frame in self.frames.items():
+            bucket = ts - ts % self._ms[tf]
+            closed = self._closed[tf]
+            if closed is None or closed[0] != bucket:
+                frame.update([(bucket, *bar[1:])])
+            else:
+                frame.update([(bucket, closed[1], max(closed[2], bar[2]), min(closed[3], bar[3]),
+                               bar[4], closed[5] + bar[5])])
+
+    def _fold(self, bar):
+        for tf in self.frames:
+            bucket = bar[0] - bar[0] % self._ms[tf]
+            closed = self._closed[tf]
+            if closed is None or closed[0] != bucket:
+                self._closed[tf] = [bucket, *bar[1:]]
+            else:
+                closed[2] = max(closed[2], bar[2])
+                closed[3] = min(closed[3], bar[3])
+                closed[4] = bar[4]
+                closed[5] += bar[5]
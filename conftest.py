@@ -0,0 +1,22 @@
+import pytest
+import main_swarm
+from stand_ins import make_synthetic_candles
+
+# ==========================================
+#        SHARED TEST FIXTURES
+# ==========================================
+TEST_ROWS = 20_000      # Enough for every training / streaming parity check, quick to build
+
+@pytest.fixture(scope='session')
+def df():
+    """Synthetic 15m candles with a timestamp column (the benchmarks' layout)."""
+    return make_synthetic_candles(TEST_ROWS)
+
+@pytest.fixture
+def swarm(monkeypatch):
+    """main_swarm with its module-level exchange / account / executor / journal restored afterwards."""
+    for name in ('exchange', 'account', 'executor', 'journal', 'EXCHANGE_URL'):
+        monkeypatch.setattr(main_swarm, name, getattr(main_swarm, name))
+    yield main_swarm
+    if main_swarm.executor is not None:
+        main_swarm.executor.stop()
@@ -1,91 +1,258 @@
 import ccxt
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import random
 import time
 import os
+import shutil
+from market_data import columnar_path, index_to_ms, save_columnar
+from request_layer import EXCHANGE_SCHEDULER, PRIORITY_BACKFILL, klines_weight
+from timeframes import update_rollups, ROLLUP_TIMEFRAMES
 
-def fetch_historical_data(symbol, timeframe, days_back):
-    # 1. Initialize Binance Futures API (No API keys needed for public data)
-    exchange = ccxt.binance({
-        'enableRateLimit': True, 
+# --- DOWNLOADER SETTINGS ---
+PAGE_LIMIT = 1000              # Candles per request (Binance max for weight 5)
+CHUNK_PAGES = 10               # Pages per chunk (one chunk = one resumable unit of work)
+WORKERS = 4
+MAX_RETRIES = 6
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+def make_exchange():
+    # Initialize Binance Futures API (No API keys needed for public data).
+    # ccxt's own throttle is per-instance, so all threads are paced by the shared EXCHANGE_SCHEDULER instead
+    # (at PRIORITY_BACKFILL: a backfill inside the live process only gets the weight the swarm leaves over).
+    return ccxt.binance({
+        'enableRateLimit': False,
         'options': {
             'defaultType': 'future', # IMPORTANT: Futures data
         }
     })
 
-    # 2. Calculate Start Time
-    end_time = exchange.milliseconds()
-    start_time = end_time - (days_back * 24 * 60 * 60 * 1000)
-    
-    print(f"--- Starting Download for {symbol} ---")
-    print(f"Timeframe: {timeframe}")
-    print(f"From: {datetime.fromtimestamp(start_time/1000)}")
-    print(f"To: {datetime.fromtimestamp(end_time/1000)}")
-    print("--------------------------------------")
+_local = threading.local()
 
-    all_candles = []
-    current_time = start_time
+def thread_exchange():
+    if not hasattr(_local, 'exchange'):
+        _local.exchange = make_exchange()
+    return _local.exchange
 
-    # 3. The Fetch Loop
-    while current_time < end_time:
+def fetch_page(symbol, timeframe, since, scheduler=EXCHANGE_SCHEDULER):
+    """One klines request with jittered exponential backoff."""
+    for attempt in range(MAX_RETRIES):
+        scheduler.acquire(klines_weight(PAGE_LIMIT), PRIORITY_BACKFILL)
         try:
-            # Fetch candles (limit 1000 is Binance max)
-            candles = exchange.fetch_ohlcv(symbol, timeframe, since=current_time, limit=1000)
-            
-            if not candles:
-                print("No more data available.")
-                break
-
-            all_candles += candles
-            
-            # Move pointer forward
-            last_candle_time = candles[-1][0]
-            current_time = last_candle_time + 1 
-            
-            # Progress Print
-            print(f"Downloaded... reached {datetime.fromtimestamp(last_candle_time/1000)}", end='\r')
-            
-            time.sleep(0.1) 
-
+            return thread_exchange().fetch_ohlcv(symbol, timeframe, since=since, limit=PAGE_LIMIT)
+        except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+            print(f"\nRate limited: {e}")
+            scheduler.penalize(30)
         except Exception as e:
             print(f"\nError occurred: {e}")
-            print("Retrying in 5 seconds...")
-            time.sleep(5)
-            continue
+        time.sleep(min(60, 2 ** attempt) * random.uniform(0.5, 1.5))
+    raise RuntimeError(f"Giving up on page since={since} after {MAX_RETRIES} attempts")
 
-    # 4. Process Data
-    if not all_candles:
-        return None
+def fetch_range(symbol, timeframe, start, end, scheduler=EXCHANGE_SCHEDULER):
+    """All candles with start <= timestamp < end, one page after another."""
+    candles = []
+    current_time = start
+    while current_time < end:
+        page = fetch_page(symbol, timeframe, current_time, scheduler)
+        page = [c for c in page if c[0] < end]
+        if not page:
+            break
+        candles += page
+        current_time = page[-1][0] + 1
+    return candles
+
+def plan_chunks(ranges, timeframe_ms):
+    """Splits [start, end) ranges into chunks of CHUNK_PAGES pages."""
+    span = CHUNK_PAGES * PAGE_LIMIT * timeframe_ms
+    chunks = []
+    for start, end in ranges:
+        for chunk_start in range(start, end, span):
+            chunks.append((chunk_start, min(end, chunk_start + span)))
+    return chunks
+
+def part_path(parts_dir, chunk):
+    return os.path.join(parts_dir, f"{chunk[0]}_{chunk[1]}.csv")
+
+def download_chunks(symbol, timeframe, chunks, parts_dir, workers=WORKERS, scheduler=EXCHANGE_SCHEDULER):
+    """
+    Fetches chunks concurrently. Every finished chunk is written to `parts_dir`
+    straight away, so an interrupted run loses at most the chunks in flight.
+    Returns the chunks that failed.
+    """
+    os.makedirs(parts_dir, exist_ok=True)
+    failed = []
+    done = 0
+
+    def work(chunk):
+        candles = fetch_range(symbol, timeframe, chunk[0], chunk[1], scheduler)
+        path = part_path(parts_dir, chunk)
+        pd.DataFrame(candles, columns=COLUMNS).to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        return len(candles)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(work, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                rows = future.result()
+                done += 1
+                print(f"Downloaded chunk {done}/{len(chunks)} ({rows} candles, "
+                      f"from {datetime.fromtimestamp(chunk[0]/1000)})", end='\r')
+            except Exception as e:
+                print(f"\n❌ Chunk {datetime.fromtimestamp(chunk[0]/1000)} failed: {e}")
+                failed.append(chunk)
+    return failed
+
+# ==========================================
+#        STORED DATASET
+# ==========================================
+def candles_to_df(candles):
+    df = pd.DataFrame(candles, columns=COLUMNS)
 
-    print("\nProcessing DataFrame...")
-    df = pd.DataFrame(all_candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    
-    # Convert timestamp to readable date
-    df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-    
     # Ensure numeric types
+    df['timestamp'] = df['timestamp'].astype('int64')
     cols = ['open', 'high', 'low', 'close', 'volume']
     df[cols] = df[cols].astype(float)
-    
+    return df
+
+def to_output_format(df):
+    """timestamp column -> the CSV layout everything else reads (datetime index + OHLCV)."""
+    df = df.copy()
+    # Convert timestamp to readable date
+    df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+
     # Clean up
     df.set_index('datetime', inplace=True)
-    df = df[['open', 'high', 'low', 'close', 'volume']] # Final column selection
+    return df[['open', 'high', 'low', 'close', 'volume']] # Final column selection
+
+def load_stored_candles(filename, parts_dir):
+    """Existing CSV + any chunk files left by an interrupted run, as one timestamp-sorted frame."""
+    frames = []
+    if os.path.exists(filename):
+        df = pd.read_csv(filename, index_col='datetime', parse_dates=True)
+        df.insert(0, 'timestamp', index_to_ms(df.index))
+        frames.append(df.reset_index(drop=True))
+    if os.path.isdir(parts_dir):
+        for name in sorted(os.listdir(parts_dir)):
+            if name.endswith('.csv'):
+                frames.append(pd.read_csv(os.path.join(parts_dir, name)))
+    if not frames:
+        return candles_to_df([])
+    return merge_candles(frames)
 
+def merge_candles(frames):
+    frames = [f[COLUMNS] for f in frames if len(f)]
+    if not frames:
+        return candles_to_df([])
+    df = candles_to_df(pd.concat(frames, ignore_index=True))
+    # Later downloads win (the last stored candle may have been still forming)
+    df = df.drop_duplicates('timestamp', keep='last').sort_values('timestamp')
+    return df.reset_index(drop=True)
+
+def find_gaps(df, timeframe_ms):
+    """[start, end) ranges of missing candles inside the stored series."""
+    ts = df['timestamp'].to_numpy()
+    if len(ts) < 2:
+        return []
+    gaps = []
+    for i in (ts[1:] - ts[:-1] > timeframe_ms).nonzero()[0]:
+        gaps.append((int(ts[i]) + timeframe_ms, int(ts[i + 1])))
+    return gaps
+
+def update_dataset(symbol, timeframe, days_back, filename, workers=WORKERS):
+    """
+    Brings `filename` up to date:
+      * nothing stored    -> download the full range in parallel chunks
+      * already stored    -> only candles after the last stored one (re-fetching that one,
+                             it may have been still forming) plus any holes in the series
+      * interrupted run   -> finished chunks are picked up from the parts folder
+    The 1h/4h/1d rollups are then re-derived from the earliest fetched candle onwards.
+    """
+    timeframe_ms = make_exchange().parse_timeframe(timeframe) * 1000
+    parts_dir = filename + ".parts"
+
+    # 1. Calculate Time Range
+    end_time = int(time.time() * 1000)
+    start_time = end_time - (days_back * 24 * 60 * 60 * 1000)
+
+    resumed = os.path.isdir(parts_dir)     # Chunks of an interrupted run: not in the rollups yet
+    stored = load_stored_candles(filename, parts_dir)
+    if stored.empty:
+        ranges = [(start_time, end_time)]
+    else:
+        first_ts, last_ts = int(stored['timestamp'].iloc[0]), int(stored['timestamp'].iloc[-1])
+        ranges = find_gaps(stored, timeframe_ms) + [(last_ts, end_time)]
+        if first_ts - start_time >= timeframe_ms:
+            ranges.insert(0, (start_time, first_ts))
+
+    chunks = plan_chunks(ranges, timeframe_ms)
+
+    print(f"--- Starting Download for {symbol} ---")
+    print(f"Timeframe: {timeframe}")
+    print(f"From: {datetime.fromtimestamp(start_time/1000)}")
+    print(f"To: {datetime.fromtimestamp(end_time/1000)}")
+    print(f"Stored candles: {len(stored)} | Ranges to fetch: {len(ranges)} | Chunks: {len(chunks)}")
+    print("--------------------------------------")
+
+    failed = download_chunks(symbol, timeframe, chunks, parts_dir, workers)
+
+    # 2. Merge & Save (atomically, so a crash never leaves a half-written CSV)
+    print("\nProcessing DataFrame...")
+    merged = load_stored_candles(filename, parts_dir)
+    if merged.empty:
+        return None
+    df = to_output_format(merged)
+    df.to_csv(filename + ".tmp")
+    os.replace(filename + ".tmp", filename)
+    # Binary copy for fast, zero-copy loading (see market_data.load_candles)
+    save_columnar(df, columnar_path(filename))
+    # Higher timeframes from the same candles: only buckets from the first fetched candle on change
+    update_rollups(df, filename, since=None if stored.empty or resumed else min(start for start, _ in ranges))
+
+    if failed:
+        print(f"⚠️ {len(failed)} chunks failed. Run again to resume them.")
+    else:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    gaps = find_gaps(merged, timeframe_ms)
+    if gaps:
+        print(f"⚠️ {len(gaps)} gaps remain (exchange has no data for them).")
     return df
 
+def fetch_historical_data(symbol, timeframe, days_back, workers=WORKERS):
+    """Downloads `days_back` days of candles into a DataFrame (parallel, no files kept)."""
+    exchange = make_exchange()
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    end_time = exchange.milliseconds()
+    start_time = end_time - (days_back * 24 * 60 * 60 * 1000)
+
+    chunks = plan_chunks([(start_time, end_time)], timeframe_ms)
+    all_candles = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for candles in pool.map(lambda c: fetch_range(symbol, timeframe, c[0], c[1]), chunks):
+            all_candles += candles
+
+    if not all_candles:
+        return None
+    return to_output_format(merge_candles([candles_to_df(all_candles)]))
+
 if __name__ == "__main__":
     # CONFIGURATION
     SYMBOL = 'BTC/USDT'
-    TIMEFRAME = '15m'       
+    TIMEFRAME = '15m'
     DAYS_BACK = 365 * 3     # 3 Years
 
-    # Run
-    data = fetch_historical_data(SYMBOL, TIMEFRAME, DAYS_BACK)
+    # Run (incremental: re-running only fetches what is new or missing)
+    filename = f"btc_futures_{TIMEFRAME}_3years.csv"
+    data = update_dataset(SYMBOL, TIMEFRAME, DAYS_BACK, filename)
 
     if data is not None:
-        filename = f"btc_futures_{TIMEFRAME}_3years.csv"
-        data.to_csv(filename)
-        print(f"\n✅ SUCCESS! Data saved to: {filename}")
+        print(f"\n✅ SUCCESS! Data saved to: {filename} (+ {columnar_path(filename)}, "
+              f"{'/'.join(ROLLUP_TIMEFRAMES)} rollups)")
         print(f"Total rows: {len(data)}")
     else:
-        print("❌ Failed to download data.")
\ No newline at end of file
+        print("❌ Failed to download data.")
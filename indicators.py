@@ -0,0 +1,97 @@
+from collections import deque
+import numpy as np
+
+# ==========================================
+#        STREAMING RISK FEATURES
+# ==========================================
+# The Risk Brain's observation for bar t, shared by training and the live loop:
+#   [close / SMA20,  log(volume + 1) / 10,  % momentum,  (high - low) / close %]
+# SMA20 is the mean of the 20 closes BEFORE bar t (the window the agent was trained on).
+#
+# The SMA is kept as an exact integer sum (every float is a whole number of 2**-1074),
+# so adding the newest close and dropping the oldest is O(1) and never drifts, and the
+# mean is correctly rounded once. The result depends only on the 20 closes in the
+# window, which is what lets sma_before() (training, vectorized) and StreamingFeatures
+# (live, one candle at a time) agree bit for bit.
+
+SMA_PERIOD = 20
+EXACT_BITS = 1074
+
+def exact_int(x):
+    """x * 2**1074 as an exact integer."""
+    num, den = float(x).as_integer_ratio()
+    return num << (EXACT_BITS - den.bit_length() + 1)
+
+def sma_before(close, period=SMA_PERIOD):
+    """
+    Correctly rounded mean of close[t - period:t] for every bar t (NaN while t < period).
+    Vectorized over exact integers: close == mantissa * 2**(exponent - 53).
+    A NaN / inf close raises ValueError (the live path's exact_int fails on it too).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    bad = np.flatnonzero(~np.isfinite(close))
+    if len(bad):
+        raise ValueError(f"Non-finite close at bar {bad[0]} ({len(bad)} in total): clean the candles first")
+    n = len(close)
+    sma = np.full(n, np.nan)
+    if n <= period:
+        return sma
+    mantissa, exponent = np.frexp(close)
+    ints = (mantissa * 2.0 ** 53).astype(np.int64).astype(object)
+    scale_bits = max(0, 53 - int(exponent.min()))       # close == ints_scaled / 2**scale_bits
+    ints_scaled = ints << (exponent - 53 + scale_bits).astype(object)
+    csum = np.concatenate([[0], np.cumsum(ints_scaled)])
+    window_sums = csum[period:n] - csum[:n - period]
+    sma[period:] = (window_sums / (period << scale_bits)).astype(np.float64)
+    return sma
+
+def feature_row(close, high, low, volume, prev_close, sma):
+    """One observation from scalars (sma None while there is not enough history)."""
+    norm_price = close / sma if sma is not None and sma > 0 else 1.0
+    norm_vol = np.log(volume + 1) / 10.0
+    norm_mom = (close - prev_close) / prev_close * 100
+    norm_volat = (high - low) / close * 100
+    return np.array([norm_price, norm_vol, norm_mom, norm_volat], dtype=np.float32)
+
+class StreamingFeatures:
+    """
+    O(1) feature state fed with ccxt-style [timestamp, o, h, l, c, v] rows, same rules
+    as CandleBuffer.update: the last timestamp again = the forming candle changed,
+    a newer one = that candle closed and a new one started, older = ignored.
+    """
+
+    def __init__(self, period=SMA_PERIOD):
+        self.period = period
+        self._window = deque()        # exact_int of the last `period` closed closes
+        self._sum = 0
+        self._prev_close = None       # Close of the last closed candle
+        self._bar = None              # Current candle (forming, or just closed when streaming)
+
+    def update(self, candle):
+        if self._bar is not None:
+            if candle[0] < self._bar[0]:
+                return
+            if candle[0] > self._bar[0]:
+                self._close_bar()
+        self._bar = (candle[0], *map(float, candle[1:6]))
+
+    def _close_bar(self):
+        close = self._bar[4]
+        value = exact_int(close)
+        self._window.append(value)
+        self._sum += value
+        if len(self._window) > self.period:
+            self._sum -= self._window.popleft()
+        self._prev_close = close
+
+    @property
+    def sma(self):
+        """Mean of the `period` closes before the current candle, None until there are enough."""
+        if len(self._window) < self.period:
+            return None
+        return self._sum / (self.period << EXACT_BITS)
+
+    def observation(self):
+        _, _, high, low, close, volume = self._bar
+        prev_close = close if self._prev_close is None else self._prev_close
+        return feature_row(close, high, low, volume, prev_close, self.sma)
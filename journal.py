@@ -0,0 +1,74 @@
+import os
+import json
+import gzip
+import time
+import threading
+import numpy as np
+
+# ==========================================
+#        DECISION JOURNAL
+# ==========================================
+# Append-only JSON lines (one compact record per line, `.gz` to compress).
+# Everything the decision loop looks at is written down at the moment it
+# looks at it, so replay.py can rebuild the exact same inputs later:
+#   candles   new / changed candle rows since the last record   {s, rows}
+#   scan      the loop ran a decision pass                       {s, f}
+#   bias      Sentinel snapshot read for that pass                {bias, age, stale}
+#   account   balance + open positions at that pass               {balance, positions}
+#   news      headlines + the bias the Sentinel derived           {posts, bias}
+#   decision  what the loop decided                               {s, decision, level}
+#   order     an order we sent                                    {s, side, amount, price}
+# Floats are written with repr(), so they read back bit for bit.
+
+def open_journal_file(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+class Journal:
+    def __init__(self, path):
+        self.path = path
+        self._file = open_journal_file(path, 'a')
+        self._lock = threading.Lock()
+        self._last_ts = {}          # symbol -> timestamp of the last candle row journaled
+
+    def record(self, kind, t=None, **fields):
+        line = json.dumps({'t': time.time() if t is None else t, 'k': kind, **fields}, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def record_candles(self, symbol, candles):
+        """Rows from the last journaled candle onwards (it may have changed while forming)."""
+        if candles.empty:
+            return
+        ts = candles.timestamp
+        last_ts = self._last_ts.get(symbol)
+        start = 0 if last_ts is None else int(np.searchsorted(ts, last_ts))
+        rows = [[int(t)] + row.tolist() for t, row in zip(ts[start:], candles.ohlcv[start:])]
+        self._last_ts[symbol] = int(ts[-1])
+        self.record('candles', s=symbol, rows=rows)
+
+    def record_scan(self, symbol, candles, has_forming_bar, bias_read, account_snapshot=None):
+        """All the inputs of one decision pass, in the order replay needs them."""
+        self.record_candles(symbol, candles)
+        bias, age, stale = bias_read
+        self.record('bias', bias=bias, age=age if age != float('inf') else None, stale=stale)
+        if account_snapshot is not None:
+            self.record('account', balance=account_snapshot.balance, positions=account_snapshot.positions)
+        self.record('scan', s=symbol, f=has_forming_bar)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+def read_journal(path):
+    """Yields the journal's records in order (a torn last line from a crash is skipped)."""
+    if not os.path.exists(path):
+        return
+    with open_journal_file(path, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                break
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import time
+import logging
+from metrics import METRICS
+
+log = logging.getLogger()
+
+# --- CONFIGURATION ---
+STREAM_URL = 'wss://fstream.binance.com/ws'   # Binance USDT-M Futures public streams
+STALL_TIMEOUT = 30      # Seconds without a kline message before we call the stream dead
+POLL_INTERVAL = 5       # REST polling period while the stream is down
+RECONNECT_AFTER = 60    # Seconds of REST fallback before trying the stream again
+
+def kline_stream_url(symbol, timeframe, base_url=STREAM_URL):
+    """'BTC/USDT', '15m' -> wss://.../btcusdt@kline_15m"""
+    return f"{base_url}/{symbol.replace('/', '').lower()}@kline_{timeframe}"
+
+def parse_kline(message):
+    """
+    Binance kline event -> ([timestamp, o, h, l, c, v], is_closed, event_time_ms).
+    Returns None for anything that is not a kline event.
+    """
+    data = json.loads(message)
+    if data.get('e') != 'kline':
+        return None
+    k = data['k']
+    candle = [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+    return candle, bool(k['x']), data.get('E')
+
+class StreamingCandleFeed:
+    """
+    Keeps a CandleBuffer current from a kline websocket and calls `on_close(candles, has_forming_bar)`
+    the moment a candle closes. If the stream stalls or drops, it falls back to REST polling
+    (closes are then detected when a new bar shows up) and retries the stream periodically.
+    Every candle close is handled exactly once, whichever path saw it: a REST sync that
+    adds several bars fires one close per bar, one the stream already handled is skipped.
+    """
+
+    def __init__(self, candles, exchange, symbol, timeframe, on_close, url=None,
+                 stall_timeout=STALL_TIMEOUT, poll_interval=POLL_INTERVAL, reconnect_after=RECONNECT_AFTER):
+        self.candles = candles
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.on_close = on_close
+        self.url = url or kline_stream_url(symbol, timeframe)
+        self.stall_timeout = stall_timeout
+        self.poll_interval = poll_interval
+        self.reconnect_after = reconnect_after
+        self.mode = 'REST'
+        self.running = False
+        self.last_latency_ms = None
+        self.last_closed = None         # Timestamp of the last candle whose close was handled
+
+    async def run(self):
+        self.running = True
+        await self._rest_sync()
+        if self.last_closed is None and len(self.candles) >= 2:
+            self.last_closed = int(self.candles.timestamp[-2])      # The seeded history (first_scan's job)
+        while self.running:
+            try:
+                await self._consume_stream()
+            except Exception as e:
+                METRICS.inc('stream_fallbacks')
+                log.warning(f"[Feed] Stream down ({type(e).__name__}: {e}). Falling back to REST polling.")
+            if self.running:
+                await self._poll_rest(self.reconnect_after)
+
+    def stop(self):
+        self.running = False
+
+    async def _rest_sync(self):
+        """
+        Brings the buffer up to date over REST. Rows go in one at a time, and each new bar
+        fires the close of the bar before it unless that close was already handled.
+        Returns the number of closes fired (none while seeding).
+        """
+        try:
+            if self.candles.empty:
+                await asyncio.to_thread(self.candles.sync, self.exchange, self.symbol, self.timeframe)
+                return 0
+            rows = await asyncio.to_thread(self.candles.fetch_new, self.exchange, self.symbol, self.timeframe)
+        except Exception as e:
+            log.error(f"Data Fetch Error: {e}")
+            return 0
+        received = time.perf_counter()
+        fired = 0
+        for row in rows:
+            if self.candles.update([row]) and self._is_new_close(self.candles.timestamp[-2]):
+                await self._fire_close(received, has_forming_bar=True)
+                fired += 1
+        return fired
+
+    def _is_new_close(self, ts):
+        return self.last_closed is None or int(ts) > self.last_closed
+
+    async def _consume_stream(self):
+        import websockets
+
+        async with websockets.connect(self.url) as ws:
+            log.info(f"[Feed] Streaming {self.url}")
+            self.mode = 'STREAM'
+            # Backfill anything we missed while disconnected
+            await self._rest_sync()
+            while self.running:
+                message = await asyncio.wait_for(ws.recv(), timeout=self.stall_timeout)
+                received = time.perf_counter()
+                parsed = parse_kline(message)
+                if parsed is None:
+                    continue
+                candle, is_closed, _ = parsed
+                self.candles.update([candle])
+                if is_closed and self._is_new_close(candle[0]):
+                    await self._fire_close(received, has_forming_bar=False)
+        self.mode = 'REST'
+
+    async def _poll_rest(self, duration):
+        self.mode = 'REST'
+        deadline = time.monotonic() + duration
+        while self.running and time.monotonic() < deadline:
+            await self._rest_sync()
+            await asyncio.sleep(self.poll_interval)
+
+    async def _fire_close(self, received, has_forming_bar):
+        self.last_closed = int(self.candles.timestamp[-2 if has_forming_bar else -1])
+        await asyncio.to_thread(self.on_close, self.candles, has_forming_bar)
+        elapsed = time.perf_counter() - received
+        METRICS.observe(f'close_to_decision_{self.mode.lower()}', elapsed)
+        self.last_latency_ms = elapsed * 1000
+        log.info(f"[Feed] Candle close handled in {self.last_latency_ms:.1f} ms ({self.mode})")
+
+# ==========================================
+#        LOCAL STAND-IN STREAM SERVER
+# ==========================================
+def kline_message(candle, is_closed, symbol='BTCUSDT', interval='15m'):
+    ts, o, h, l, c, v = candle
+    return json.dumps({
+        'e': 'kline', 'E': int(time.time() * 1000), 's': symbol,
+        'k': {'t': int(ts), 's': symbol, 'i': interval, 'o': str(o), 'h': str(h),
+              'l': str(l), 'c': str(c), 'v': str(v), 'x': is_closed},
+    })
+
+async def serve_klines(rows, host='127.0.0.1', port=8765, updates_per_candle=3, interval=0.01, stall_after=None):
+    """
+    Minimal Binance-style kline websocket for local runs and benchmarks.
+    Streams `rows` ([timestamp, o, h, l, c, v]) as a few in-progress updates plus a closed
+    update per candle. With `stall_after=N` it goes silent after N candles (to exercise fallback).
+    port=0 picks a free port (server.sockets[0].getsockname()[1]).
+    Returns the websockets server; close it with `server.close()`.
+    """
+    import websockets
+
+    async def handler(ws):
+        for i, row in enumerate(rows):
+            if stall_after is not None and i >= stall_after:
+                await asyncio.sleep(3600)
+            for _ in range(updates_per_candle):
+                await ws.send(kline_message(row, False))
+                await asyncio.sleep(interval)
+            await ws.send(kline_message(row, True))
+
+    return await websockets.serve(handler, host, port)
@@ -1,13 +1,23 @@
 import time
-import ccxt
-import pandas as pd
 import numpy as np
-import os
 import sys
 import logging
+import asyncio
+import argparse
 from datetime import datetime
-from sentinel_agent import get_crypto_news, analyze_sentiment
-from stable_baselines3 import PPO
+from concurrent.futures import ThreadPoolExecutor
+from sentinel_agent import SentinelWorker
+from candle_buffer import CandleBuffer
+from kline_stream import StreamingCandleFeed
+from risk_policy import load_risk_policy, RISK_POLICY_PATH
+from account_state import AccountState, parse_usdt_balance
+from order_executor import OrderExecutor
+from metrics import METRICS, METRICS_PORT, start_metrics_server, MetricsLogger
+from journal import Journal
+from timeframes import ROLLUP_TIMEFRAMES
+from request_layer import ScheduledExchange, EXCHANGE_SCHEDULER, make_session, READ_TIMEOUT
+
+PROCESS_START = time.perf_counter()   # Cold-start clock for the first-scan timing
 
 # ==========================================
 #        MASTER CONFIGURATION
@@ -15,11 +25,16 @@ from stable_baselines3 import PPO
 SYMBOL = 'BTC/USDT'
 TIMEFRAME = '15m'
 NEWS_INTERVAL = 3600  
-RISK_MODEL_PATH = "risk_agent_v1.zip"
+CANDLE_HISTORY = 1000   # Candles kept in memory (seeded once, then updated incrementally)
+HIGHER_TIMEFRAMES = ROLLUP_TIMEFRAMES   # Rolled up from the 15m candles as they arrive: candles.rollup['4h']
+RISK_MAP = {0: "SKIP", 1: "0.5%", 2: "1.0%", 3: "2.0%"}   # Risk Brain action -> position size
+ORDER_TIERS = tuple(size for size in RISK_MAP.values() if size != "SKIP")   # Kept pre-sized by the OrderExecutor
+RISK_MODEL_PATH = "risk_agent_v1.zip"   # Full PPO (needs torch), only used if the .npz export is missing
 
 # --- HARDCODED KEYS (MATCHING YOUR WORKING TEST.PY) ---
 API_KEY = ''
 SECRET_KEY = ''
+EXCHANGE_URL = None     # e.g. http://127.0.0.1:8900 to trade against mock_exchange.py instead of Binance
 
 # ==========================================
 #        LOGGING SETUP
@@ -37,81 +52,160 @@ SECRET_KEY = ''
 # ==========================================
 #        LOGGING SETUP
 # ==========================================
-# We force 'utf-8' encoding here to fix the Windows Emoji Crash
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("swarm_log.txt", encoding='utf-8'), # <--- ADDED encoding='utf-8'
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-# Force Windows Console to handle UTF-8
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
-
 log = logging.getLogger()
 
+def setup_logging():
+    # We force 'utf-8' encoding here to fix the Windows Emoji Crash
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        handlers=[
+            logging.FileHandler("swarm_log.txt", encoding='utf-8'), # <--- ADDED encoding='utf-8'
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+    # Force Windows Console to handle UTF-8
+    if sys.platform == 'win32':
+        sys.stdout.reconfigure(encoding='utf-8')
+
 # ==========================================
 #        INITIALIZATION
 # ==========================================
-log.info(f"--- INITIALIZING SWARM FOR AWS DEPLOYMENT ---")
+# Nothing heavy happens at import time: startup() builds the exchange, loads the
+# Risk Brain and seeds the candles, with the slow parts running side by side.
+
+# Global State (filled in by startup())
+exchange = None
+risk_model = None
+# The Sentinel runs on its own thread; the trading path only ever reads its latest snapshot.
+sentinel = None
+# Balance / positions / last prices, refreshed in the background and updated by our own fills
+account = None
+# Pre-sized orders, sent and confirmed on their own threads (None = execute_trade sends inline)
+executor = None
+# Optional record of every decision input (--record), replayable with replay.py
+journal = None
+
+# One keep-alive connection pool shared by every exchange instance (main, account, universe threads)
+exchange_session = make_session()
+
+def create_exchange(verbose=True):
+    """
+    Binance Futures (demo) behind the shared PriorityScheduler. ccxt's own throttle
+    is off: it is per instance and knows nothing about which call is an order.
+    """
+    import ccxt   # ~0.3s of imports, only paid once we actually start trading
 
-# 1. SETUP EXCHANGE
-try:
     exchange = ccxt.binance({
         'apiKey': API_KEY,
         'secret': SECRET_KEY,
-        'enableRateLimit': True,
+        'enableRateLimit': False,
+        'timeout': READ_TIMEOUT * 1000,
+        'session': exchange_session,
         'options': {'defaultType': 'future'}
     })
 
+    if EXCHANGE_URL:
+        from mock_exchange import point_exchange_at
+        point_exchange_at(exchange, EXCHANGE_URL)
+        if verbose: log.info(f"[System] Mock exchange at {EXCHANGE_URL}.")
     # --- CRITICAL FIX: EXACT DEMO MODE FROM TEST.PY ---
-    if hasattr(exchange, 'enable_demo_trading'):
+    elif hasattr(exchange, 'enable_demo_trading'):
         exchange.enable_demo_trading(True)
-        log.info("[System] Demo Mode Enabled (Method A).")
+        if verbose: log.info("[System] Demo Mode Enabled (Method A).")
     else:
         exchange.urls['api']['fapiPublic'] = 'https://testnet.binancefuture.com/fapi/v1'
         exchange.urls['api']['fapiPrivate'] = 'https://testnet.binancefuture.com/fapi/v1'
-        log.info("[System] Demo Mode Enabled (Method B).")
-    
-except Exception as e:
-    log.error(f"Critical Setup Error: {e}")
-    sys.exit(1)
+        if verbose: log.info("[System] Demo Mode Enabled (Method B).")
+    return ScheduledExchange(exchange, EXCHANGE_SCHEDULER)
 
-# 2. LOAD RISK BRAIN
-risk_model = None
-if os.path.exists(RISK_MODEL_PATH):
-    log.info(f"[System] Loading Risk Agent from {RISK_MODEL_PATH}...")
-    risk_model = PPO.load(RISK_MODEL_PATH, device='auto') 
-else:
-    log.warning(f"[System] {RISK_MODEL_PATH} not found! Swarm will run in BLIND mode.")
+def load_risk_brain():
+    # Prefer the torch-free NumPy export over the full PPO zip, unless the zip was retrained since
+    model, source = load_risk_policy(RISK_POLICY_PATH, RISK_MODEL_PATH)
+    if model is not None:
+        log.info(f"[System] Risk Agent loaded from {source}.")
+    else:
+        log.warning(f"[System] {RISK_MODEL_PATH} not found! Swarm will run in BLIND mode.")
+    return model
+
+def connect_exchange(candles):
+    """Exchange -> markets -> first candle history. Each step needs the one before it."""
+    exchange = create_exchange()
+    try:
+        exchange.load_markets()
+        if candles is not None:
+            candles.sync(exchange, SYMBOL, TIMEFRAME)
+    except Exception as e:
+        log.error(f"Data Fetch Error: {e}")   # The main loop retries
+    return exchange
+
+def startup(candles, metrics_port=METRICS_PORT, journal_path=None):
+    """
+    Brings the swarm up. The exchange chain (ccxt import, market load, first candle
+    fetch) runs next to the Risk Brain load, and the Sentinel starts its first news
+    pass straight away, so the first scan waits on the slowest of them, not their sum.
+    """
+    global exchange, risk_model, sentinel, account, journal, executor
+    setup_logging()
+    log.info(f"--- INITIALIZING SWARM FOR AWS DEPLOYMENT ---")
 
-# Global State
-current_bias = "NEUTRAL"
-last_news_check = 0
+    if metrics_port:
+        try:
+            start_metrics_server(metrics_port)
+            log.info(f"[System] Metrics on http://127.0.0.1:{metrics_port}/metrics")
+        except OSError as e:
+            log.warning(f"[System] Metrics endpoint disabled: {e}")
+    MetricsLogger().start()
+
+    if journal_path:
+        journal = Journal(journal_path)
+        log.info(f"[System] Recording decision inputs to {journal_path}")
+    sentinel = SentinelWorker(NEWS_INTERVAL, journal=journal)
+    start_sentinel()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        model_future = pool.submit(load_risk_brain)
+        exchange_future = pool.submit(connect_exchange, candles)
+        try:
+            exchange = exchange_future.result()
+        except Exception as e:
+            log.error(f"Critical Setup Error: {e}")
+            sys.exit(1)
+        risk_model = model_future.result()
+
+    account = AccountState(exchange_worker())
+    account.start()
+    executor = OrderExecutor(exchange_worker(), account, ORDER_TIERS, journal,
+                             confirm_exchange=exchange_worker()).start()
+    log.info(f"[System] Ready in {time.perf_counter() - PROCESS_START:.2f}s since launch.")
+
+def first_scan(candles, has_forming_bar=True):
+    """Scans the seeded history once and logs the cold start -> first scan time."""
+    if not candles.empty:
+        note_last_price(candles)    # Or the first order would fetch_ticker on the account's exchange
+        process_candles(candles, has_forming_bar)
+    log.info(f"⏱️ Cold start -> first scan: {time.perf_counter() - PROCESS_START:.2f}s")
 
 # ==========================================
 #        CORE FUNCTIONS
 # ==========================================
 
 def get_balance():
+    if account is not None:
+        return account.balance()
     try:
-        balance_data = exchange.fetch_balance()
-        if 'USDT' in balance_data:
-            return float(balance_data['USDT']['free'])
-        elif 'info' in balance_data and 'assets' in balance_data['info']:
-            for asset in balance_data['info']['assets']:
-                if asset['asset'] == 'USDT':
-                    return float(asset['availableBalance'])
-        return 0.0
+        with METRICS.time('balance_check'):
+            return parse_usdt_balance(exchange.fetch_balance())
     except Exception as e:
         log.error(f"Balance Check Error: {e}")
         return 0.0
 
-def has_open_position():
+def has_open_position(symbol=SYMBOL):
+    if account is not None:
+        return account.has_position(symbol)
     try:
-        positions = exchange.fetch_positions([SYMBOL])
+        with METRICS.time('position_check'):
+            positions = exchange.fetch_positions([symbol])
         for pos in positions:
             if float(pos['contracts']) > 0:
                 return True
@@ -120,42 +214,79 @@ def has_open_position():
         log.error(f"Position Check Error: {e}")
         return True 
 
-def fetch_live_data(symbol, limit=50):
+def get_last_price(symbol=SYMBOL):
+    if account is not None:
+        return account.last_price(symbol)
+    with METRICS.time('ticker'):
+        return exchange.fetch_ticker(symbol)['last']
+
+def note_last_price(candles, symbol=SYMBOL):
+    """
+    The forming candle's close IS the last traded price: saves a fetch_ticker per order.
+    The executor re-sizes its prepared orders to it (on its own thread) before any signal needs them.
+    """
+    if account is not None and not candles.empty:
+        account.note_price(symbol, candles.close[-1])
+        if executor is not None:
+            executor.prepare(symbol)
+
+def update_live_data(candles, symbol=SYMBOL):
+    """Seeds the candle buffer once, then only pulls the forming bar + new bars."""
     try:
-        candles = exchange.fetch_ohlcv(symbol, TIMEFRAME, limit=limit)
-        df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        cols = ['open', 'high', 'low', 'close', 'volume']
-        df[cols] = df[cols].astype(float)
-        return df
+        with METRICS.time('candle_fetch'):
+            candles.sync(exchange, symbol, TIMEFRAME)
+        note_last_price(candles, symbol)
+        return True
     except Exception as e:
+        METRICS.inc('fetch_errors')
         log.error(f"Data Fetch Error: {e}")
-        return pd.DataFrame()
+        return False
 
-def sniper_check(df):
-    if df.empty or len(df) < 5: return None, 0
+def sniper_check(candles, has_forming_bar=True):
+    if candles.empty or len(candles) < 5: return None, 0
     
-    c1 = df.iloc[-4] 
-    c2 = df.iloc[-3] 
-    c3 = df.iloc[-2] 
+    # c1, c2, c3 = the last three CLOSED candles.
+    # Polling: the last row is still forming, so they are [-4], [-3], [-2].
+    # Streaming: we run right at the close, so they are [-3], [-2], [-1].
+    shift = 1 if has_forming_bar else 0
+    opens, highs, lows, closes = candles.open, candles.high, candles.low, candles.close
+    c1, c2, c3 = -3 - shift, -2 - shift, -1 - shift
     
-    is_green_momentum = c2['close'] > c2['open']
+    is_green_momentum = closes[c2] > opens[c2]
     
     # Bullish FVG
-    if is_green_momentum and (c3['low'] > c1['high']):
-        gap_size = c3['low'] - c1['high']
-        if gap_size > (c3['close'] * 0.0005): 
-            return "BUY", c1['high']
+    if is_green_momentum and (lows[c3] > highs[c1]):
+        gap_size = lows[c3] - highs[c1]
+        if gap_size > (closes[c3] * 0.0005): 
+            return "BUY", highs[c1]
             
     return None, 0
 
-def execute_trade(decision_pct):
+def build_risk_observation(candles):
+    """
+    Normalized [Price vs SMA20, Log Vol, Momentum %, Volatility %] for the Risk Brain,
+    from the buffer's StreamingFeatures (same numbers the agent was trained on).
+    """
+    return candles.features.observation()
+
+def execute_trade(decision_pct, symbol=SYMBOL, signal_at=None):
+    """
+    Live: queues the executor's pre-sized order and returns at once (fill confirmed
+    in the background). Without an executor (replay, tools): sizes, sends and waits inline.
+    """
     try:
-        if has_open_position():
+        if executor is not None:
+            executor.submit(symbol, decision_pct, signal_at)
+            return
+
+        if has_open_position(symbol):
+            METRICS.inc('skipped_position_open')
             log.info("⚠️ Signal ignored: Position already open.")
             return
 
         usdt_balance = get_balance()
         if usdt_balance < 10:
+            METRICS.inc('skipped_low_balance')
             log.error("❌ Low Balance (< $10). Cannot trade.")
             return
 
@@ -164,103 +295,272 @@ def execute_trade(decision_pct):
         
         if position_size_usd < 10: position_size_usd = 10.0
         
-        ticker = exchange.fetch_ticker(SYMBOL)
-        price = ticker['last']
+        price = get_last_price(symbol)
         quantity = position_size_usd / price
         
-        log.info(f"🚀 EXECUTING: BUY {quantity:.5f} BTC (~${position_size_usd:.2f})")
+        log.info(f"🚀 EXECUTING: BUY {quantity:.5f} {symbol.split('/')[0]} (~${position_size_usd:.2f})")
         
-        order = exchange.create_order(SYMBOL, 'market', 'buy', quantity)
+        with METRICS.time('create_order'):
+            order = exchange.create_order(symbol, 'market', 'buy', quantity)
+        METRICS.inc('orders')
         log.info(f"✅ ORDER FILLED! ID: {order['id']}")
+        if journal is not None:
+            journal.record('order', s=symbol, side='buy', amount=quantity, price=price)
+        if account is not None:
+            account.on_fill(symbol, 'buy', float(order.get('filled') or quantity), float(order.get('average') or price))
             
     except Exception as e:
+        METRICS.inc('order_errors')
         log.error(f"❌ EXECUTION FAILED: {e}")
 
 # ==========================================
-#        MAIN LOOP
+#        SWARM STEPS
 # ==========================================
-def run_swarm():
-    global current_bias, last_news_check
+def start_sentinel():
+    if not sentinel.is_alive():
+        sentinel.start()
+
+def process_candles(candles, has_forming_bar=True):
+    """
+    SNIPER -> SENTINEL veto -> RISK BOSS -> execution, on the current candle buffer.
+    Returns the decision: None (no signal), "VETO_NEWS", "SKIP" or the risk size.
+    """
+    if journal is not None:
+        journal.record_scan(SYMBOL, candles, has_forming_bar, sentinel.read(),
+                            account.snapshot() if account is not None else None)
+    
+    with METRICS.time('sniper'):
+        signal, level = sniper_check(candles, has_forming_bar)
+    
+    decision = None
+    if signal == "BUY":
+        signal_at = time.perf_counter()
+        METRICS.inc('signals')
+        log.info(f"[Sniper] 🎯 Opportunity detected @ ${level:.2f}")
+        
+        current_bias, bias_age, bias_stale = sentinel.read()
+        log.info(f"[Sentinel] Bias at decision: {current_bias} (age {bias_age:.0f}s{', STALE' if bias_stale else ''})")
+        
+        if "BEARISH" not in current_bias:
+            if risk_model:
+                # Normalize inputs for the Brain
+                with METRICS.time('features'):
+                    obs = build_risk_observation(candles)
+                
+                with METRICS.time('risk_predict'):
+                    action, _ = risk_model.predict(obs, deterministic=True)
+                decision = RISK_MAP.get(int(action), "SKIP")
+                
+                if decision == "SKIP":
+                    METRICS.inc('vetoes_risk')
+                    log.info(f"[Risk Boss] ✋ VETOED. Market unsafe.")
+                else:
+                    log.info(f">>> 🤝 FULL CONFLUENCE! Risk Boss sized: {decision}")
+                    execute_trade(decision, signal_at=signal_at)
+            else:
+                log.info("[System] No Risk Model. Executing fallback size 1.0%")
+                decision = "1.0%"
+                execute_trade(decision, signal_at=signal_at)
+        else:
+            METRICS.inc('vetoes_news')
+            decision = "VETO_NEWS"
+            log.info(f"[Risk Manager] ✋ Vetoed by BEARISH News Sentiment.")
+        
+        if journal is not None:
+            journal.record('decision', s=SYMBOL, decision=decision, level=float(level))
+    return decision
+
+def heartbeat(candles):
+    """Show Price & Balance to prove connection."""
+    if not candles.empty:
+        price = candles.close[-1]
+        # Fetch balance once per loop to verify keys are working
+        # We do this quietly to avoid log spam, but it will error if keys are wrong
+        bal = get_balance() 
+        current_bias, _, bias_stale = sentinel.read()
+        if bias_stale: current_bias += " (STALE)"
+        print(f"Scanning... BTC: ${price:.2f} | Bias: {current_bias} | Bal: ${bal:.2f}    ", end='\r')
+
+def process_universe(scanner, has_forming_bar=True):
+    """
+    Universe mode: one vectorized Sniper pass over every symbol, one Sentinel read,
+    and ONE batched Risk Brain predict for all candidates.
+    """
+    with METRICS.time('universe_scan'):
+        candidates = scanner.scan(has_forming_bar=has_forming_bar)
+    if not candidates:
+        return
+    signal_at = time.perf_counter()
+    METRICS.inc('signals', len(candidates))
     
+    for symbol, level, _ in candidates:
+        log.info(f"[Sniper] 🎯 {symbol} opportunity detected @ ${level:.6g}")
+    
+    current_bias, bias_age, bias_stale = sentinel.read()
+    log.info(f"[Sentinel] Bias at decision: {current_bias} (age {bias_age:.0f}s{', STALE' if bias_stale else ''})")
+    if "BEARISH" in current_bias:
+        METRICS.inc('vetoes_news', len(candidates))
+        log.info(f"[Risk Manager] ✋ Vetoed {len(candidates)} signal(s) by BEARISH News Sentiment.")
+        return
+    
+    if risk_model:
+        with METRICS.time('risk_predict'):
+            actions, _ = risk_model.predict(np.stack([obs for _, _, obs in candidates]), deterministic=True)
+        decisions = [RISK_MAP.get(int(a), "SKIP") for a in np.atleast_1d(actions)]
+    else:
+        log.info("[System] No Risk Model. Executing fallback size 1.0%")
+        decisions = ["1.0%"] * len(candidates)
+    
+    for (symbol, _, _), decision in zip(candidates, decisions):
+        if decision == "SKIP":
+            METRICS.inc('vetoes_risk')
+            log.info(f"[Risk Boss] ✋ {symbol} VETOED. Market unsafe.")
+        else:
+            log.info(f">>> 🤝 FULL CONFLUENCE on {symbol}! Risk Boss sized: {decision}")
+            execute_trade(decision, symbol, signal_at)
+
+def exchange_worker():
+    """Extra exchange for another thread (universe fetchers, account refresh), sharing the loaded markets."""
+    worker = create_exchange(verbose=False)
+    if exchange.markets:
+        worker.set_markets(exchange.markets, exchange.currencies)
+    return worker
+
+# ==========================================
+#        MAIN LOOP (REST POLLING)
+# ==========================================
+def run_swarm(metrics_port=METRICS_PORT, journal_path=None):
+    candles = CandleBuffer(CANDLE_HISTORY, timeframes=HIGHER_TIMEFRAMES)
+    
+    # 1. EXCHANGE + RISK BRAIN + SENTINEL (background thread)
+    startup(candles, metrics_port, journal_path)
     log.info(f"--- SWARM LIVE: Monitoring {SYMBOL} ---")
+    first_scan(candles)
     
     while True:
         try:
-            now = time.time()
-            
-            # 1. SENTINEL
-            if now - last_news_check > NEWS_INTERVAL:
-                log.info("[Sentinel] Checking news...")
-                news = get_crypto_news()
-                if news:
-                    raw_sentiment = analyze_sentiment(news)
-                    if "BULLISH" in raw_sentiment: current_bias = "BULLISH"
-                    elif "BEARISH" in raw_sentiment: current_bias = "BEARISH"
-                    else: current_bias = "NEUTRAL"
-                    
-                    log.info(f"[Sentinel] Global Bias Updated: {current_bias}")
-                else:
-                    log.info("[Sentinel] No significant news.")
-                last_news_check = now
+            heartbeat(candles)
+            time.sleep(60)
             
             # 2. SNIPER
-            df = fetch_live_data(SYMBOL)
-            signal, level = sniper_check(df)
-            
-            if signal == "BUY":
-                log.info(f"[Sniper] 🎯 Opportunity detected @ ${level:.2f}")
-                
-                if "BEARISH" not in current_bias:
-                    if risk_model:
-                        # Normalize inputs for the Brain
-                        sma_20 = df['close'].rolling(window=20).mean().iloc[-1]
-                        current_close = df.iloc[-1]['close']
-                        if pd.isna(sma_20): sma_20 = current_close 
-                        norm_price = current_close / sma_20
-                        
-                        norm_vol = np.log(df.iloc[-1]['volume'] + 1) / 10.0
-                        
-                        prev_close = df.iloc[-2]['close']
-                        norm_mom = (current_close - prev_close) / prev_close * 100
-                        
-                        high = df.iloc[-1]['high']
-                        low = df.iloc[-1]['low']
-                        norm_volat = (high - low) / current_close * 100
-                        
-                        obs = np.array([norm_price, norm_vol, norm_mom, norm_volat], dtype=np.float32)
-                        
-                        action, _ = risk_model.predict(obs, deterministic=True)
-                        risk_map = {0: "SKIP", 1: "0.5%", 2: "1.0%", 3: "2.0%"}
-                        decision = risk_map.get(int(action), "SKIP")
-                        
-                        if decision == "SKIP":
-                            log.info(f"[Risk Boss] ✋ VETOED. Market unsafe.")
-                        else:
-                            log.info(f">>> 🤝 FULL CONFLUENCE! Risk Boss sized: {decision}")
-                            execute_trade(decision)
-                    else:
-                        log.info("[System] No Risk Model. Executing fallback size 1.0%")
-                        execute_trade("1.0%")
-                else:
-                    log.info(f"[Risk Manager] ✋ Vetoed by BEARISH News Sentiment.")
-            
-            # Heartbeat - Show Price & Balance to prove connection
-            if not df.empty:
-                price = df.iloc[-1]['close']
-                # Fetch balance once per loop to verify keys are working
-                # We do this quietly to avoid log spam, but it will error if keys are wrong
-                bal = get_balance() 
-                print(f"Scanning... BTC: ${price:.2f} | Bias: {current_bias} | Bal: ${bal:.2f}    ", end='\r')
+            with METRICS.time('cycle'):
+                if update_live_data(candles):
+                    process_candles(candles)
+
+        except KeyboardInterrupt:
+            log.info("👋 Manual Shutdown.")
+            break
+        except Exception as e:
+            METRICS.inc('loop_errors')
+            log.error(f"⚠️ Loop Error: {e}")
+            time.sleep(10)
+
+# ==========================================
+#        MAIN LOOP (UNIVERSE)
+# ==========================================
+def run_swarm_universe(symbols=None, top_n=0, metrics_port=METRICS_PORT):
+    """Polls a whole list of USDT-M perpetuals every minute and scans them in one batch."""
+    from universe_scanner import UniverseScanner, DEFAULT_UNIVERSE, top_usdt_perpetuals
+    
+    startup(None, metrics_port)
+    if top_n:
+        symbols = top_usdt_perpetuals(exchange, top_n)
+    symbols = symbols or DEFAULT_UNIVERSE
+    scanner = UniverseScanner(exchange_worker, symbols, TIMEFRAME, CANDLE_HISTORY)
+    log.info(f"--- SWARM LIVE (UNIVERSE): Monitoring {len(symbols)} symbols ---")
+    
+    first = True
+    while True:
+        try:
+            with METRICS.time('cycle'):
+                with METRICS.time('universe_fetch'):
+                    scanner.update()
+                for symbol in symbols:
+                    note_last_price(scanner.buffers[symbol], symbol)
+                for symbol, e in scanner.errors.items():
+                    METRICS.inc('fetch_errors')
+                    log.error(f"Data Fetch Error ({symbol}): {e}")
+                process_universe(scanner)
+            if first:
+                log.info(f"⏱️ Cold start -> first scan: {time.perf_counter() - PROCESS_START:.2f}s")
+                first = False
             
+            current_bias, _, bias_stale = sentinel.read()
+            if bias_stale: current_bias += " (STALE)"
+            print(f"Scanning... {len(symbols) - len(scanner.errors)}/{len(symbols)} symbols in "
+                  f"{scanner.last_cycle_seconds:.2f}s | Bias: {current_bias}    ", end='\r')
             time.sleep(60)
 
         except KeyboardInterrupt:
             log.info("👋 Manual Shutdown.")
+            scanner.close()
             break
         except Exception as e:
+            METRICS.inc('loop_errors')
             log.error(f"⚠️ Loop Error: {e}")
             time.sleep(10)
 
-if __name__ == "__main__":
+# ==========================================
+#        MAIN LOOP (STREAMING)
+# ==========================================
+async def heartbeat_loop(candles):
+    while True:
+        try:
+            await asyncio.to_thread(heartbeat, candles)
+        except Exception as e:
+            log.error(f"⚠️ Heartbeat Error: {e}")
+        await asyncio.sleep(60)
 
-    run_swarm()
+def on_candle_close(candles, has_forming_bar):
+    try:
+        note_last_price(candles)
+        with METRICS.time('cycle'):
+            process_candles(candles, has_forming_bar)
+    except Exception as e:
+        METRICS.inc('loop_errors')
+        log.error(f"⚠️ Loop Error: {e}")
+
+async def run_swarm_streaming(stream_url=None, metrics_port=METRICS_PORT, journal_path=None):
+    """Runs the Sniper the instant a candle closes (kline stream, REST fallback if it stalls)."""
+    candles = CandleBuffer(CANDLE_HISTORY, timeframes=HIGHER_TIMEFRAMES)
+    startup(candles, metrics_port, journal_path)
+    log.info(f"--- SWARM LIVE (STREAMING): Monitoring {SYMBOL} ---")
+    first_scan(candles)
+    feed = StreamingCandleFeed(candles, exchange, SYMBOL, TIMEFRAME, on_candle_close, url=stream_url)
+    
+    heartbeat_task = asyncio.create_task(heartbeat_loop(candles))
+    try:
+        await feed.run()
+    finally:
+        feed.stop()
+        heartbeat_task.cancel()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the trading swarm.")
+    parser.add_argument('--stream', action='store_true',
+                        help="Trigger on candle close from the kline websocket instead of polling every 60s")
+    parser.add_argument('--stream-url', default=None, help="Override the kline websocket URL")
+    parser.add_argument('--universe', type=int, default=0, metavar='N',
+                        help="Scan the N most traded USDT-M perpetuals instead of only BTC")
+    parser.add_argument('--symbols', nargs='+', default=None,
+                        help="Scan this list of symbols (e.g. BTC/USDT ETH/USDT) instead of only BTC")
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT,
+                        help="Port of the Prometheus /metrics endpoint (0 = off)")
+    parser.add_argument('--record', default=None, metavar='JOURNAL',
+                        help="Append every decision input to this journal (.jsonl or .jsonl.gz) for replay.py")
+    parser.add_argument('--exchange-url', default=None,
+                        help="Send every exchange call to this base URL (mock_exchange.py) instead of Binance demo")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    EXCHANGE_URL = args.exchange_url
+    if args.universe or args.symbols:
+        run_swarm_universe(args.symbols, args.universe, args.metrics_port)
+    elif args.stream:
+        try:
+            asyncio.run(run_swarm_streaming(args.stream_url, args.metrics_port, args.record))
+        except KeyboardInterrupt:
+            log.info("👋 Manual Shutdown.")
+    else:
+        run_swarm(args.metrics_port, args.record)
@@ -0,0 +1,73 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# ==========================================
+#        COLUMNAR CANDLE STORE
+# ==========================================
+# <name>.cols/ holds one .npy file per column (int64 ms timestamps, float64 OHLCV).
+# np.load(mmap_mode='r') maps them straight from the page cache, so loading is
+# near-instant and every process that maps the same files shares the same pages.
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+META_FILE = 'meta.json'
+
+def columnar_path(csv_path):
+    """'btc_futures_15m_3years.csv' -> 'btc_futures_15m_3years.cols'"""
+    return os.path.splitext(csv_path)[0] + '.cols'
+
+def index_to_ms(index):
+    """DatetimeIndex -> int64 epoch milliseconds (independent of the index's time unit)."""
+    return np.asarray((index - pd.Timestamp(0)) // pd.Timedelta('1ms'), dtype=np.int64)
+
+def save_columnar(df, path):
+    """Writes a datetime-indexed OHLCV frame (data_miner's output format) as memory-mappable columns."""
+    tmp_path = path + '.tmp'
+    os.makedirs(tmp_path, exist_ok=True)
+    np.save(os.path.join(tmp_path, 'timestamp.npy'), index_to_ms(df.index))
+    for col in PRICE_COLUMNS:
+        np.save(os.path.join(tmp_path, f'{col}.npy'), df[col].to_numpy(dtype=np.float64))
+    with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+        json.dump({'rows': len(df), 'columns': ['timestamp'] + PRICE_COLUMNS}, f)
+
+    # Swap the whole folder in at once so readers never see half a dataset
+    if os.path.isdir(path):
+        old_path = path + '.old'
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        for name in os.listdir(old_path):
+            os.remove(os.path.join(old_path, name))
+        os.rmdir(old_path)
+    else:
+        os.replace(tmp_path, path)
+
+def load_columns(path):
+    """{'timestamp': int64 memmap, 'open': float64 memmap, ...} (read-only, zero copy)."""
+    return {
+        col: np.load(os.path.join(path, f'{col}.npy'), mmap_mode='r')
+        for col in ['timestamp'] + PRICE_COLUMNS
+    }
+
+def columns_to_frame(columns):
+    """Wraps mapped columns in a DataFrame without copying the OHLCV data."""
+    index = pd.DatetimeIndex(np.asarray(columns['timestamp']).view('datetime64[ms]'), name='datetime')
+    return pd.DataFrame({col: columns[col] for col in PRICE_COLUMNS}, index=index, copy=False)
+
+def load_candles(csv_path):
+    """
+    Shared loader for the trainer and the backtester.
+    Uses the columnar copy when it exists and is at least as new as the CSV,
+    otherwise parses the CSV. Returns a datetime-indexed OHLCV DataFrame.
+    """
+    cols_path = columnar_path(csv_path)
+    if os.path.isdir(cols_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(cols_path) >= os.path.getmtime(csv_path)
+    ):
+        return columns_to_frame(load_columns(cols_path))
+    if not os.path.exists(csv_path):
+        return None
+    return pd.read_csv(csv_path, index_col='datetime', parse_dates=True)
+
+def data_exists(csv_path):
+    return os.path.exists(csv_path) or os.path.isdir(columnar_path(csv_path))
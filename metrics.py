@@ -0,0 +1,164 @@
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==========================================
+#        SWARM METRICS
+# ==========================================
+# Per-stage latency histograms + event counters for the live loop.
+# Recording is a perf_counter pair, a bisect and two adds under a lock (~1 us),
+# so it stays on in production. Exposed two ways:
+#   - http://127.0.0.1:<port>/metrics in Prometheus text format
+#   - a summary log line every LOG_INTERVAL seconds
+
+METRICS_PORT = 9108
+LOG_INTERVAL = 300
+
+# Upper bounds in seconds (1 us .. 60 s); anything slower lands in +Inf
+BUCKETS = [
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+]
+
+class LatencyHistogram:
+    """Fixed-bucket histogram (Prometheus style) with approximate percentiles."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """q in [0, 100]; linear interpolation inside the bucket, capped at the observed max."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+class MetricsRegistry:
+    """Stage histograms and event counters, created on first use."""
+
+    def __init__(self):
+        self.stages = {}
+        self.events = {}
+        self.lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        """with METRICS.time('candle_fetch'): ...  (recorded even if the block raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def inc(self, event, n=1):
+        with self.lock:
+            self.events[event] = self.events.get(event, 0) + n
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = [
+            "# HELP swarm_stage_seconds Time spent in each stage of the swarm loop.",
+            "# TYPE swarm_stage_seconds histogram",
+        ]
+        with self.lock:
+            for stage, h in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, n in zip(h.buckets + ['+Inf'], h.counts):
+                    cumulative += n
+                    lines.append(f'swarm_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'swarm_stage_seconds_sum{{stage="{stage}"}} {h.sum:.9f}')
+                lines.append(f'swarm_stage_seconds_count{{stage="{stage}"}} {h.count}')
+            lines += [
+                "# HELP swarm_events_total Swarm events (signals, vetoes, orders, errors).",
+                "# TYPE swarm_events_total counter",
+            ]
+            for event, n in sorted(self.events.items()):
+                lines.append(f'swarm_events_total{{event="{event}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One line per stage (p50/p95/p99/max in ms) plus the counters."""
+        with self.lock:
+            lines = [
+                f"{stage:<16} n={h.count:<6} p50 {h.percentile(50) * 1000:9.3f} | p95 {h.percentile(95) * 1000:9.3f} | "
+                f"p99 {h.percentile(99) * 1000:9.3f} | max {h.max * 1000:9.3f} ms"
+                for stage, h in sorted(self.stages.items())
+            ]
+            if self.events:
+                lines.append(" | ".join(f"{event}={n}" for event, n in sorted(self.events.items())))
+        return lines
+
+# One registry for the whole process
+METRICS = MetricsRegistry()
+
+# --- EXPORT ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = METRICS
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass    # Scrapes every few seconds would flood the swarm log
+
+def start_metrics_server(port=METRICS_PORT, host='127.0.0.1', registry=METRICS):
+    """Serves /metrics on a daemon thread. Returns the server (server.shutdown() to stop)."""
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+class MetricsLogger(threading.Thread):
+    """Writes METRICS.summary() to the log every `interval` seconds."""
+
+    def __init__(self, interval=LOG_INTERVAL, registry=METRICS):
+        super().__init__(name="metrics-log", daemon=True)
+        self.interval = interval
+        self.registry = registry
+        self._stop_event = threading.Event()
+        self.log = logging.getLogger()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            lines = self.registry.summary()
+            if lines:
+                self.log.info("[Metrics] Stage latency since start:\n    " + "\n    ".join(lines))
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,590 @@
+import json
+import time
+import random
+import argparse
+import threading
+import numpy as np
+from urllib.parse import urlsplit, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from metrics import MetricsRegistry, METRICS
+from market_data import load_candles, data_exists, index_to_ms, PRICE_COLUMNS
+from request_layer import klines_weight, PriorityScheduler, ScheduledExchange
+
+# ==========================================
+#        MOCK EXCHANGE (LOAD TESTING)
+# ==========================================
+# A local stand-in for the Binance USDT-M Futures REST endpoints the swarm uses
+# (markets, klines, 24h ticker, account, positions, market orders incl. reduceOnly,
+# order queries),
+# spoken over HTTP so a real ccxt client can be pointed at it:
+#   python mock_exchange.py --speed 900 --latency 0.02 --jitter 0.01 --error-rate 0.01
+#   python main_swarm.py --exchange-url http://127.0.0.1:8900
+# Candles are replayed from the dataset on a fast-forward clock (the last bar is
+# "forming"). Latency, 503s (as a load balancer sends them) and request-weight
+# limits (429 + Retry-After) are injected on the server side, and /metrics shows
+# the server's own latency per endpoint.
+
+# --- CONFIGURATION ---
+MOCK_PORT = 8900
+DATA_FILE = 'btc_futures_15m_3years.csv'
+START_BALANCE = 10000.0
+START_BAR = 1000              # Bars of history before the replay clock starts (the swarm seeds 1000)
+WEIGHT_PER_MINUTE = 2400      # Binance Futures' per-IP request weight limit
+TAKER_FEE = 0.0004
+LEVERAGE = 1
+MIN_NOTIONAL = 5.0
+MAX_KLINES = 1500
+
+# (method, path) -> (handler, weight (None = depends on params), signed)
+ROUTES = {
+    ('GET', '/fapi/v1/ping'): ('ping', 1, False),
+    ('GET', '/fapi/v1/time'): ('time', 1, False),
+    ('GET', '/fapi/v1/exchangeInfo'): ('exchange_info', 1, False),
+    ('GET', '/fapi/v1/klines'): ('klines', None, False),
+    ('GET', '/fapi/v1/ticker/24hr'): ('ticker', None, False),
+    ('GET', '/fapi/v1/leverageBracket'): ('leverage_bracket', 1, True),
+    ('GET', '/fapi/v2/account'): ('account', 5, True),
+    ('GET', '/fapi/v3/account'): ('account', 5, True),
+    ('GET', '/fapi/v2/positionRisk'): ('position_risk', 5, True),
+    ('GET', '/fapi/v3/positionRisk'): ('position_risk', 5, True),
+    ('POST', '/fapi/v1/order'): ('order', 1, True),
+    ('GET', '/fapi/v1/order'): ('query_order', 1, True),
+}
+
+class MockError(Exception):
+    """A Binance-style error response: HTTP status + {'code', 'msg'}."""
+
+    def __init__(self, status, code, msg):
+        super().__init__(msg)
+        self.status, self.code, self.msg = status, code, msg
+
+def symbol_id(symbol):
+    """'BTC/USDT' (or 'BTC/USDT:USDT') -> 'BTCUSDT'"""
+    return symbol.split(':')[0].replace('/', '')
+
+def point_exchange_at(exchange, base_url):
+    """
+    Rewrites every REST base URL of a ccxt binance instance to base_url (same paths)
+    and limits market loading to USDT-M futures, the only markets the mock lists.
+    """
+    base_url = base_url.rstrip('/')
+    for name, url in exchange.urls['api'].items():
+        if isinstance(url, str) and url.startswith('http'):
+            exchange.urls['api'][name] = base_url + '/' + url.split('/', 3)[3]
+    exchange.options['fetchMarkets'] = {'types': ['linear']}
+    exchange.options['fetchCurrencies'] = False
+    exchange.apiKey = exchange.apiKey or 'mock'     # Signed endpoints only check that a key is sent
+    exchange.secret = exchange.secret or 'mock'
+    return exchange
+
+# ==========================================
+#        CANDLE REPLAY CLOCK
+# ==========================================
+class MarketReplay:
+    """
+    Serves a historical candle set as if it were live. `speed` is dataset seconds per
+    wall second (900 = one 15m candle per second); advance() jumps ahead by whole bars.
+    The current bar is built up from its open as its time elapses and equals the stored
+    candle once it closes.
+    """
+
+    def __init__(self, frame, start_bar=START_BAR, speed=1.0, clock=time.monotonic):
+        self.timestamp = index_to_ms(frame.index)
+        self.ohlcv = frame[PRICE_COLUMNS].to_numpy(dtype=np.float64)
+        self.bar_ms = int(self.timestamp[1] - self.timestamp[0])
+        self.start_bar = min(start_bar, len(self.timestamp) - 1)
+        self.speed = speed
+        self.clock = clock
+        self._t0 = clock()
+        self._offset = 0
+
+    def advance(self, bars=1):
+        self._offset += bars
+
+    def position(self):
+        """(index of the forming bar, fraction of it elapsed)"""
+        bar = self.start_bar + self._offset + (self.clock() - self._t0) * self.speed * 1000 / self.bar_ms
+        last = len(self.timestamp) - 1
+        if bar >= last:
+            return last, 1.0
+        return int(bar), bar - int(bar)
+
+    def forming(self, i, frac):
+        o, h, l, c, v = self.ohlcv[i]
+        close = o + (c - o) * frac
+        high = max(o, close) + (h - max(o, c)) * frac
+        low = min(o, close) - (min(o, c) - l) * frac
+        return [o, high, low, close, v * frac]
+
+    def last_price(self):
+        return self.forming(*self.position())[3]
+
+    def klines(self, start_time=None, end_time=None, limit=500):
+        """Binance semantics: from start_time onwards, else the most recent `limit` bars."""
+        i, frac = self.position()
+        ts = self.timestamp
+        hi = i + 1 if end_time is None else min(i + 1, int(np.searchsorted(ts, end_time, 'right')))
+        lo = max(0, hi - limit) if start_time is None else int(np.searchsorted(ts, start_time))
+        hi = min(hi, lo + limit)
+        rows = [[int(t)] + row for t, row in zip(ts[lo:hi], self.ohlcv[lo:hi].tolist())]
+        if rows and hi == i + 1:
+            rows[-1] = [int(ts[i])] + self.forming(i, frac)
+        return rows
+
+    def day_window(self):
+        """(open, high, low, volume) of the last 24h of bars, forming bar included."""
+        i, frac = self.position()
+        bars = max(1, 86_400_000 // self.bar_ms)
+        lo = max(0, i - bars + 1)
+        window = self.ohlcv[lo:i + 1].copy()
+        window[-1] = self.forming(i, frac)
+        return window[0, 0], window[:, 1].max(), window[:, 2].min(), window[:, 4].sum()
+
+# ==========================================
+#        ACCOUNT (ONE-WAY MODE, CROSS MARGIN)
+# ==========================================
+class MockAccount:
+    def __init__(self, balance=START_BALANCE, leverage=LEVERAGE):
+        self.wallet = balance
+        self.leverage = leverage
+        self.positions = {}         # symbol id -> [signed amount, entry price]
+
+    def unrealized(self, price):
+        return sum(amt * (price - entry) for amt, entry in self.positions.values())
+
+    def initial_margin(self, price):
+        return sum(abs(amt) * price for amt, _ in self.positions.values()) / self.leverage
+
+    def available(self, price):
+        return self.wallet + self.unrealized(price) - self.initial_margin(price)
+
+    def fill(self, sid, side, qty, price, reduce_only):
+        """Applies a market fill. Returns the executed quantity."""
+        amt, entry = self.positions.get(sid, (0.0, 0.0))
+        signed = qty if side == 'BUY' else -qty
+        if reduce_only:
+            if amt == 0 or (amt > 0) == (signed > 0):
+                raise MockError(400, -2022, "ReduceOnly Order is rejected.")
+            signed = max(signed, -amt) if amt > 0 else min(signed, -amt)
+
+        closed = min(abs(signed), abs(amt)) if amt and (amt > 0) != (signed > 0) else 0.0
+        opened = abs(signed) - closed
+        if opened and opened * price / self.leverage > self.available(price):
+            raise MockError(400, -2019, "Margin is insufficient.")
+
+        pnl = closed * (price - entry) * (1 if amt > 0 else -1)
+        self.wallet += pnl - abs(signed) * price * TAKER_FEE
+        new_amt = amt + signed
+        if abs(new_amt) < 1e-12:
+            self.positions.pop(sid, None)
+        elif not closed:
+            self.positions[sid] = [new_amt, (abs(amt) * entry + opened * price) / abs(new_amt)]
+        elif opened:
+            self.positions[sid] = [new_amt, price]       # Flipped sides
+        else:
+            self.positions[sid] = [new_amt, entry]
+        return abs(signed)
+
+# ==========================================
+#        REQUEST HANDLING
+# ==========================================
+class MockExchange:
+    """
+    The mock's state and behaviour, independent of HTTP: handle() takes a parsed
+    request and returns (status, payload, headers). latency / jitter / error_rate /
+    weight_per_minute may be changed while it runs (stress phases). With ack_orders,
+    market orders are answered like Binance Futures often does (status NEW, nothing
+    executed yet) and the fill only shows up when the order is queried.
+    """
+
+    def __init__(self, frame, symbols=('BTC/USDT',), balance=START_BALANCE, start_bar=START_BAR, speed=1.0,
+                 latency=0.0, jitter=0.0, error_rate=0.0, weight_per_minute=WEIGHT_PER_MINUTE, seed=0,
+                 ack_orders=False):
+        self.market = MarketReplay(frame, start_bar, speed)
+        self.symbols = {symbol_id(s): s for s in symbols}
+        self.account = MockAccount(balance)
+        self.latency = latency
+        self.jitter = jitter                    # Mean of an exponential extra delay: the tail
+        self.error_rate = error_rate
+        self.weight_per_minute = weight_per_minute
+        self.metrics = MetricsRegistry()
+        self.orders = 0
+        self.ack_orders = ack_orders
+        self._orders = {}                       # orderId -> the order as a query returns it
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = None
+        self._used = 0
+        self.server = None
+
+    # --- Injection ---
+    def _spend(self, weight):
+        """Fixed one-minute weight windows, like Binance. Returns (used, seconds left in the window)."""
+        now = time.time()
+        window = int(now // 60)
+        if window != self._window:
+            self._window, self._used = window, 0
+        self._used += weight
+        return self._used, 60 - now % 60
+
+    def _delay(self):
+        if not self.jitter:
+            return self.latency
+        return self.latency + self._rng.expovariate(1 / self.jitter)
+
+    def handle(self, method, path, params, headers):
+        if method == 'GET' and path == '/metrics':
+            return 200, self.metrics.render(), {'Content-Type': 'text/plain; version=0.0.4'}
+        route = ROUTES.get((method, path))
+        if route is None:
+            return 404, {'code': -1, 'msg': f"Unknown endpoint {method} {path}"}, {}
+
+        name, weight, signed = route
+        if weight is None:
+            weight = klines_weight(int(params.get('limit', 500))) if name == 'klines' else (1 if 'symbol' in params else 40)
+        start = time.perf_counter()
+        with self._lock:
+            used, retry_after = self._spend(weight)
+            delay = self._delay()
+            fail = self._rng.random() < self.error_rate
+        response_headers = {'X-MBX-USED-WEIGHT-1M': str(used)}
+        time.sleep(delay)
+        try:
+            if signed and not headers.get('X-MBX-APIKEY'):
+                raise MockError(401, -2015, "Invalid API-key, IP, or permissions for action.")
+            if used > self.weight_per_minute:
+                response_headers['Retry-After'] = str(int(retry_after) + 1)
+                raise MockError(429, -1003, f"Too many requests; current limit is {self.weight_per_minute} "
+                                            "request weight per 1 MINUTE.")
+            if fail:
+                self.metrics.inc('http_503')
+                status, payload = 503, "Service Unavailable"      # What the load balancer sends, not the API
+            else:
+                with self._lock:
+                    status, payload = 200, getattr(self, '_' + name)(params)
+        except MockError as e:
+            self.metrics.inc(f"http_{e.status}")
+            status, payload = e.status, {'code': e.code, 'msg': e.msg}
+        self.metrics.observe(name, time.perf_counter() - start)
+        return status, payload, response_headers
+
+    def _symbol(self, params):
+        sid = params.get('symbol')
+        if sid not in self.symbols:
+            raise MockError(400, -1121, "Invalid symbol.")
+        return sid
+
+    # --- Public endpoints ---
+    def _ping(self, params):
+        return {}
+
+    def _time(self, params):
+        return {'serverTime': int(time.time() * 1000)}
+
+    def _exchange_info(self, params):
+        return {
+            'timezone': 'UTC', 'serverTime': int(time.time() * 1000), 'futuresType': 'U_MARGINED',
+            'rateLimits': [{'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1,
+                            'limit': self.weight_per_minute}],
+            'exchangeFilters': [],
+            'assets': [{'asset': 'USDT', 'marginAvailable': True, 'autoAssetExchange': '-10000'}],
+            'symbols': [self._market_info(sid, symbol) for sid, symbol in self.symbols.items()],
+        }
+
+    def _market_info(self, sid, symbol):
+        base = symbol.split('/')[0]
+        return {
+            'symbol': sid, 'pair': sid, 'contractType': 'PERPETUAL', 'deliveryDate': 4133404800000,
+            'onboardDate': 1569398400000, 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': 'USDT',
+            'marginAsset': 'USDT', 'pricePrecision': 2, 'quantityPrecision': 3, 'baseAssetPrecision': 8,
+            'quotePrecision': 8, 'underlyingType': 'COIN', 'underlyingSubType': [], 'triggerProtect': '0.0500',
+            'liquidationFee': '0.012500', 'marketTakeBound': '0.05',
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': '0.10', 'maxPrice': '4529764', 'tickSize': '0.10'},
+                {'filterType': 'LOT_SIZE', 'stepSize': '0.001', 'maxQty': '1000', 'minQty': '0.001'},
+                {'filterType': 'MARKET_LOT_SIZE', 'stepSize': '0.001', 'maxQty': '120', 'minQty': '0.001'},
+                {'filterType': 'MAX_NUM_ORDERS', 'limit': 200},
+                {'filterType': 'MIN_NOTIONAL', 'notional': str(MIN_NOTIONAL)},
+            ],
+            'orderTypes': ['LIMIT', 'MARKET', 'STOP', 'STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET'],
+            'timeInForce': ['GTC', 'IOC', 'FOK', 'GTX'],
+        }
+
+    def _klines(self, params):
+        self._symbol(params)
+        start_time = int(params['startTime']) if 'startTime' in params else None
+        end_time = int(params['endTime']) if 'endTime' in params else None
+        limit = min(int(params.get('limit', 500)), MAX_KLINES)
+        close_offset = self.market.bar_ms - 1
+        return [
+            [t, str(o), str(h), str(l), str(c), str(v), t + close_offset, str(v * c), 0, '0', '0', '0']
+            for t, o, h, l, c, v in self.market.klines(start_time, end_time, limit)
+        ]
+
+    def _ticker(self, params):
+        if 'symbol' in params:
+            return self._ticker_for(self._symbol(params))
+        return [self._ticker_for(sid) for sid in self.symbols]
+
+    def _ticker_for(self, sid):
+        last = self.market.last_price()
+        open_, high, low, volume = self.market.day_window()
+        now = int(time.time() * 1000)
+        return {
+            'symbol': sid, 'priceChange': str(last - open_), 'priceChangePercent': str((last / open_ - 1) * 100),
+            'weightedAvgPrice': str(last), 'lastPrice': str(last), 'lastQty': '0.001', 'openPrice': str(open_),
+            'highPrice': str(high), 'lowPrice': str(low), 'volume': str(volume), 'quoteVolume': str(volume * last),
+            'openTime': now - 86_400_000, 'closeTime': now, 'firstId': 0, 'lastId': 0, 'count': 0,
+        }
+
+    # --- Signed endpoints ---
+    def _leverage_bracket(self, params):
+        return [
+            {'symbol': sid, 'notionalCoef': 1.0, 'brackets': [
+                {'bracket': 1, 'initialLeverage': 125, 'notionalCap': 50000, 'notionalFloor': 0,
+                 'maintMarginRatio': 0.004, 'cum': 0.0}]}
+            for sid in self.symbols
+        ]
+
+    def _account(self, params):
+        price = self.market.last_price()
+        acct = self.account
+        wallet, pnl, margin = acct.wallet, acct.unrealized(price), acct.initial_margin(price)
+        available = str(acct.available(price))
+        now = int(time.time() * 1000)
+        return {
+            'totalInitialMargin': str(margin), 'totalMaintMargin': '0', 'totalWalletBalance': str(wallet),
+            'totalUnrealizedProfit': str(pnl), 'totalMarginBalance': str(wallet + pnl),
+            'totalPositionInitialMargin': str(margin), 'totalOpenOrderInitialMargin': '0',
+            'totalCrossWalletBalance': str(wallet), 'totalCrossUnPnl': str(pnl),
+            'availableBalance': available, 'maxWithdrawAmount': available,
+            'assets': [{
+                'asset': 'USDT', 'walletBalance': str(wallet), 'unrealizedProfit': str(pnl),
+                'marginBalance': str(wallet + pnl), 'maintMargin': '0', 'initialMargin': str(margin),
+                'positionInitialMargin': str(margin), 'openOrderInitialMargin': '0',
+                'crossWalletBalance': str(wallet), 'crossUnPnl': str(pnl), 'availableBalance': available,
+                'maxWithdrawAmount': available, 'updateTime': now,
+            }],
+            'positions': [
+                {'symbol': sid, 'positionSide': 'BOTH', 'positionAmt': str(amt), 'unrealizedProfit': str(amt * (price - entry)),
+                 'isolatedMargin': '0', 'notional': str(amt * price), 'isolatedWallet': '0',
+                 'initialMargin': str(abs(amt) * price / acct.leverage), 'maintMargin': '0', 'updateTime': now}
+                for sid, (amt, entry) in acct.positions.items()
+            ],
+        }
+
+    def _position_risk(self, params):
+        price = self.market.last_price()
+        acct = self.account
+        sids = [self._symbol(params)] if 'symbol' in params else list(acct.positions)
+        now = int(time.time() * 1000)
+        risks = []
+        for sid in sids:
+            amt, entry = acct.positions.get(sid, (0.0, 0.0))
+            risks.append({
+                'symbol': sid, 'positionSide': 'BOTH', 'positionAmt': str(amt), 'entryPrice': str(entry),
+                'breakEvenPrice': str(entry), 'markPrice': str(price), 'unRealizedProfit': str(amt * (price - entry)),
+                'liquidationPrice': '0', 'isolatedMargin': '0', 'notional': str(amt * price), 'marginAsset': 'USDT',
+                'isolatedWallet': '0', 'initialMargin': str(abs(amt) * price / acct.leverage), 'maintMargin': '0',
+                'positionInitialMargin': str(abs(amt) * price / acct.leverage), 'openOrderInitialMargin': '0',
+                'adl': 0, 'bidNotional': '0', 'askNotional': '0', 'updateTime': now,
+            })
+        return risks
+
+    def _order(self, params):
+        sid = self._symbol(params)
+        if params.get('type') != 'MARKET':
+            raise MockError(400, -1116, "Invalid orderType.")
+        side = params.get('side')
+        if side not in ('BUY', 'SELL'):
+            raise MockError(400, -1117, "Invalid side.")
+        qty = float(params.get('quantity') or 0)
+        price = self.market.last_price()
+        if qty <= 0:
+            raise MockError(400, -1013, "Invalid quantity.")
+        reduce_only = params.get('reduceOnly') == 'true'
+        if not reduce_only and qty * price < MIN_NOTIONAL:
+            raise MockError(400, -4164, f"Order's notional must be no smaller than {MIN_NOTIONAL}.")
+
+        executed = self.account.fill(sid, side, qty, price, reduce_only)
+        self.orders += 1
+        order = {
+            'orderId': self.orders, 'symbol': sid, 'status': 'FILLED',
+            'clientOrderId': params.get('newClientOrderId') or f"mock-{self.orders}", 'price': '0',
+            'avgPrice': str(price), 'origQty': str(qty), 'executedQty': str(executed), 'cumQty': str(executed),
+            'cumQuote': str(executed * price), 'timeInForce': 'GTC', 'type': 'MARKET', 'reduceOnly': reduce_only,
+            'closePosition': False, 'side': side, 'positionSide': 'BOTH', 'stopPrice': '0',
+            'workingType': 'CONTRACT_PRICE', 'priceProtect': False, 'origType': 'MARKET',
+            'updateTime': int(time.time() * 1000),
+        }
+        self._orders[self.orders] = order
+        if self.ack_orders:
+            return {**order, 'status': 'NEW', 'avgPrice': '0', 'executedQty': '0', 'cumQty': '0', 'cumQuote': '0'}
+        return order
+
+    def _query_order(self, params):
+        sid = self._symbol(params)
+        order = self._orders.get(int(params.get('orderId') or 0))
+        if order is None or order['symbol'] != sid:
+            raise MockError(400, -2013, "Order does not exist.")
+        return order
+
+    # --- HTTP ---
+    def serve(self, port=MOCK_PORT, host='127.0.0.1'):
+        """Serves on a daemon thread (port 0 = any free port). Returns the base URL."""
+        handler = type('MockHandler', (_MockHandler,), {'mock': self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="mock-exchange", daemon=True).start()
+        return f"http://{host}:{self.server.server_port}"
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'       # Keep-alive, like the real API
+    disable_nagle_algorithm = True
+    mock = None
+
+    def _serve(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode()))
+        status, payload, headers = self.mock.handle(self.command, url.path, params, self.headers)
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', headers.pop('Content-Type', 'application/json'))
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_DELETE = _serve
+
+    def log_message(self, format, *args):
+        pass
+
+# ==========================================
+#        LOAD GENERATOR
+# ==========================================
+# One "client" = one ccxt instance on its own thread (like the universe workers),
+# drawing calls from the swarm's request mix. Orders alternate buy / reduceOnly sell.
+LOAD_MIX = [
+    ('fetch_ohlcv', 0.60),
+    ('fetch_ticker', 0.15),
+    ('fetch_balance', 0.10),
+    ('fetch_positions', 0.10),
+    ('create_order', 0.05),
+]
+
+def mock_client(base_url, scheduler=None, markets=None):
+    """ccxt binance pointed at the mock, behind a ScheduledExchange like the live swarm's."""
+    import ccxt
+    exchange = ccxt.binance({'enableRateLimit': False, 'options': {'defaultType': 'future'}})
+    point_exchange_at(exchange, base_url)
+    if markets is not None:
+        exchange.set_markets(markets)
+    else:
+        exchange.load_markets()
+    return ScheduledExchange(exchange, scheduler or PriorityScheduler(10 ** 9))
+
+def load_test(base_url, clients=8, seconds=10.0, symbol='BTC/USDT', scheduler=None, mix=LOAD_MIX,
+              order_amount=0.001, seed=0):
+    """
+    Hammers the mock for `seconds` with `clients` threads. Returns a MetricsRegistry:
+    one latency histogram per call (successes only) and one counter per error type.
+    """
+    registry = MetricsRegistry()
+    scheduler = scheduler or PriorityScheduler(10 ** 9)
+    markets = mock_client(base_url, scheduler).markets
+    names, weights = zip(*mix)
+    deadline = time.perf_counter() + seconds
+    retries_before = METRICS.events.get('exchange_retries', 0)
+
+    def client(n):
+        exchange = mock_client(base_url, scheduler, markets)
+        rng = random.Random(seed + n)
+        holding = False
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            if name == 'fetch_ohlcv':
+                call = lambda: exchange.fetch_ohlcv(symbol, '15m', limit=2)
+            elif name == 'fetch_ticker':
+                call = lambda: exchange.fetch_ticker(symbol)
+            elif name == 'fetch_balance':
+                call = lambda: exchange.fetch_balance()
+            elif name == 'fetch_positions':
+                call = lambda: exchange.fetch_positions([symbol])
+            elif holding:
+                call = lambda: exchange.create_order(symbol, 'market', 'sell', order_amount, params={'reduceOnly': True})
+            else:
+                call = lambda: exchange.create_order(symbol, 'market', 'buy', order_amount)
+            start = time.perf_counter()
+            try:
+                call()
+                registry.observe(name, time.perf_counter() - start)
+                if name == 'create_order':
+                    holding = not holding
+            except Exception as e:
+                registry.inc(type(e).__name__)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    registry.elapsed = time.perf_counter() - start
+    registry.requests = sum(h.count for h in registry.stages.values())
+    registry.retries = METRICS.events.get('exchange_retries', 0) - retries_before
+    return registry
+
+def print_load_report(registry, title="LOAD TEST"):
+    print(f"--- {title}: {registry.requests:,} ok calls in {registry.elapsed:.1f}s = "
+          f"{registry.requests / registry.elapsed:,.0f}/s | {registry.retries} retries ---")
+    for line in registry.summary():
+        print("    " + line)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local Binance Futures stand-in for load testing the swarm.")
+    parser.add_argument('--candles', default=DATA_FILE, help="Candle dataset to replay")
+    parser.add_argument('--symbols', nargs='+', default=['BTC/USDT'], help="Symbols to list (all replay the dataset)")
+    parser.add_argument('--port', type=int, default=MOCK_PORT)
+    parser.add_argument('--speed', type=float, default=1.0, help="Dataset seconds per wall second (900 = 1 candle/s)")
+    parser.add_argument('--start-bar', type=int, default=START_BAR)
+    parser.add_argument('--balance', type=float, default=START_BALANCE)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Mean of an extra exponential delay (tail latency)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--weight-limit', type=int, default=WEIGHT_PER_MINUTE, help="Request weight per minute before 429s")
+    parser.add_argument('--ack-orders', action='store_true',
+                        help="Answer market orders with status NEW (fill visible on query), like Binance often does")
+    parser.add_argument('--load-test', action='store_true', help="Also hammer the server from this process and report")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not data_exists(args.candles):
+        raise SystemExit(f"❌ {args.candles} not found. Run data_miner.py first.")
+    mock = MockExchange(load_candles(args.candles), args.symbols, args.balance, args.start_bar, args.speed,
+                        args.latency, args.jitter, args.error_rate, args.weight_limit, ack_orders=args.ack_orders)
+    url = mock.serve(args.port)
+    print(f"🧪 Mock exchange at {url} ({', '.join(args.symbols)}) | metrics: {url}/metrics")
+    print(f"   Point the swarm at it: python main_swarm.py --exchange-url {url}")
+    if args.load_test:
+        print_load_report(load_test(url, args.clients, args.seconds, args.symbols[0]))
+        for line in mock.metrics.summary():
+            print("    [server] " + line)
+    else:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            mock.shutdown()
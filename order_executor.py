@@ -0,0 +1,265 @@
+import math
+import time
+import queue
+import logging
+import threading
+from contextlib import nullcontext
+from decimal import Decimal
+from collections import namedtuple, deque
+from metrics import METRICS
+
+# ==========================================
+#        ORDER EXECUTOR
+# ==========================================
+# The signal -> order path, cut down to the one round-trip that places the order:
+#   - every risk tier's order is sized ahead of time, on the sender thread, from the
+#     cached balance, the last price and the market's lot rules (step, min/max qty,
+#     min notional), and re-sized only when the balance or the price moves
+#   - submit() hands the order to the sender thread and returns, so the decision
+#     loop never waits on the exchange or on an account refresh
+#   - fills are confirmed on a second thread with its own exchange instance (the ack,
+#     or fetch_order until the exchange reports the order done) and then applied to
+#     the AccountState
+# Every order reports signal -> request sent and request sent -> exchange ack.
+
+RISK_TIERS = ("0.5%", "1.0%", "2.0%")
+MIN_ORDER_USD = 10.0        # Smallest position we open (and the balance below which we stop trading)
+CONFIRM_INTERVAL = 0.5      # Seconds between fetch_order polls while an order is not done
+CONFIRM_TIMEOUT = 30        # Then give up on it and let the account refresh find out
+LATENCY_HISTORY = 100       # Per-order latencies kept for reports
+DONE_STATUSES = ('closed', 'canceled', 'expired', 'rejected')
+
+PreparedOrder = namedtuple('PreparedOrder', ['symbol', 'tier', 'amount', 'price', 'notional', 'balance'])
+OrderLatency = namedtuple('OrderLatency', ['order_id', 'symbol', 'tier', 'amount', 'to_send', 'round_trip'])
+
+def tier_fraction(tier):
+    """'1.0%' -> 0.01"""
+    return float(tier.split('%')[0]) / 100
+
+def round_step(amount, step, up=False):
+    """amount as a whole number of lot steps (rounded down unless up=True), without float dust."""
+    steps = math.ceil(amount / step - 1e-9) if up else math.floor(amount / step + 1e-9)
+    decimals = max(0, -Decimal(repr(step)).normalize().as_tuple().exponent)
+    return round(steps * step, decimals)
+
+def size_order(balance, price, fraction, market=None):
+    """
+    Base amount for `fraction` of `balance` (at least MIN_ORDER_USD) at `price`. With a
+    ccxt market it is rounded down to the lot step, then raised to the minimum quantity
+    and minimum notional and capped at the market order maximum.
+    """
+    amount = max(balance * fraction, MIN_ORDER_USD) / price
+    if market is None:
+        return amount
+    limits = market.get('limits') or {}
+    qty_limits = {**(limits.get('amount') or {}), **{k: v for k, v in (limits.get('market') or {}).items() if v}}
+    step = (market.get('precision') or {}).get('amount')
+    min_cost = (limits.get('cost') or {}).get('min') or 0
+
+    if step:
+        amount = round_step(amount, step)
+    amount = max(amount, qty_limits.get('min') or 0)
+    if amount * price < min_cost:
+        amount = round_step(min_cost / price, step, up=True) if step else min_cost / price
+    if qty_limits.get('max'):
+        amount = min(amount, qty_limits['max'])
+    return amount
+
+def is_done(order):
+    """Nothing more will fill. No status at all = a synchronous fill (paper / stand-in exchanges)."""
+    status = order.get('status')
+    return status is None or status in DONE_STATUSES
+
+class OrderExecutor:
+    """
+    Pre-sized market buys per (symbol, risk tier), sized, sent and confirmed off the
+    caller's thread. ccxt instances are not thread-safe: give it its own `exchange` for
+    the sender and a second `confirm_exchange` for the confirmer. Without one, the two
+    threads take turns on `exchange`.
+    """
+
+    def __init__(self, exchange, account, tiers=RISK_TIERS, journal=None,
+                 confirm_interval=CONFIRM_INTERVAL, confirm_timeout=CONFIRM_TIMEOUT, confirm_exchange=None):
+        self.exchange = exchange
+        self.confirm_exchange = confirm_exchange or exchange
+        self._exchange_lock = threading.Lock() if confirm_exchange is None else nullcontext()
+        self.account = account
+        self.tiers = tuple(tiers)
+        self.journal = journal
+        self.confirm_interval = confirm_interval
+        self.confirm_timeout = confirm_timeout
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self._prepared = {}             # (symbol, tier) -> PreparedOrder
+        self._inputs = {}               # symbol -> (balance, price) the prepared orders were sized from
+        self._pending = set()           # Symbols with an order sent but its fill not applied yet
+        self._send_queue = queue.Queue()    # ('prepare', symbol) and ('send', symbol, tier, signal_at)
+        self._confirm_queue = queue.Queue()
+        self._threads = [threading.Thread(target=self._send_loop, name="order-sender", daemon=True),
+                         threading.Thread(target=self._confirm_loop, name="order-confirm", daemon=True)]
+        self.log = logging.getLogger()
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._send_queue.put(None)
+        self._confirm_queue.put(None)
+
+    @property
+    def busy(self):
+        """An order is queued, in flight or waiting for its fill."""
+        return bool(self._pending)
+
+    # --- Sizing (sender thread) ---
+    def _market(self, symbol):
+        try:
+            return self.exchange.market(symbol)
+        except Exception:
+            return None     # No markets loaded (stand-in exchanges): unrounded amounts
+
+    def prepare(self, symbol):
+        """
+        Asks the sender thread to re-size every tier for `symbol` (the balance and price
+        reads may block, so never on the caller's thread). Returns at once.
+        """
+        self._send_queue.put(('prepare', symbol))
+
+    def _prepare(self, symbol):
+        """Re-sizes every tier for `symbol` if the balance or the price changed since the last call."""
+        inputs = (self.account.balance(), self.account.last_price(symbol))
+        if self._inputs.get(symbol) == inputs:
+            return
+        balance, price = inputs
+        market = self._market(symbol)
+        for tier in self.tiers:
+            self._prepared[(symbol, tier)] = self._size(symbol, tier, balance, price, market)
+        self._inputs[symbol] = inputs
+
+    def _size(self, symbol, tier, balance, price, market):
+        amount = size_order(balance, price, tier_fraction(tier), market)
+        return PreparedOrder(symbol, tier, amount, price, amount * price, balance)
+
+    def prepared(self, symbol, tier):
+        """The ready order for (symbol, tier); re-sized first only if its inputs moved. Blocking."""
+        self._prepare(symbol)
+        order = self._prepared.get((symbol, tier))
+        if order is None:       # Not one of our tiers: size it now
+            order = self._size(symbol, tier, *self._inputs[symbol], self._market(symbol))
+        return order
+
+    # --- Signal path ---
+    def submit(self, symbol, tier, signal_at=None):
+        """
+        Queues the `tier` order for `symbol` and returns without waiting: True if queued,
+        None if not. Only already-sized orders are read here; the sender thread sends the
+        prepared order (sizing it first if it is missing or out of date).
+        signal_at: time.perf_counter() when the signal fired.
+        """
+        signal_at = signal_at or time.perf_counter()
+        if symbol in self._pending or self.account.has_position(symbol):
+            METRICS.inc('skipped_position_open')
+            self.log.info("⚠️ Signal ignored: Position already open.")
+            return None
+        order = self._prepared.get((symbol, tier))
+        if order is not None and order.balance < MIN_ORDER_USD:
+            self._skip_low_balance()
+            return None
+        self._pending.add(symbol)
+        self._send_queue.put(('send', symbol, tier, signal_at))
+        return True
+
+    def _skip_low_balance(self):
+        METRICS.inc('skipped_low_balance')
+        self.log.error("❌ Low Balance (< $10). Cannot trade.")
+
+    # --- Sender thread ---
+    def _send_loop(self):
+        while True:
+            item = self._send_queue.get()
+            if item is None:
+                return
+            try:
+                if item[0] == 'prepare':
+                    self._prepare(item[1])
+                else:
+                    self._send(*item[1:])
+            except Exception as e:
+                if item[0] == 'send':
+                    self._pending.discard(item[1])
+                    METRICS.inc('order_errors')
+                self.log.error(f"❌ Order sizing failed for {item[1]}: {e}")
+
+    def _send(self, symbol, tier, signal_at):
+        order = self.prepared(symbol, tier)
+        if order.balance < MIN_ORDER_USD:
+            self._pending.discard(symbol)
+            self._skip_low_balance()
+            return
+        self.log.info(f"🚀 EXECUTING: BUY {order.amount:.5f} {symbol.split('/')[0]} (~${order.notional:.2f})")
+        sent_at = time.perf_counter()
+        try:
+            with self._exchange_lock:
+                response = self.exchange.create_order(order.symbol, 'market', 'buy', order.amount)
+        except Exception as e:
+            self._pending.discard(order.symbol)
+            METRICS.inc('order_errors')
+            self.log.error(f"❌ EXECUTION FAILED: {e}")
+            return
+        acked_at = time.perf_counter()
+
+        latency = OrderLatency(response['id'], order.symbol, order.tier, order.amount,
+                               sent_at - signal_at, acked_at - sent_at)
+        self.latencies.append(latency)
+        METRICS.observe('signal_to_order', latency.to_send)
+        METRICS.observe('create_order', latency.round_trip)
+        METRICS.inc('orders')
+        self.log.info(f"✅ ORDER SENT! ID: {latency.order_id} | signal -> sent {latency.to_send * 1000:.2f} ms, "
+                      f"round-trip {latency.round_trip * 1000:.1f} ms")
+        if self.journal is not None:
+            self.journal.record('order', s=order.symbol, side='buy', amount=order.amount, price=order.price)
+        self._confirm_queue.put([order, response, time.monotonic() + self.confirm_timeout])
+
+    # --- Confirmation thread ---
+    def _confirm_loop(self):
+        outstanding = []
+        while True:
+            try:
+                item = self._confirm_queue.get(timeout=self.confirm_interval if outstanding else None)
+                if item is None:
+                    return
+                outstanding.append(item)
+            except queue.Empty:
+                pass
+            outstanding = [item for item in outstanding if not self._check(item)]
+
+    def _check(self, item):
+        """One look at an unconfirmed order. True = settled (filled, dead or given up on)."""
+        order, response, deadline = item
+        if not is_done(response):
+            if time.monotonic() > deadline:
+                self._pending.discard(order.symbol)
+                METRICS.inc('orders_unconfirmed')
+                self.log.error(f"❌ Order {response['id']} not confirmed after {self.confirm_timeout}s, "
+                               f"leaving it to the account refresh.")
+                self.account.request_refresh()
+                return True
+            try:
+                with self._exchange_lock:
+                    response = item[1] = self.confirm_exchange.fetch_order(response['id'], order.symbol)
+            except Exception as e:
+                self.log.warning(f"[Orders] Fill check for {response['id']} failed: {e}")
+                return False
+            if not is_done(response):
+                return False
+
+        filled = float(response.get('filled') or 0)
+        if filled > 0:
+            self.account.on_fill(order.symbol, 'buy', filled, float(response.get('average') or order.price))
+            self.log.info(f"✅ ORDER FILLED! ID: {response['id']} ({filled:.5f} {order.symbol.split('/')[0]})")
+        else:
+            METRICS.inc('order_errors')
+            self.log.error(f"❌ Order {response['id']} ended {response.get('status')} with nothing filled.")
+        self._pending.discard(order.symbol)     # After on_fill: has_position() takes over the guard
+        return True
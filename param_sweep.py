@@ -0,0 +1,107 @@
+import os
+import time
+import random
+import argparse
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from market_data import load_candles, load_columns, columnar_path, save_columnar
+from vector_backtest import run_vector_backtest
+
+# --- CONFIGURATION ---
+DATA_FILE = 'btc_futures_15m_3years.csv'
+RESULTS_FILE = 'sweep_results.csv'
+START_CASH = 10000.0
+
+# FVGStrategy.params + the gap-size noise filter
+DEFAULT_GRID = {
+    'risk_reward': [1.0, 1.5, 2.0, 2.5, 3.0],
+    'risk_per_trade': [0.005, 0.01, 0.02, 0.03],
+    'sma_period': [20, 50, 100, 200],
+    'min_gap': [0.0002, 0.0005, 0.001],
+}
+
+def grid_combos(grid):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def random_combos(grid, budget, seed=0):
+    """`budget` distinct combos drawn from the grid (random search)."""
+    combos = grid_combos(grid)
+    return random.Random(seed).sample(combos, min(budget, len(combos)))
+
+def summarize(result, cash=START_CASH):
+    equity = result.equity
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    max_drawdown = float(np.max(1 - equity / peak)) if len(equity) else 0.0
+    closed = [t for t in result.trades if t.pnl is not None]
+    wins = sum(1 for t in closed if t.pnl > 0)
+    return {
+        'return_pct': (result.final_value / cash - 1) * 100,
+        'max_drawdown_pct': max_drawdown * 100,
+        'trades': len(result.trades),
+        'win_rate_pct': wins / len(closed) * 100 if closed else 0.0,
+        'final_value': result.final_value,
+    }
+
+# --- WORKER SIDE ---
+# Each worker maps the columnar dataset once (shared pages, no parsing) and reuses it for every combo.
+_columns = None
+
+def _init_worker(cols_path):
+    global _columns
+    _columns = load_columns(cols_path)
+
+def _run_combo(params):
+    result = run_vector_backtest(_columns['open'], _columns['high'], _columns['low'], _columns['close'],
+                                 cash=START_CASH, **params)
+    return {**params, **summarize(result)}
+
+def run_sweep(csv_file, combos, workers=None):
+    """Backtests every combo across a process pool and returns one results table."""
+    cols_path = columnar_path(csv_file)
+    tmp_dir = None
+    if not os.path.isdir(cols_path):
+        # No columnar copy yet: parse the CSV once here and let the workers map a temporary one
+        df = load_candles(csv_file)
+        tmp_dir = tempfile.TemporaryDirectory()
+        cols_path = os.path.join(tmp_dir.name, 'candles.cols')
+        save_columnar(df, cols_path)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cols_path,)) as pool:
+            rows = list(pool.map(_run_combo, combos, chunksize=max(1, len(combos) // ((workers or os.cpu_count() or 1) * 8))))
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    return pd.DataFrame(rows).sort_values('return_pct', ascending=False).reset_index(drop=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parameter sweep for the FVG strategy (vectorized engine).")
+    parser.add_argument('--data', default=DATA_FILE)
+    parser.add_argument('--out', default=RESULTS_FILE)
+    parser.add_argument('--workers', type=int, default=None, help="Processes (default: CPU core count)")
+    parser.add_argument('--random', type=int, default=0, metavar='N',
+                        help="Random search: run N combos sampled from the grid instead of all of them")
+    parser.add_argument('--seed', type=int, default=0)
+    for name, values in DEFAULT_GRID.items():
+        kind = int if name == 'sma_period' else float
+        parser.add_argument(f"--{name.replace('_', '-')}", type=kind, nargs='+', default=values)
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    grid = {name: getattr(args, name) for name in DEFAULT_GRID}
+    combos = random_combos(grid, args.random, args.seed) if args.random else grid_combos(grid)
+
+    print(f"--- SWEEP: {len(combos)} combos on {args.data} ---")
+    start = time.perf_counter()
+    results = run_sweep(args.data, combos, args.workers)
+    elapsed = time.perf_counter() - start
+
+    results.to_csv(args.out, index=False)
+    print(results.head(10).to_string(index=False))
+    print(f"\n✅ {len(combos)} backtests in {elapsed:.1f}s. Results saved to: {args.out}")
@@ -0,0 +1,250 @@
+import time
+import json
+import hashlib
+import argparse
+import main_swarm
+from candle_buffer import CandleBuffer
+from account_state import AccountSnapshot
+from sentinel_agent import BiasSnapshot
+from journal import read_journal
+from market_data import load_candles, data_exists, index_to_ms
+
+# ==========================================
+#        REPLAY DRIVER
+# ==========================================
+# Feeds a journal (python main_swarm.py --record ...) or a historical candle file
+# back through main_swarm.process_candles: the same Sniper -> Sentinel -> Risk Boss
+# -> execute_trade code as live, with the clock, the Sentinel, the account and the
+# exchange swapped for in-memory stand-ins. No sleeps, no network, no threads:
+# the same input always gives the same decisions, as fast as the CPU allows.
+# Time is the replay clock (the journal record's / the bar's timestamp): the
+# Sentinel's journaled news ages on it exactly like SentinelWorker's snapshot.
+
+START_BALANCE = 10000.0
+DECISIONS_FILE = 'replay_decisions.jsonl'
+
+class VirtualClock:
+    """Replay time: set to each record's (or bar's) timestamp before it is applied."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+class ReplaySentinel:
+    """
+    SentinelWorker stand-in: one published BiasSnapshot, read on the replay clock.
+    Journaled 'news' records publish their bias at their own time, 'bias' records
+    restore the snapshot a live read saw. A bias pinned by the caller never ages.
+    """
+
+    def __init__(self, clock, bias="NEUTRAL", stale_after=2 * main_swarm.NEWS_INTERVAL):
+        self.clock = clock
+        self.stale_after = stale_after
+        self._snapshot = BiasSnapshot(bias, None, 0.0)      # updated_at None = pinned
+
+    def publish(self, bias, updated_at=None):
+        self._snapshot = BiasSnapshot(bias, self.clock.time() if updated_at is None else updated_at, 0.0)
+
+    def set(self, bias, age):
+        """A journaled read: the bias was `age` seconds old (None = never updated) at the clock's now."""
+        self.publish(bias, 0.0 if age is None else self.clock.time() - age)
+
+    def read(self, now=None):
+        snap = self._snapshot
+        if snap.updated_at is None:
+            return snap.bias, 0.0, False
+        now = self.clock.time() if now is None else now
+        age = now - snap.updated_at if snap.updated_at else float('inf')
+        return snap.bias, age, age > self.stale_after
+
+    def is_alive(self):
+        return True
+
+class ReplayAccount:
+    """
+    AccountState stand-in: balance/positions from the journal (or a start balance),
+    last prices from the replayed candles. With track_positions=False every signal
+    is treated as if the book were flat, so long replays keep exercising the order path.
+    """
+
+    def __init__(self, clock, balance=START_BALANCE, track_positions=True):
+        self.clock = clock
+        self.track_positions = track_positions
+        self._snapshot = AccountSnapshot(balance, {}, clock.time())
+        self._prices = {}
+
+    def set(self, balance, positions):
+        self._snapshot = AccountSnapshot(balance, dict(positions), self.clock.time())
+
+    def snapshot(self):
+        return self._snapshot
+
+    def balance(self):
+        return self._snapshot.balance
+
+    def has_position(self, symbol):
+        return self.track_positions and symbol in self._snapshot.positions
+
+    def note_price(self, symbol, price):
+        self._prices[symbol] = float(price)
+
+    def last_price(self, symbol):
+        return self._prices[symbol]
+
+    def on_fill(self, symbol, side, amount, price):
+        if not self.track_positions:
+            return
+        snap = self._snapshot
+        positions = dict(snap.positions)
+        positions[symbol] = positions.get(symbol, 0.0) + amount
+        self._snapshot = AccountSnapshot(max(snap.balance - amount * price, 0.0), positions, snap.updated_at)
+
+class PaperExchange:
+    """create_order fills at once at the account's last price. Nothing leaves the process."""
+
+    def __init__(self, account):
+        self.account = account
+        self.orders = []
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        fill_price = self.account.last_price(symbol)
+        order = {'id': str(len(self.orders) + 1), 'symbol': symbol, 'side': side,
+                 'filled': amount, 'average': fill_price}
+        self.orders.append(order)
+        return order
+
+class Replay:
+    """Swaps main_swarm's globals for replay stand-ins and drives process_candles."""
+
+    def __init__(self, symbol=main_swarm.SYMBOL, balance=START_BALANCE, track_positions=True, bias="NEUTRAL"):
+        self.symbol = symbol
+        self.clock = VirtualClock()
+        self.candles = CandleBuffer(main_swarm.CANDLE_HISTORY)
+        self.sentinel = ReplaySentinel(self.clock, bias)
+        self.account = ReplayAccount(self.clock, balance, track_positions)
+        self.exchange = PaperExchange(self.account)
+        self.decisions = []
+        self._saved = None
+
+    def __enter__(self):
+        names = ['exchange', 'risk_model', 'sentinel', 'account', 'journal', 'executor']
+        self._saved = {name: getattr(main_swarm, name) for name in names}
+        risk_model = main_swarm.risk_model or main_swarm.load_risk_brain()
+        main_swarm.exchange = self.exchange
+        main_swarm.risk_model = risk_model
+        main_swarm.sentinel = self.sentinel
+        main_swarm.account = self.account
+        main_swarm.journal = None
+        main_swarm.executor = None          # Orders fill inline, in decision order
+        return self
+
+    def __exit__(self, *exc):
+        for name, value in self._saved.items():
+            setattr(main_swarm, name, value)
+
+    def update(self, rows):
+        self.candles.update(rows)
+        main_swarm.note_last_price(self.candles, self.symbol)
+
+    def scan(self, has_forming_bar):
+        n_orders = len(self.exchange.orders)
+        decision = main_swarm.process_candles(self.candles, has_forming_bar)
+        if decision is not None:
+            order = self.exchange.orders[-1] if len(self.exchange.orders) > n_orders else None
+            self.decisions.append({
+                't': self.clock.now, 'bar': int(self.candles.timestamp[-1]), 'decision': decision,
+                'amount': order['filled'] if order else None,
+            })
+        return decision
+
+def replay_journal(path, **kwargs):
+    """
+    Replays a recorded journal. Returns (replay, live_decisions): the replay's own
+    decisions are in replay.decisions, the ones the live loop journaled are returned
+    alongside so the two can be diffed.
+    """
+    live = []
+    with Replay(**kwargs) as replay:
+        for record in read_journal(path):
+            replay.clock.now = record['t']
+            kind = record['k']
+            if kind == 'candles' and record['s'] == replay.symbol:
+                replay.update(record['rows'])
+            elif kind == 'news':
+                replay.sentinel.publish(record['bias'])
+            elif kind == 'bias':
+                replay.sentinel.set(record['bias'], record['age'])
+            elif kind == 'account':
+                replay.account.set(record['balance'], record['positions'])
+            elif kind == 'scan' and record['s'] == replay.symbol:
+                replay.scan(record['f'])
+            elif kind == 'decision':
+                live.append(record['decision'])
+    return replay, live
+
+def replay_candles(source, limit=None, **kwargs):
+    """
+    Replays a historical candle file (or an OHLCV DataFrame) as a stream of candle
+    closes: process_candles(..., has_forming_bar=False) once per bar.
+    """
+    df = load_candles(source) if isinstance(source, str) else source
+    if limit:
+        df = df.iloc[-limit:]
+    rows = [[int(t)] + row for t, row in zip(index_to_ms(df.index),
+                                             df[['open', 'high', 'low', 'close', 'volume']].values.tolist())]
+    kwargs.setdefault('track_positions', False)
+    with Replay(**kwargs) as replay:
+        for row in rows:
+            replay.clock.now = row[0] / 1000
+            replay.update([row])
+            replay.scan(has_forming_bar=False)
+    return replay, len(rows)
+
+def decisions_digest(decisions):
+    """sha256 over the decision list: equal digests = identical replays."""
+    h = hashlib.sha256()
+    for decision in decisions:
+        h.update(json.dumps(decision, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+def write_decisions(decisions, path):
+    with open(path, 'w') as f:
+        for decision in decisions:
+            f.write(json.dumps(decision) + '\n')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay recorded or historical inputs through the swarm's decision code.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--journal', help="Journal written by main_swarm.py --record")
+    source.add_argument('--candles', help="Historical candle CSV (its columnar copy is used when present)")
+    parser.add_argument('--limit', type=int, default=None, help="Only the last N candles of --candles")
+    parser.add_argument('--bias', default="NEUTRAL", help="Sentinel bias for --candles replays")
+    parser.add_argument('--balance', type=float, default=START_BALANCE)
+    parser.add_argument('--out', default=DECISIONS_FILE)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = time.perf_counter()
+    if args.journal:
+        replay, live = replay_journal(args.journal, balance=args.balance)
+        scans = None
+    else:
+        if not data_exists(args.candles):
+            raise SystemExit(f"❌ {args.candles} not found.")
+        replay, scans = replay_candles(args.candles, args.limit, balance=args.balance, bias=args.bias)
+        live = None
+    elapsed = time.perf_counter() - start
+
+    write_decisions(replay.decisions, args.out)
+    print(f"--- REPLAY: {len(replay.decisions)} decisions, {len(replay.exchange.orders)} paper orders ---")
+    if scans:
+        print(f"{scans:,} bars in {elapsed:.2f}s = {scans / elapsed:,.0f} decision passes/sec")
+    print(f"Digest: {decisions_digest(replay.decisions)}")
+    if live is not None:
+        replayed = [d['decision'] for d in replay.decisions]
+        mismatches = sum(a != b for a, b in zip(live, replayed)) + abs(len(live) - len(replayed))
+        print(f"Live vs replay: {len(live)} vs {len(replayed)} decisions, {mismatches} mismatches")
+    print(f"✅ Decisions saved to: {args.out}")
@@ -0,0 +1,234 @@
+import time
+import random
+import heapq
+import logging
+import threading
+import itertools
+import requests
+from requests.adapters import HTTPAdapter
+from metrics import METRICS
+
+# ==========================================
+#        REQUEST LAYER
+# ==========================================
+# Every outbound call of the live swarm goes through here:
+#   - keep-alive requests.Session pools (no new TLS handshake per call)
+#   - explicit (connect, read) timeouts
+#   - retries with jittered exponential backoff (Retry-After honoured)
+#   - one PriorityScheduler per API budget: when the weight budget runs short,
+#     waiting requests are served by priority, and a small reserve is kept
+#     that only order placement may spend.
+
+log = logging.getLogger()
+
+# --- PRIORITIES (lower = served first) ---
+PRIORITY_ORDER = 0          # create/cancel orders
+PRIORITY_MARKET_DATA = 1    # candles / prices the next decision depends on
+PRIORITY_ACCOUNT = 2        # balance + position polling, heartbeat
+PRIORITY_NEWS = 3           # Sentinel headlines
+PRIORITY_BACKFILL = 4       # data_miner history downloads: only spare weight
+
+# --- BUDGETS ---
+EXCHANGE_WEIGHT_PER_MINUTE = 1200   # Half of Binance Futures' 2400/min (headroom for a second process on the same IP)
+ORDER_RESERVE = 20                  # Weight only PRIORITY_ORDER may dip into
+NEWS_REQUESTS_PER_MINUTE = 10       # CryptoPanic is a separate API with its own small quota
+
+# --- TIMEOUTS / RETRIES ---
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+RETRY_STATUS = {418, 429, 500, 502, 503, 504}
+POOL_SIZE = 16                      # Keep-alive connections per host (universe fetchers run 16 threads)
+
+def klines_weight(limit):
+    """Binance Futures request weight of one klines call."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """'Full jitter' backoff: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def make_session(pool_size=POOL_SIZE):
+    """requests.Session with a keep-alive pool big enough for our worker threads (retries are ours, not urllib3's)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class PriorityScheduler:
+    """
+    Token bucket in API 'weight' units per minute, shared by every thread.
+    When the bucket cannot cover a request, callers queue and are served
+    strictly by (priority, arrival). Non-order requests also leave `reserve`
+    weight untouched, so an order never waits behind polling.
+    """
+
+    def __init__(self, weight_per_minute=EXCHANGE_WEIGHT_PER_MINUTE, reserve=0, burst_seconds=10):
+        self.rate = weight_per_minute / 60.0
+        self.capacity = self.rate * burst_seconds
+        self.reserve = reserve
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._queue = []                # (priority, seq, weight)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _needed(self, priority, weight):
+        return weight + (self.reserve if priority > PRIORITY_ORDER else 0)
+
+    def acquire(self, weight=1, priority=PRIORITY_MARKET_DATA):
+        """Blocks until this request may go out. Returns the seconds spent waiting."""
+        start = time.monotonic()
+        with self._cond:
+            entry = (priority, next(self._seq), weight)
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._queue[0] is entry and self.tokens >= self._needed(priority, weight):
+                        heapq.heappop(self._queue)
+                        self.tokens -= weight
+                        self._cond.notify_all()     # The next in line may fit as well
+                        return time.monotonic() - start
+                    head_priority, _, head_weight = self._queue[0]
+                    wait = (self._needed(head_priority, head_weight) - self.tokens) / self.rate
+                    self._cond.wait(max(wait, 0.001))
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    def penalize(self, seconds):
+        """The API told us to slow down: drain the bucket for a while."""
+        with self._cond:
+            self._refill()
+            self.tokens -= seconds * self.rate
+
+    @property
+    def waiting(self):
+        return len(self._queue)
+
+class HttpClient:
+    """
+    Pooled, scheduled, retrying HTTP client for plain REST APIs (the Sentinel's news
+    feed and LLM). scheduler=None: no request budget (local services).
+    """
+
+    def __init__(self, scheduler, session=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES):
+        self.scheduler = scheduler
+        self.session = session or make_session()
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def request(self, method, url, priority=PRIORITY_NEWS, weight=1, stage='http', **kwargs):
+        """
+        Returns the response of the first attempt that is not a retryable status.
+        After the last retry, returns the last response or re-raises the last network error.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.max_retries + 1):
+            if self.scheduler is not None:
+                self.scheduler.acquire(weight, priority)
+            try:
+                with METRICS.time(stage):
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                METRICS.inc('http_retries')
+                log.warning(f"[HTTP] {type(e).__name__} on {method} {url.split('?')[0]}, retrying")
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                return response
+            METRICS.inc('http_retries')
+            delay = backoff_delay(attempt)
+            if response.status_code in (418, 429):
+                retry_after = float(response.headers.get('Retry-After') or 0)
+                if self.scheduler is not None:
+                    self.scheduler.penalize(retry_after)
+                delay = max(delay, retry_after)
+            log.warning(f"[HTTP] {response.status_code} from {url.split('?')[0]}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+# ==========================================
+#        SCHEDULED CCXT EXCHANGE
+# ==========================================
+# method -> (priority, weight, idempotent). fetch_ohlcv's weight depends on `limit`.
+ENDPOINTS = {
+    'create_order': (PRIORITY_ORDER, 1, False),
+    'cancel_order': (PRIORITY_ORDER, 1, True),
+    'fetch_order': (PRIORITY_ORDER, 1, True),
+    'fetch_ohlcv': (PRIORITY_MARKET_DATA, None, True),
+    'fetch_ticker': (PRIORITY_MARKET_DATA, 1, True),
+    'fetch_tickers': (PRIORITY_MARKET_DATA, 40, True),
+    'load_markets': (PRIORITY_MARKET_DATA, 10, True),
+    'fetch_balance': (PRIORITY_ACCOUNT, 5, True),
+    'fetch_positions': (PRIORITY_ACCOUNT, 5, True),
+}
+
+class ScheduledExchange:
+    """
+    Wraps a ccxt exchange (created with enableRateLimit=False) so the calls in
+    ENDPOINTS wait for the shared PriorityScheduler and retry transient errors.
+    Orders are never retried blindly: a timeout may still have placed them.
+    Everything else (markets, urls, set_markets, ...) passes straight through.
+    """
+
+    def __init__(self, exchange, scheduler, max_retries=MAX_RETRIES):
+        import ccxt
+        self._errors = ccxt
+        self.exchange = exchange
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+
+    def __getattr__(self, name):
+        attr = getattr(self.exchange, name)
+        if name not in ENDPOINTS:
+            return attr
+        priority, weight, idempotent = ENDPOINTS[name]
+
+        def scheduled(*args, **kwargs):
+            cost = weight if weight is not None else klines_weight(kwargs.get('limit') or 500)
+            for attempt in range(self.max_retries + 1):
+                self.scheduler.acquire(cost, priority)
+                try:
+                    return attr(*args, **kwargs)
+                except (self._errors.RateLimitExceeded, self._errors.DDoSProtection) as e:
+                    self.scheduler.penalize(30)
+                    error = e
+                except self._errors.NetworkError as e:
+                    if not idempotent:
+                        raise
+                    error = e
+                if attempt == self.max_retries:
+                    raise error
+                METRICS.inc('exchange_retries')
+                log.warning(f"[Exchange] {name} failed ({type(error).__name__}), retrying")
+                time.sleep(backoff_delay(attempt))
+
+        return scheduled
+
+# One budget for everything the swarm sends to the exchange, one for the news API
+EXCHANGE_SCHEDULER = PriorityScheduler(EXCHANGE_WEIGHT_PER_MINUTE, reserve=ORDER_RESERVE)
+NEWS_SCHEDULER = PriorityScheduler(NEWS_REQUESTS_PER_MINUTE, burst_seconds=30)
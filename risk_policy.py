@@ -0,0 +1,132 @@
+import os
+import logging
+import argparse
+import numpy as np
+
+log = logging.getLogger()
+
+# --- CONFIGURATION ---
+RISK_MODEL_PATH = "risk_agent_v1.zip"
+RISK_POLICY_PATH = "risk_agent_v1.npz"   # Torch-free export used by the live loop (written by training)
+
+ACTIVATIONS = {
+    'Tanh': np.tanh,
+    'ReLU': lambda x: np.maximum(x, 0),
+}
+
+def export_policy(model_path=RISK_MODEL_PATH, out_path=RISK_POLICY_PATH):
+    """
+    Pulls the deterministic actor out of a stable-baselines3 PPO zip:
+    mlp_extractor.policy_net (Linear + activation layers) followed by action_net.
+    The value head is not needed to pick an action and is left out.
+    """
+    import torch
+    from stable_baselines3 import PPO
+
+    model = PPO.load(model_path, device='cpu')
+    policy = model.policy
+    arrays = {}
+    n_hidden = 0
+    activation = None
+    for layer in policy.mlp_extractor.policy_net:
+        if isinstance(layer, torch.nn.Linear):
+            arrays[f'w{n_hidden}'] = layer.weight.detach().numpy().T.astype(np.float32)
+            arrays[f'b{n_hidden}'] = layer.bias.detach().numpy().astype(np.float32)
+            n_hidden += 1
+        else:
+            activation = type(layer).__name__
+    if activation not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation in policy_net: {activation}")
+
+    arrays['w_out'] = policy.action_net.weight.detach().numpy().T.astype(np.float32)
+    arrays['b_out'] = policy.action_net.bias.detach().numpy().astype(np.float32)
+    np.savez(out_path, n_hidden=n_hidden, activation=activation, **arrays)
+    return model
+
+class NumpyPolicy:
+    """
+    Forward pass of the exported actor in plain NumPy (float32, like torch).
+    predict() mirrors PPO.predict(obs, deterministic=True): (action, None), for one
+    observation of shape (4,) or a batch of shape (N, 4).
+    """
+
+    def __init__(self, path=RISK_POLICY_PATH):
+        data = np.load(path)
+        n_hidden = int(data['n_hidden'])
+        self.layers = [(data[f'w{i}'], data[f'b{i}']) for i in range(n_hidden)]
+        self.w_out = data['w_out']
+        self.b_out = data['b_out']
+        self.activation = ACTIVATIONS[str(data['activation'])]
+
+    def logits(self, obs):
+        x = np.asarray(obs, dtype=np.float32)
+        for w, b in self.layers:
+            x = self.activation(x @ w + b)
+        return x @ self.w_out + self.b_out
+
+    def predict(self, obs, deterministic=True):
+        obs = np.asarray(obs, dtype=np.float32)
+        actions = self.logits(obs.reshape(-1, obs.shape[-1])).argmax(axis=-1)
+        if obs.ndim == 1:
+            return actions[0], None
+        return actions, None
+
+def policy_source(policy_path=RISK_POLICY_PATH, model_path=RISK_MODEL_PATH):
+    """
+    The file to load: the NumPy export, unless the PPO zip is newer (retrained since the
+    export), then the zip itself. None if neither exists.
+    """
+    has_policy, has_model = os.path.exists(policy_path), os.path.exists(model_path)
+    if has_policy and has_model and os.path.getmtime(policy_path) < os.path.getmtime(model_path):
+        log.warning(f"[System] {policy_path} is older than {model_path}: loading the PPO model instead. "
+                    f"Re-export it with: python risk_policy.py")
+        return model_path
+    if has_policy:
+        return policy_path
+    return model_path if has_model else None
+
+def load_risk_policy(policy_path=RISK_POLICY_PATH, model_path=RISK_MODEL_PATH):
+    """
+    (policy, source path): the NumPy policy when its export is current, otherwise the
+    full PPO model (needs torch). (None, None) if neither exists.
+    """
+    source = policy_source(policy_path, model_path)
+    if source == policy_path:
+        return NumpyPolicy(policy_path), source
+    if source == model_path:
+        from stable_baselines3 import PPO
+        return PPO.load(model_path, device='auto'), source
+    return None, None
+
+def random_observations(n, seed=0):
+    """Realistic feature ranges plus a share of wide outliers."""
+    rng = np.random.default_rng(seed)
+    realistic = np.column_stack([
+        rng.normal(1.0, 0.01, n),            # Price vs SMA20
+        rng.uniform(0.0, 1.5, n),            # Log volume / 10
+        rng.normal(0.0, 0.5, n),             # Momentum %
+        np.abs(rng.normal(0.0, 0.5, n)),     # Volatility %
+    ])
+    wide = rng.normal(0.0, 5.0, (n // 4, 4))
+    return np.vstack([realistic, wide]).astype(np.float32)
+
+def check_parity(model, policy, n=100_000):
+    """The NumPy argmax must equal PPO.predict(deterministic=True) on every observation."""
+    obs = random_observations(n)
+    expected, _ = model.predict(obs, deterministic=True)
+    actual, _ = policy.predict(obs)
+    mismatches = int(np.sum(expected != actual))
+    single_ok = all(int(model.predict(o, deterministic=True)[0]) == int(policy.predict(o)[0]) for o in obs[:200])
+    if mismatches or not single_ok:
+        raise AssertionError(f"NumPy policy disagrees with PPO on {mismatches}/{len(obs)} observations")
+    print(f"✅ Parity: NumPy policy matches PPO.predict on {len(obs):,} random observations")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the PPO Risk Agent to a torch-free .npz.")
+    parser.add_argument('--model', default=RISK_MODEL_PATH)
+    parser.add_argument('--out', default=RISK_POLICY_PATH)
+    args = parser.parse_args()
+
+    model = export_policy(args.model, args.out)
+    print(f"✅ Exported {args.model} -> {args.out}")
+    check_parity(model, NumpyPolicy(args.out))
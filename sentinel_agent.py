@@ -1,96 +1,402 @@
-import requests
 import warnings
-from langchain_ollama import OllamaLLM
+import threading
+import time
+import math
+import logging
+import json
+import os
+import re
+from datetime import datetime
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from metrics import METRICS
+from request_layer import HttpClient, NEWS_SCHEDULER, PRIORITY_NEWS, CONNECT_TIMEOUT
 import urllib3
 
 # --- CONFIGURATION ---
-API_KEY = ''  
+API_KEY = ''
 CURRENCY = 'BTC'
-MODEL_NAME = "llama3.2" 
+MODEL_NAME = "llama3.2"
+OLLAMA_URL = "http://127.0.0.1:11434"   # Local Ollama server (REST API)
+CACHE_FILE = "sentiment_cache.json"
+CACHE_TTL = 24 * 3600       # Re-score a headline after a day
+CACHE_MAX_ENTRIES = 5000    # LRU eviction beyond this
+BIAS_THRESHOLD = 0.2        # Weighted mean headline score needed to call BULLISH / BEARISH
+NEWS_API_URL = "https://cryptopanic.com/api/developer/v2/posts/"
+
+# --- INGESTION ---
+NEWS_LOOKBACK = 6 * 3600    # Every headline published in the last 6h is scored
+NEWS_MAX_PAGES = 5          # Page cap per refresh (the news API allows 10 requests/min)
+NEWS_PAGE_WORKERS = 4       # Pages fetched at the same time
+NEWS_HALF_LIFE = 2 * 3600   # A headline's weight in the bias halves every 2h
+
+# --- LLM SCORING ---
+LLM_BATCH_SIZE = 10         # Headlines per LLM request
+LLM_CONCURRENCY = 2         # LLM requests in flight at once (Ollama queues the rest anyway)
+LLM_TIMEOUT = 120           # Read timeout of one batch (generation is slow on CPU)
+
+LABEL_SCORES = {"BULLISH": 1.0, "BEARISH": -1.0, "NEUTRAL": 0.0}
 
 # --- DISABLE SSL WARNINGS ---
 # We are turning off the security warnings so your console stays clean
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def get_crypto_news():
-    """Fetches top 5 recent news headlines from CryptoPanic V2 API."""
-    
-    url = (
-        f"https://cryptopanic.com/api/developer/v2/posts/"
+# Keep-alive session + timeouts + retries, paced by the news API's own budget
+news_http = HttpClient(NEWS_SCHEDULER)
+# Ollama is local: no request budget, but only LLM_CONCURRENCY requests at a time
+llm_http = HttpClient(None, timeout=(CONNECT_TIMEOUT, LLM_TIMEOUT), max_retries=1)
+llm_slots = threading.BoundedSemaphore(LLM_CONCURRENCY)
+
+# ==========================================
+#        NEWS INGESTION (PAGINATED)
+# ==========================================
+def news_page_url(page):
+    return (
+        f"{NEWS_API_URL}"
         f"?auth_token={API_KEY}"
         f"&currencies={CURRENCY}"
         f"&kind=news"
         f"&public=true"
+        f"&page={page}"
     )
-    
+
+def parse_time(stamp):
+    """CryptoPanic ISO timestamp ('2024-05-01T12:34:56Z') -> epoch seconds (None if missing)."""
+    if not stamp:
+        return None
+    try:
+        return datetime.fromisoformat(stamp.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+def parse_post(post):
+    # extracting source domain if available
+    source = "Unknown"
+    if 'source' in post and 'domain' in post['source']:
+        source = post['source']['domain']
+    return {'id': post.get('id'), 'title': post['title'], 'source': source,
+            'published_at': parse_time(post.get('published_at'))}
+
+def fetch_news_page(page):
+    """One results page -> (posts, has_next_page), or None if the request failed."""
     try:
-        print(f"Connecting to: {url} ...")
-        
-        # --- THE FIX IS HERE ---
         # verify=False tells Python to ignore the "Expired Certificate" error
-        response = requests.get(url, verify=False)
-        
-        if response.status_code != 200:
-            print(f"API Error! Status: {response.status_code}")
-            return None
-            
-        data = response.json()
-        
-        headlines = []
-        if 'results' in data:
-            for post in data['results'][:5]: 
-                title = post['title']
-                
-                # extracting source domain if available
-                source = "Unknown"
-                if 'source' in post and 'domain' in post['source']:
-                    source = post['source']['domain']
-                
-                headlines.append(f"- [{source}] {title}")
-        
-        return "\n".join(headlines)
-    
+        response = news_http.get(news_page_url(page), verify=False, priority=PRIORITY_NEWS, stage='news_fetch')
     except Exception as e:
         print(f"Critical Error: {e}")
         return None
+    if response.status_code == 404 and page > 1:
+        return [], False        # Past the last page
+    if response.status_code != 200:
+        print(f"API Error! Status: {response.status_code}")
+        return None
+    data = response.json()
+    return [parse_post(post) for post in data.get('results', [])], bool(data.get('next'))
+
+def get_news_posts(lookback=NEWS_LOOKBACK, max_pages=NEWS_MAX_PAGES, workers=NEWS_PAGE_WORKERS, now=None):
+    """
+    Every CryptoPanic post of the last `lookback` seconds as [{'id', 'title', 'source',
+    'published_at'}], newest first. Page 1 tells how much time one page covers; the
+    pages still needed to reach back to the cutoff are then fetched side by side.
+    None if the first page could not be fetched.
+    """
+    cutoff = (now or time.time()) - lookback
+    first = fetch_news_page(1)
+    if first is None:
+        return None
+    posts, has_next = first
+    page = 1
+
+    def oldest():
+        return min((p['published_at'] for p in posts if p['published_at'] is not None), default=cutoff)
+
+    newest = max((p['published_at'] for p in posts if p['published_at'] is not None), default=cutoff)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while has_next and page < max_pages and oldest() > cutoff:
+            per_page = max(newest - oldest(), 1.0) / page       # Seconds of news one page covers
+            needed = math.ceil((oldest() - cutoff) / per_page)
+            wave = range(page + 1, min(page + needed, max_pages) + 1)
+            for result in pool.map(fetch_news_page, wave):      # In page order
+                if result is None:
+                    has_next = False
+                    break
+                page_posts, has_next = result
+                posts += page_posts
+                if not has_next:
+                    break
+            page = wave[-1]
+
+    # Pages shift while we read them (new posts push old ones down): drop repeats
+    seen = set()
+    recent = []
+    for post in posts:
+        key = headline_key(post)
+        if key in seen or (post['published_at'] is not None and post['published_at'] < cutoff):
+            continue
+        seen.add(key)
+        recent.append(post)
+    return recent
+
+def format_headline(post):
+    return f"- [{post['source']}] {post['title']}"
+
+# ==========================================
+#        BATCHED LLM SCORING
+# ==========================================
+# Score: one headline's label + the model's confidence in it (0..1)
+Score = namedtuple('Score', ['label', 'confidence'])
+
+BATCH_PROMPT = """
+    You are a professional Crypto Trading Analyst.
+    Label each of these news headlines by its immediate impact on Bitcoin (BTC):
 
-def analyze_sentiment(headlines):
-    """Sends headlines to Llama 3 for a decision."""
-    # Safety check: if no headlines, return Neutral
-    if not headlines:
-        return "NEUTRAL"
-
-    llm = OllamaLLM(model=MODEL_NAME)
-    
-    prompt = f"""
-    You are a professional Crypto Trading Analyst. 
-    Analyze the following recent news headlines for Bitcoin (BTC):
-    
     {headlines}
-    
-    Based ONLY on these headlines, determine the immediate market sentiment.
-    You must respond with EXACTLY one word: "BULLISH", "BEARISH", or "NEUTRAL".
-    Do not explain. Just the word.
+
+    Respond with JSON only, one entry per headline number:
+    {{"labels": [{{"id": 1, "label": "BULLISH" | "BEARISH" | "NEUTRAL", "confidence": 0.0 to 1.0}}]}}
     """
-    
-    print("\n--- AI Thinking... ---")
+
+def parse_bias(raw_sentiment):
+    """LLM answer -> "BULLISH" / "BEARISH" / "NEUTRAL"."""
+    if "BULLISH" in raw_sentiment: return "BULLISH"
+    if "BEARISH" in raw_sentiment: return "BEARISH"
+    return "NEUTRAL"
+
+def parse_labels(text, n_headlines):
+    """
+    The LLM's JSON ({"labels": [...]} or a bare list) -> {headline index: Score}.
+    Entries that are malformed or point at no headline are left out (scored again next time).
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    items = data.get('labels') if isinstance(data, dict) else data
+    scores = {}
+    for item in items if isinstance(items, list) else []:
+        try:
+            index = int(item['id']) - 1
+            confidence = min(max(float(item.get('confidence', 1.0)), 0.0), 1.0)
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= index < n_headlines and index not in scores:
+            scores[index] = Score(parse_bias(str(item.get('label', '')).upper()), confidence)
+    return scores
+
+def score_batch(posts):
+    """One Ollama request for a batch of headlines -> {index in batch: Score} (None if the request failed)."""
+    headlines = "\n    ".join(f"{i}. {format_headline(post)}" for i, post in enumerate(posts, 1))
+    body = {
+        'model': MODEL_NAME, 'prompt': BATCH_PROMPT.format(headlines=headlines),
+        'format': 'json', 'stream': False, 'options': {'temperature': 0},
+    }
     try:
-        response = llm.invoke(prompt)
-        return response.strip().upper()
+        with llm_slots:
+            response = llm_http.request('POST', f"{OLLAMA_URL}/api/generate", json=body, stage='llm_call')
+        if response.status_code != 200:
+            print(f"Ollama Error! Status: {response.status_code}")
+            return None
+        return parse_labels(response.json().get('response', ''), len(posts))
     except Exception as e:
         print(f"Ollama Error: {e}")
-        return "NEUTRAL"
+        return None
+
+# ==========================================
+#        PER-HEADLINE SENTIMENT CACHE
+# ==========================================
+def headline_key(post):
+    """CryptoPanic post ID if we have one, otherwise the normalized headline text."""
+    if post.get('id') is not None:
+        return f"id:{post['id']}"
+    text = re.sub(r'[^a-z0-9 ]+', '', post['title'].lower())
+    return "text:" + " ".join(text.split())
+
+class HeadlineCache:
+    """
+    Per-headline LLM scores persisted to a JSON file.
+    Entries expire after `ttl` seconds; beyond `max_entries` the least recently used are evicted.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()   # key -> {'label', 'confidence', 'scored_at'}, oldest use first
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = OrderedDict(json.load(f))
+        except Exception as e:
+            print(f"Sentiment cache unreadable, starting fresh: {e}")
+            self.entries = OrderedDict()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key, now=None):
+        """Score of a cached headline, None if unknown or expired."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if (now or time.time()) - entry['scored_at'] > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return Score(entry['label'], entry.get('confidence', 1.0))
+
+    def put(self, key, label, now=None, confidence=1.0):
+        self.entries[key] = {'label': label, 'confidence': confidence, 'scored_at': now or time.time()}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+# ==========================================
+#        WEIGHTED BIAS
+# ==========================================
+def headline_weight(post, now):
+    """Newer headlines count more: the weight halves every NEWS_HALF_LIFE seconds."""
+    published_at = post.get('published_at') or now
+    return 0.5 ** (max(0.0, now - published_at) / NEWS_HALF_LIFE)
+
+def bias_score(scored_posts, now):
+    """
+    Recency-weighted mean of label * confidence over [(post, Score)], in -1..1.
+    Low confidence pulls a headline towards neutral instead of dropping it.
+    """
+    total = weights = 0.0
+    for post, score in scored_posts:
+        weight = headline_weight(post, now)
+        total += weight * LABEL_SCORES[score.label] * score.confidence
+        weights += weight
+    return total / weights if weights else 0.0
+
+def analyze_headlines(posts, cache, now=None, batch_size=LLM_BATCH_SIZE, concurrency=LLM_CONCURRENCY):
+    """
+    Scores each post (LLM only for headlines the cache has not seen, `batch_size` per
+    request, `concurrency` requests at a time) and combines the scores into one bias.
+    None if an LLM request failed or no headline could be scored: no bias beats a made-up NEUTRAL.
+    """
+    now = now or time.time()
+    scores = {}
+    missing = OrderedDict()        # key -> post, in feed order
+    for post in posts:
+        key = headline_key(post)
+        score = cache.get(key, now)
+        if score is None:
+            missing[key] = post
+        else:
+            scores[key] = score
+
+    failed = False
+    keys = list(missing)
+    batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as pool:
+            results = pool.map(lambda batch: score_batch([missing[key] for key in batch]), batches)
+            for batch, labels in zip(batches, results):
+                if labels is None:
+                    failed = True
+                    continue
+                for index, score in labels.items():
+                    cache.put(batch[index], score.label, now, score.confidence)
+                    scores[batch[index]] = score
+        cache.save()
+
+    scored = [(post, scores[headline_key(post)]) for post in posts if headline_key(post) in scores]
+    if failed or not scored:
+        return None
+    mean_score = bias_score(scored, now)
+    if mean_score >= BIAS_THRESHOLD: return "BULLISH"
+    if mean_score <= -BIAS_THRESHOLD: return "BEARISH"
+    return "NEUTRAL"
+
+# ==========================================
+#        BACKGROUND WORKER
+# ==========================================
+# bias: last published bias | updated_at: time.time() of that update (0 = never)
+# update_seconds: how long the news fetch + LLM scoring took
+BiasSnapshot = namedtuple('BiasSnapshot', ['bias', 'updated_at', 'update_seconds'])
+
+class SentinelWorker(threading.Thread):
+    """
+    Runs the news fetch + LLM scoring on a background thread every `interval` seconds,
+    so the trading loop never waits on it. The latest result is published as one
+    immutable BiasSnapshot (a single reference swap, so readers always see a
+    consistent bias + timestamp pair).
+    """
+
+    def __init__(self, interval=3600, stale_after=None, cache=None, journal=None):
+        super().__init__(name="sentinel", daemon=True)
+        self.interval = interval
+        self.stale_after = stale_after or 2 * interval
+        self.cache = cache if cache is not None else HeadlineCache()
+        self.journal = journal
+        self._snapshot = BiasSnapshot("NEUTRAL", 0.0, 0.0)
+        self._stop_event = threading.Event()
+        self.log = logging.getLogger()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def read(self, now=None):
+        """Returns (bias, age_seconds, is_stale). A bias that was never updated is stale."""
+        snap = self._snapshot
+        now = now or time.time()
+        age = now - snap.updated_at if snap.updated_at else float('inf')
+        return snap.bias, age, age > self.stale_after
+
+    def update_once(self):
+        start = time.perf_counter()
+        posts = get_news_posts()
+        if posts is None:
+            raise RuntimeError("news fetch failed, keeping the previous bias")
+        if not posts:
+            self.log.info("[Sentinel] No significant news.")
+            return
+        bias = analyze_headlines(posts, self.cache)
+        if bias is None:
+            raise RuntimeError(f"LLM scoring of {len(posts)} headlines failed, keeping the previous bias")
+        elapsed = time.perf_counter() - start
+        self._snapshot = BiasSnapshot(bias, time.time(), elapsed)
+        if self.journal is not None:
+            self.journal.record('news', posts=posts, bias=bias)
+        self.log.info(f"[Sentinel] Global Bias Updated: {bias} ({len(posts)} headlines, update took {elapsed:.1f}s)")
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.update_once()
+            except Exception as e:
+                METRICS.inc('sentinel_errors')
+                self.log.error(f"[Sentinel] Update Error: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
 
 if __name__ == "__main__":
     print(f"Fetching news for {CURRENCY}...")
-    news = get_crypto_news()
-    
-    if news:
-        print(f"\nTop Headlines:\n{news}")
-        decision = analyze_sentiment(news)
+    posts = get_news_posts()
+
+    if posts:
+        print(f"\n{len(posts)} headlines in the last {NEWS_LOOKBACK / 3600:.0f}h, newest:")
+        print("\n".join(format_headline(post) for post in posts[:10]))
+        print("\n--- AI Thinking... ---")
+        decision = analyze_headlines(posts, HeadlineCache())
         print(f"\n>>> SENTINEL AGENT DECISION: {decision} <<<")
-        
-        if "BULLISH" in decision:
+
+        if decision is None:
+            print("Action: none, the LLM could not score the headlines.")
+        elif "BULLISH" in decision:
             print("Action: ALLOW Long Trades. INCREASE Risk.")
         elif "BEARISH" in decision:
             print("Action: BLOCK Long Trades. LOOK for Shorts.")
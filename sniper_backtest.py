@@ -1,11 +1,16 @@
 import backtrader as bt
 import datetime
+import argparse
+import time
+from market_data import load_candles
+from vector_backtest import backtest_frame
 
 class FVGStrategy(bt.Strategy):
     params = (
         ('risk_reward', 2.0),
         ('risk_per_trade', 0.02),
         ('sma_period', 50),
+        ('min_gap', 0.0005),   # Gap must exceed this fraction of price
     )
 
     def __init__(self):
@@ -48,7 +53,7 @@ class FVGStrategy(bt.Strategy):
             gap_size = cC_low - cA_high
             
             # Filter: Tiny noise gaps
-            if gap_size > (self.dataclose[0] * 0.0005): 
+            if gap_size > (self.dataclose[0] * self.params.min_gap): 
                 
                 # ENTRY: Market Execution (Buy NOW)
                 entry_price = self.dataclose[0]
@@ -72,18 +77,37 @@ class FVGStrategy(bt.Strategy):
                 )
 
 # --- RUN ENGINE ---
+def run_vector(csv_file):
+    """Same strategy on the NumPy engine (vector_backtest.py), in milliseconds instead of minutes."""
+    df = load_candles(csv_file)
+    print('Starting Vectorized Backtest...')
+    start = time.perf_counter()
+    result = backtest_frame(df)
+    print(f'Trades: {len(result.trades)} ({(time.perf_counter() - start) * 1000:.1f} ms)')
+    
+    final = result.final_value
+    print(f'Final Value: ${final:.2f}')
+    print(f'Profit/Loss: ${final - 10000:.2f}')
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Backtest the FVG strategy.")
+    parser.add_argument('--engine', choices=['backtrader', 'vector'], default='backtrader')
+    args = parser.parse_args()
+    
+    if args.engine == 'vector':
+        run_vector('btc_futures_15m_3years.csv')
+        raise SystemExit
+    
     cerebro = bt.Cerebro()
     cerebro.addstrategy(FVGStrategy)
 
     csv_file = 'btc_futures_15m_3years.csv' 
     
-    data = bt.feeds.GenericCSVData(
-        dataname=csv_file,
-        dtformat='%Y-%m-%d %H:%M:%S',
-        datetime=0, open=1, high=2, low=3, close=4, volume=5, openinterest=-1,
+    # Shared loader: memory-maps the columnar copy when data_miner.py wrote one
+    data = bt.feeds.PandasData(
+        dataname=load_candles(csv_file),
+        openinterest=None,
         timeframe=bt.TimeFrame.Minutes, compression=15,
-        skiprows=1 
     )
     
     cerebro.adddata(data)
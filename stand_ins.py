@@ -0,0 +1,236 @@
+import re
+import json
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from candle_buffer import CandleBuffer
+from kline_stream import StreamingCandleFeed, serve_klines
+from request_layer import HttpClient, PriorityScheduler
+import sentinel_agent
+
+# ==========================================
+#        STAND-INS FOR BENCHMARKS AND TESTS
+# ==========================================
+# Synthetic candles and local stand-ins for the exchange, news and LLM APIs, so
+# benchmarks.py and the test_*.py modules run without network, keys or CSV.
+
+SYNTHETIC_ROWS = 105_000   # ~3 years of 15m candles
+
+# --- Candles ---
+def make_synthetic_candles(rows=SYNTHETIC_ROWS, seed=42, start_price=30000.0, volatility=0.003):
+    """Random-walk 15m OHLCV candles, so benchmarks run without network or CSV."""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, rows)))
+    open_ = np.empty(rows)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+    wick = np.abs(rng.normal(0, volatility * 2 / 3, rows)) * close
+    high = np.maximum(open_, close) + wick
+    low = np.minimum(open_, close) - wick
+    volume = rng.lognormal(6, 1, rows)
+    timestamp = 1_600_000_000_000 + np.arange(rows, dtype=np.int64) * 15 * 60 * 1000
+    return pd.DataFrame({
+        'timestamp': timestamp, 'open': open_, 'high': high,
+        'low': low, 'close': close, 'volume': volume,
+    })
+
+def to_frame(df):
+    """timestamp-column candles -> datetime-indexed OHLCV (the stored dataset layout)."""
+    return df.set_index(pd.to_datetime(df['timestamp'], unit='ms').rename('datetime'))[
+        ['open', 'high', 'low', 'close', 'volume']]
+
+def candle_rows(df):
+    return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']].values.tolist()
+
+# --- Legacy reference (per-step .iloc) ---
+def legacy_observation(df, step):
+    """The original TradingEnv._next_observation, kept as the parity reference."""
+    current_close = df.iloc[step]['close']
+    prev_close = df.iloc[step-1]['close']
+    window = df.iloc[step-20:step]['close']
+    sma_20 = window.mean()
+    norm_price = current_close / sma_20 if sma_20 > 0 else 1.0
+    norm_vol = np.log(df.iloc[step]['volume'] + 1) / 10.0
+    norm_mom = (current_close - prev_close) / prev_close * 100
+    high = df.iloc[step]['high']
+    low = df.iloc[step]['low']
+    norm_volat = (high - low) / current_close * 100
+    return np.array([norm_price, norm_vol, norm_mom, norm_volat], dtype=np.float32)
+
+def legacy_pct_change(df, step):
+    current_price = df.iloc[step]['close']
+    prev_price = df.iloc[step-1]['close']
+    return (current_price - prev_price) / prev_price
+
+# --- Exchanges ---
+class ReplayExchange:
+    """Just enough of a ccxt exchange (fetch_ohlcv) to serve candles from memory."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        if since is None:
+            return self.rows[-limit:]
+        return [row for row in self.rows if row[0] >= since][:limit]
+
+class UniverseReplayExchange:
+    """ReplayExchange for many symbols, with a fixed round-trip latency per request."""
+
+    def __init__(self, rows_by_symbol, latency=0.0):
+        self.exchanges = {symbol: ReplayExchange(rows) for symbol, rows in rows_by_symbol.items()}
+        self.latency = latency
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        time.sleep(self.latency)
+        return self.exchanges[symbol].fetch_ohlcv(symbol, timeframe, since, limit)
+
+def universe_rows(n_symbols, rows=1000):
+    return {f"SYM{i}/USDT": candle_rows(make_synthetic_candles(rows, seed=100 + i, volatility=0.006))
+            for i in range(n_symbols)}
+
+# --- Kline stream ---
+async def run_feed(rows, seed_rows=100, stall_after=None):
+    """Feeds rows[seed_rows:] through the stand-in stream server into a StreamingCandleFeed."""
+    server = await serve_klines(rows[seed_rows:], port=0, interval=0.001, stall_after=stall_after)
+    port = list(server.sockets)[0].getsockname()[1]
+    index = {row[0]: i for i, row in enumerate(rows)}
+    closes, latencies = [], []
+
+    class PollingExchange(ReplayExchange):
+        def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+            if feed.mode == 'REST' and not feed.candles.empty:
+                # Polling: time moves on, the REST API now also knows the next (forming) candle
+                self.rows = rows[:index[feed.candles.last_timestamp] + 2]
+            return super().fetch_ohlcv(symbol, timeframe, since, limit)
+
+    def on_close(candles, has_forming_bar):
+        closed_ts = int(candles.timestamp[-2 if has_forming_bar else -1])
+        closes.append((closed_ts, has_forming_bar))
+
+    feed = StreamingCandleFeed(CandleBuffer(1000), PollingExchange(rows[:seed_rows]), 'BTC/USDT', '15m', on_close,
+                               url=f"ws://127.0.0.1:{port}", stall_timeout=0.2, poll_interval=0.01)
+    task = asyncio.create_task(feed.run())
+    deadline = time.monotonic() + 30
+    while not closes or closes[-1][0] < rows[-2 if stall_after else -1][0]:
+        if time.monotonic() > deadline:
+            break
+        await asyncio.sleep(0.005)
+        if feed.last_latency_ms is not None:
+            latencies.append(feed.last_latency_ms)
+            feed.last_latency_ms = None
+    feed.stop()
+    task.cancel()
+    server.close()
+    return closes, feed, latencies
+
+# --- News + LLM ---
+def serve(handler):
+    """Starts `handler` on a free local port; returns (server, base url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def send_json(handler, status, payload):
+    body = json.dumps(payload).encode()
+    handler.send_response(status)
+    handler.send_header('Content-Type', 'application/json')
+    handler.send_header('Content-Length', str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+class InFlight:
+    """Counts concurrent requests on a stand-in server (peak = most at once)."""
+
+    def __init__(self):
+        self.now = self.peak = self.total = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.now += 1
+            self.total += 1
+            self.peak = max(self.peak, self.now)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.now -= 1
+
+def stand_in_title(i):
+    """The i-th newest headline: the last 4h are bullish, older even ones bearish, the rest filler."""
+    if i < 24:
+        return f"Bitcoin ETF inflows surge, day {i}"
+    if i % 2 == 0:
+        return f"Exchange hack drains hot wallet, report {i}"
+    return f"Traders await the CPI print, note {i}"
+
+class StandInNews(BaseHTTPRequestHandler):
+    """CryptoPanic-style paged posts: `per_page` per page, one every `spacing` s before `now`, newest first."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    per_page, spacing, pages, latency = 20, 600, 10, 0.05
+    now = 0
+    requested = []
+    in_flight = InFlight()
+
+    def do_GET(self):
+        cls = StandInNews
+        with cls.in_flight:
+            time.sleep(cls.latency)
+            page = int(parse_qs(urlsplit(self.path).query).get('page', ['1'])[0])
+            cls.requested.append(page)
+            if page > cls.pages:
+                return send_json(self, 404, {'detail': 'Invalid page.'})
+            first = (page - 1) * cls.per_page
+            results = [{
+                'id': i, 'kind': 'news', 'title': stand_in_title(i), 'source': {'domain': 'standin.news'},
+                'published_at': datetime.fromtimestamp(cls.now - i * cls.spacing, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            } for i in range(first, first + cls.per_page)]
+            send_json(self, 200, {'next': f"?page={page + 1}" if page < cls.pages else None,
+                                  'previous': None, 'results': results})
+
+    def log_message(self, format, *args):
+        pass
+
+class StandInLLM(BaseHTTPRequestHandler):
+    """Ollama /api/generate stand-in: labels numbered headlines by keyword, slower for bigger batches."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency, per_headline = 0.05, 0.005
+    in_flight = InFlight()
+
+    def do_POST(self):
+        cls = StandInLLM
+        with cls.in_flight:
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            headlines = re.findall(r'^\s*(\d+)\. - \[[^\]]*\] (.*)$', request['prompt'], re.MULTILINE)
+            time.sleep(cls.latency + cls.per_headline * len(headlines))
+            labels = [{'id': int(n), 'label': 'BULLISH' if 'surge' in title else 'BEARISH' if 'hack' in title else 'NEUTRAL',
+                       'confidence': 0.9} for n, title in headlines]
+            send_json(self, 200, {'model': request['model'], 'response': json.dumps({'labels': labels}), 'done': True})
+
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def stand_in_sentinel():
+    """Points sentinel_agent at fresh stand-in news + LLM servers; yields the stand-in clock (`now`)."""
+    StandInNews.requested, StandInNews.in_flight, StandInLLM.in_flight = [], InFlight(), InFlight()
+    StandInNews.now = int(time.time())
+    (news, news_url), (llm, llm_url) = serve(StandInNews), serve(StandInLLM)
+    saved = sentinel_agent.NEWS_API_URL, sentinel_agent.OLLAMA_URL, sentinel_agent.news_http
+    sentinel_agent.NEWS_API_URL = f"{news_url}/api/developer/v2/posts/"
+    sentinel_agent.OLLAMA_URL = llm_url
+    sentinel_agent.news_http = HttpClient(PriorityScheduler(10 ** 6))     # Not the live news budget
+    try:
+        yield StandInNews.now
+    finally:
+        sentinel_agent.NEWS_API_URL, sentinel_agent.OLLAMA_URL, sentinel_agent.news_http = saved
+        news.shutdown()
+        llm.shutdown()
@@ -1,6 +1,7 @@
 import ccxt
 import time
 import sys
+import argparse
 
 # ==========================================
 #        TEST CONFIGURATION
@@ -16,8 +17,8 @@ SECRET_KEY = 'w2Oq0ESyEpIoSp7izYfOLKPT82eYn2fncvwSwPd6sAF6WLZjJy3UcvGz8mpt2p83'
 # ==========================================
 #        TEST LOGIC
 # ==========================================
-def run_lifecycle_test():
-    print(f"--- STARTING ENTRY/EXIT TEST (Binance Demo) ---")
+def run_lifecycle_test(exchange_url=None):
+    print(f"--- STARTING ENTRY/EXIT TEST ({exchange_url or 'Binance Demo'}) ---")
     
     # 1. Setup Exchange
     exchange = ccxt.binance({
@@ -27,9 +28,13 @@ def run_lifecycle_test():
         'options': {'defaultType': 'future'}
     })
 
-    # Enable Demo Mode
+    # Enable Demo Mode (or point at a local mock_exchange.py)
     try:
-        if hasattr(exchange, 'enable_demo_trading'):
+        if exchange_url:
+            from mock_exchange import point_exchange_at
+            point_exchange_at(exchange, exchange_url)
+            print(f"[System] Mock exchange at {exchange_url}.")
+        elif hasattr(exchange, 'enable_demo_trading'):
             exchange.enable_demo_trading(True)
             print("[System] Demo Mode Enabled.")
         else:
@@ -77,4 +82,6 @@ def run_lifecycle_test():
         print("Do NOT deploy until this is fixed.")
 
 if __name__ == "__main__":
-    run_lifecycle_test()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Open and close one small position.")
+    parser.add_argument('--exchange-url', default=None, help="Run against mock_exchange.py at this URL")
+    run_lifecycle_test(parser.parse_args().exchange_url)
\ No newline at end of file
@@ -0,0 +1,25 @@
+import main_swarm
+from candle_buffer import CandleBuffer
+from train_risk_agent import TradingEnv
+from stand_ins import candle_rows
+
+def test_streaming_features_match_training(df):
+    """Live StreamingFeatures give the training env's observation on every bar, fed from the first candle."""
+    env = TradingEnv(df)
+    candles = CandleBuffer(main_swarm.CANDLE_HISTORY)
+    for t, row in enumerate(candle_rows(df)):
+        candles.update([row])
+        assert main_swarm.build_risk_observation(candles).tobytes() == env.features[t].tobytes(), f"bar {t}"
+
+def test_seeded_streaming_features_match_training(df):
+    """Seeded mid-history like the live loop, forming updates included."""
+    env = TradingEnv(df)
+    rows = candle_rows(df)
+    start = len(rows) // 2
+    candles = CandleBuffer(main_swarm.CANDLE_HISTORY)
+    candles.update(rows[start - main_swarm.CANDLE_HISTORY:start])
+    for t in range(start, len(rows)):
+        row = rows[t]
+        candles.update([row[:4] + [row[1], row[5] / 3]])     # Forming: close still at the open
+        candles.update([row])
+        assert main_swarm.build_risk_observation(candles).tobytes() == env.features[t].tobytes(), f"bar {t}"
@@ -0,0 +1,35 @@
+import asyncio
+from candle_buffer import CandleBuffer
+from kline_stream import StreamingCandleFeed
+from stand_ins import ReplayExchange, candle_rows, run_feed
+
+N_CANDLES = 200
+
+def test_closes_reach_the_handler_in_order(df):
+    rows = candle_rows(df.iloc[:100 + N_CANDLES])
+    closes, _, latencies = asyncio.run(run_feed(rows))
+    assert [ts for ts, _ in closes] == [row[0] for row in rows[100:]], "missed or reordered candle closes"
+    assert latencies, "no close -> decision latency was recorded"
+
+def test_stall_falls_back_to_rest(df):
+    rows = candle_rows(df.iloc[:100 + N_CANDLES])
+    closes, feed, _ = asyncio.run(run_feed(rows, stall_after=N_CANDLES // 2))
+    assert feed.mode == 'REST'
+    handled = [ts for ts, _ in closes]
+    assert len(handled) == len(set(handled)), "a candle close was handled twice"
+    assert handled == [row[0] for row in rows[100:-1]], "missed or reordered candle closes"
+    assert closes[-1][0] == rows[-2][0] and closes[-1][1], "REST polling did not catch up to the forming bar"
+
+def test_rest_sync_fires_every_new_close_once(df):
+    """A sync that adds several bars (a backfill, a slow poll) fires one close per bar, skipping handled ones."""
+    rows = candle_rows(df.iloc[:120])
+    exchange = ReplayExchange(rows[:100])
+    closes = []
+    feed = StreamingCandleFeed(CandleBuffer(1000), exchange, 'BTC/USDT', '15m',
+                               lambda candles, forming: closes.append(int(candles.timestamp[-2])))
+    asyncio.run(feed._rest_sync())
+    feed.last_closed = rows[98][0]
+    exchange.rows = rows[:105]
+    asyncio.run(feed._rest_sync())
+    asyncio.run(feed._rest_sync())
+    assert closes == [row[0] for row in rows[99:104]]
@@ -0,0 +1,18 @@
+import urllib.request
+from metrics import MetricsRegistry, start_metrics_server
+
+def test_metrics_endpoint_serves_the_series():
+    registry = MetricsRegistry()
+    for _ in range(200):
+        with registry.time('noop'):
+            pass
+    registry.inc('signals', 3)
+    server = start_metrics_server(0, registry=registry)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            lines = response.read().decode().splitlines()
+    finally:
+        server.shutdown()
+    assert 'swarm_stage_seconds_count{stage="noop"} 200' in lines
+    assert 'swarm_stage_seconds_bucket{stage="noop",le="+Inf"} 200' in lines
+    assert 'swarm_events_total{event="signals"} 3' in lines
@@ -0,0 +1,37 @@
+import pytest
+import requests
+from account_state import AccountState
+from candle_buffer import CandleBuffer
+from mock_exchange import MockExchange
+from stand_ins import make_synthetic_candles, to_frame
+
+@pytest.fixture
+def mock():
+    mock = MockExchange(to_frame(make_synthetic_candles(5000, seed=11)), speed=900)
+    mock.url = mock.serve(0)
+    yield mock
+    mock.shutdown()
+
+def test_swarm_trades_against_the_mock(swarm, mock):
+    """The swarm's own exchange path: candle sync, account refresh, order, reduceOnly close."""
+    swarm.EXCHANGE_URL = mock.url
+    candles = CandleBuffer(swarm.CANDLE_HISTORY)
+    swarm.exchange = swarm.connect_exchange(candles)
+    assert len(candles) == swarm.CANDLE_HISTORY
+    assert candles.timestamp[-1] == mock.market.timestamp[mock.market.position()[0]], "sync stopped short of the forming bar"
+
+    swarm.account = AccountState(swarm.exchange_worker())
+    swarm.account.refresh()
+    swarm.note_last_price(candles, swarm.SYMBOL)
+    swarm.execute_trade("1.0%")
+    assert swarm.has_open_position(swarm.SYMBOL) and 'BTCUSDT' in mock.account.positions
+
+    size = mock.account.positions['BTCUSDT'][0]
+    swarm.exchange.create_order(swarm.SYMBOL, 'market', 'sell', size * 2, params={'reduceOnly': True})
+    assert not mock.account.positions, "reduceOnly close left a position open"
+
+def test_weight_limit_answers_429(mock):
+    mock.weight_per_minute = 0
+    limited = requests.get(f"{mock.url}/fapi/v1/ticker/24hr", params={'symbol': 'BTCUSDT'})
+    assert limited.status_code == 429
+    assert 'Retry-After' in limited.headers
@@ -0,0 +1,96 @@
+import time
+from account_state import AccountState
+from candle_buffer import CandleBuffer
+from mock_exchange import MockExchange
+from order_executor import OrderExecutor, round_step
+from stand_ins import make_synthetic_candles, to_frame
+
+def test_prepared_orders_are_sent_and_confirmed(swarm):
+    """
+    Pre-sized orders against the mock in ack mode (status NEW, fill only on query):
+    lot-size rounding, one create_order per signal, fills confirmed in the background.
+    """
+    mock = MockExchange(to_frame(make_synthetic_candles(5000, seed=13)), speed=900, latency=0.02,
+                        ack_orders=True, weight_per_minute=10 ** 9)
+    swarm.EXCHANGE_URL = mock.serve(0)
+    try:
+        candles = CandleBuffer(swarm.CANDLE_HISTORY)
+        swarm.exchange = swarm.connect_exchange(candles)
+        swarm.account = AccountState(swarm.exchange_worker())
+        swarm.account.refresh()
+        swarm.executor = OrderExecutor(swarm.exchange_worker(), swarm.account, swarm.ORDER_TIERS,
+                                       confirm_interval=0.05, confirm_exchange=swarm.exchange_worker()).start()
+        market = swarm.exchange.market(swarm.SYMBOL)
+        step, min_cost = market['precision']['amount'], market['limits']['cost']['min']
+
+        for _ in range(5):
+            swarm.note_last_price(candles, swarm.SYMBOL)    # Candle feed: re-sizes off the signal path
+            for tier in swarm.ORDER_TIERS:
+                order = swarm.executor.prepared(swarm.SYMBOL, tier)
+                assert order.amount == round_step(order.amount, step), f"{tier} amount off the lot step"
+                assert order.amount * order.price >= min_cost, f"{tier} order below the min notional"
+            prepared = swarm.executor.prepared(swarm.SYMBOL, "1.0%")
+            orders = mock.orders
+            swarm.execute_trade("1.0%")
+            deadline = time.monotonic() + 10
+            while swarm.executor.busy and time.monotonic() < deadline:
+                time.sleep(0.005)
+            position = mock.account.positions.get('BTCUSDT', (0.0,))[0]
+            assert mock.orders == orders + 1
+            assert abs(position - prepared.amount) < 1e-9, "the mock filled something else than the prepared order"
+            assert swarm.has_open_position(swarm.SYMBOL), "fill was not confirmed into the account state"
+            swarm.exchange.create_order(swarm.SYMBOL, 'market', 'sell', position, params={'reduceOnly': True})
+            swarm.account.refresh()
+        assert len(swarm.executor.latencies) == 5
+        assert 'stage="query_order"' in mock.metrics.render(), "fills were taken from the ack, not fetch_order"
+    finally:
+        mock.shutdown()
+
+class SlowAccount:
+    """Account reads that block, like a stale snapshot waiting for the refresh thread."""
+
+    def __init__(self):
+        self.fills = []
+
+    def balance(self):
+        time.sleep(0.3)
+        return 1000.0
+
+    def last_price(self, symbol):
+        return 30000.0
+
+    def has_position(self, symbol):
+        return False
+
+    def on_fill(self, *fill):
+        self.fills.append(fill)
+
+class AckExchange:
+    """create_order acks (status open); only fetch_order reports the fill."""
+
+    def __init__(self):
+        self.calls = []
+
+    def create_order(self, symbol, type, side, amount):
+        self.calls.append('create_order')
+        return {'id': '1', 'status': 'open', 'amount': amount}
+
+    def fetch_order(self, order_id, symbol):
+        self.calls.append('fetch_order')
+        return {'id': order_id, 'status': 'closed', 'filled': 0.01, 'average': 30000.0}
+
+def test_signal_path_never_waits_on_sizing():
+    sender, confirmer, account = AckExchange(), AckExchange(), SlowAccount()
+    executor = OrderExecutor(sender, account, confirm_interval=0.01, confirm_exchange=confirmer).start()
+    try:
+        start = time.perf_counter()
+        executor.prepare('BTC/USDT')
+        assert executor.submit('BTC/USDT', '1.0%')
+        assert time.perf_counter() - start < 0.1, "prepare / submit waited on the account"
+        deadline = time.monotonic() + 5
+        while executor.busy and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        executor.stop()
+    assert account.fills == [('BTC/USDT', 'buy', 0.01, 30000.0)]
+    assert sender.calls == ['create_order'] and confirmer.calls == ['fetch_order']
@@ -0,0 +1,58 @@
+import os
+import time
+from journal import Journal, read_journal
+from replay import Replay, replay_journal, replay_candles, decisions_digest
+from stand_ins import make_synthetic_candles, candle_rows, to_frame
+
+def record_session(swarm, path):
+    """A live-like session on the wall clock: polling, the Sentinel publishing a new bias now and then."""
+    rows = candle_rows(make_synthetic_candles(3000, seed=7, volatility=0.006))
+    with Replay(track_positions=False) as live:
+        swarm.journal = Journal(path)
+        live.update(rows[:1000])
+        for i, row in enumerate(rows[1000:]):
+            live.clock.now = time.time()
+            if i % 50 == 0:
+                bias = ["NEUTRAL", "BULLISH", "BEARISH"][(i // 50) % 3]
+                live.sentinel.publish(bias)
+                swarm.journal.record('news', t=live.clock.now, posts=[], bias=bias)
+            live.update([row[:4] + [row[1], row[5] / 2]])      # Forming: close still at the open
+            live.scan(has_forming_bar=True)
+            live.update([row])
+            live.scan(has_forming_bar=True)
+        swarm.journal.close()
+    return live
+
+def test_journal_replay_reproduces_the_session(swarm, tmp_path):
+    """A recorded session replays to the same decisions."""
+    path = os.path.join(tmp_path, 'session.jsonl')
+    live = record_session(swarm, path)
+    replay, recorded = replay_journal(path, track_positions=False)
+
+    live_decisions = [d['decision'] for d in live.decisions]
+    assert live_decisions and recorded == live_decisions
+    assert [d['decision'] for d in replay.decisions] == live_decisions
+    assert len(replay.exchange.orders) == len(live.exchange.orders)
+
+def test_journaled_news_drives_the_replayed_sentinel(swarm, tmp_path):
+    """Without the per-scan bias reads, the 'news' records alone give the same decisions."""
+    path = os.path.join(tmp_path, 'session.jsonl')
+    live = record_session(swarm, path)
+    news_only = Journal(os.path.join(tmp_path, 'news_only.jsonl'))
+    for record in read_journal(path):
+        kind = record.pop('k')
+        if kind != 'bias':
+            news_only.record(kind, **record)
+    news_only.close()
+    replay, _ = replay_journal(news_only.path, track_positions=False)
+
+    live_decisions = [d['decision'] for d in live.decisions]
+    assert "VETO_NEWS" in live_decisions and set(live_decisions) - {"VETO_NEWS"}
+    assert [d['decision'] for d in replay.decisions] == live_decisions
+
+def test_candle_replay_is_deterministic():
+    frame = to_frame(make_synthetic_candles(5000, seed=8, volatility=0.006))
+    first, _ = replay_candles(frame)
+    second, _ = replay_candles(frame)
+    assert first.decisions
+    assert decisions_digest(first.decisions) == decisions_digest(second.decisions)
@@ -0,0 +1,121 @@
+import json
+import time
+import threading
+import pytest
+import requests
+import ccxt
+from http.server import BaseHTTPRequestHandler
+from request_layer import PriorityScheduler, HttpClient, ScheduledExchange, PRIORITY_ORDER, PRIORITY_ACCOUNT
+from stand_ins import serve
+
+class StandInAPI(BaseHTTPRequestHandler):
+    """Local REST stand-in: /ok, /flaky (503 twice), /limited (429 once), /slow (2s). Logs client ports."""
+    protocol_version = 'HTTP/1.1'     # Keep-alive
+    disable_nagle_algorithm = True
+    hits = {}
+    ports = set()
+
+    def do_GET(self):
+        StandInAPI.ports.add(self.client_address[1])
+        path = self.path.split('?')[0]
+        StandInAPI.hits[path] = StandInAPI.hits.get(path, 0) + 1
+        n = StandInAPI.hits[path]
+        if path == '/slow':
+            time.sleep(2)
+        status, headers = 200, {}
+        if path == '/flaky' and n <= 2:
+            status = 503
+        if path == '/limited' and n == 1:
+            status, headers = 429, {'Retry-After': '0.2'}
+        body = json.dumps({'path': path, 'hit': n}).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass    # /slow: the client already gave up
+
+    def log_message(self, format, *args):
+        pass
+
+class FlakyExchange:
+    """fetch_ohlcv fails twice with a network error; create_order always times out."""
+
+    def __init__(self):
+        self.calls = {'fetch_ohlcv': 0, 'create_order': 0}
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        self.calls['fetch_ohlcv'] += 1
+        if self.calls['fetch_ohlcv'] <= 2:
+            raise ccxt.NetworkError("connection reset")
+        return [[0, 1, 1, 1, 1, 1]]
+
+    def create_order(self, *args):
+        self.calls['create_order'] += 1
+        raise ccxt.RequestTimeout("timed out")
+
+@pytest.fixture
+def api():
+    StandInAPI.hits, StandInAPI.ports = {}, set()
+    server, base = serve(StandInAPI)
+    yield base
+    server.shutdown()
+
+@pytest.fixture
+def client():
+    return HttpClient(PriorityScheduler(10 ** 6), timeout=(1, 1))
+
+def test_keep_alive_connection_is_reused(api, client):
+    for _ in range(50):
+        client.get(f"{api}/ok").json()
+    assert len(StandInAPI.ports) == 1, f"{len(StandInAPI.ports)} connections for 50 requests"
+
+def test_503_is_retried(api, client):
+    assert client.get(f"{api}/flaky").status_code == 200
+    assert StandInAPI.hits['/flaky'] == 3
+
+def test_429_retry_after_is_honoured(api, client):
+    start = time.perf_counter()
+    assert client.get(f"{api}/limited").status_code == 200
+    assert time.perf_counter() - start >= 0.2
+
+def test_read_timeout_fires(api, client):
+    client.max_retries = 0
+    with pytest.raises(requests.Timeout):
+        client.get(f"{api}/slow")
+
+def test_reads_are_retried_but_orders_are_not():
+    exchange = FlakyExchange()
+    scheduled = ScheduledExchange(exchange, PriorityScheduler(10 ** 6))
+    scheduled.fetch_ohlcv('BTC/USDT', '15m', limit=10)
+    with pytest.raises(ccxt.RequestTimeout):
+        scheduled.create_order('BTC/USDT', 'market', 'buy', 1)
+    assert exchange.calls == {'fetch_ohlcv': 3, 'create_order': 1}
+
+def test_order_jumps_the_queue_of_pollers():
+    """With the bucket empty, an order queued behind pollers must still go out first."""
+    n_pollers = 10
+    scheduler = PriorityScheduler(600, reserve=2, burst_seconds=1)     # 10 weight/s, 10 burst
+    scheduler.acquire(10, PRIORITY_ORDER)                              # Drain it, reserve included
+    served = []
+    lock = threading.Lock()
+
+    def request(name, priority):
+        scheduler.acquire(1, priority)
+        with lock:
+            served.append(name)
+
+    pollers = [threading.Thread(target=request, args=(f"poll{i}", PRIORITY_ACCOUNT)) for i in range(n_pollers)]
+    for t in pollers:
+        t.start()
+    while scheduler.waiting < n_pollers:
+        time.sleep(0.001)
+    order = threading.Thread(target=request, args=("order", PRIORITY_ORDER))
+    order.start()
+    for t in pollers + [order]:
+        t.join()
+    assert served[0] == "order", f"order served at position {served.index('order')} behind pollers"
@@ -0,0 +1,61 @@
+import math
+import pytest
+import sentinel_agent
+from sentinel_agent import SentinelWorker, BiasSnapshot, HeadlineCache, get_news_posts, analyze_headlines, bias_score, parse_labels, headline_key
+from stand_ins import StandInNews, StandInLLM, InFlight, stand_in_sentinel
+
+LOOKBACK = 12 * 3600
+EXPECTED = LOOKBACK // StandInNews.spacing + 1          # Posts inside the lookback window
+
+@pytest.fixture(scope='module')
+def sentinel():
+    with stand_in_sentinel() as now:
+        posts = get_news_posts(LOOKBACK, max_pages=StandInNews.pages, now=now)
+        yield now, posts
+
+def test_news_pages_are_fetched_once_each_side_by_side(sentinel):
+    _, posts = sentinel
+    assert posts is not None and [p['id'] for p in posts] == list(range(EXPECTED))
+    assert sorted(StandInNews.requested) == list(range(1, math.ceil(EXPECTED / StandInNews.per_page) + 1))
+    assert StandInNews.in_flight.peak >= 2
+
+def test_malformed_llm_output_is_ignored():
+    assert not parse_labels("not json", 3)
+    assert not parse_labels('{"labels": [{"id": 9, "label": "BULLISH"}]}', 3)
+
+def test_headlines_are_scored_in_batches_once(sentinel):
+    now, posts = sentinel
+    StandInLLM.in_flight = InFlight()
+    cache = HeadlineCache(path=None)
+    assert analyze_headlines(posts, cache, now) == "BULLISH"
+    batches = math.ceil(EXPECTED / sentinel_agent.LLM_BATCH_SIZE)
+    assert StandInLLM.in_flight.total == batches
+    assert StandInLLM.in_flight.peak == sentinel_agent.LLM_CONCURRENCY
+    analyze_headlines(posts, cache, now)
+    assert StandInLLM.in_flight.total == batches, "cached headlines were sent to the LLM again"
+
+def test_bias_is_recency_weighted(sentinel):
+    now, posts = sentinel
+    cache = HeadlineCache(path=None)
+    assert analyze_headlines(posts, cache, now, batch_size=1) == "BULLISH"
+    labels = [1.0 if i < 24 else -1.0 if i % 2 == 0 else 0.0 for i in range(EXPECTED)]
+    weights = [0.5 ** (i * StandInNews.spacing / sentinel_agent.NEWS_HALF_LIFE) for i in range(EXPECTED)]
+    want = sum(w * l * 0.9 for w, l in zip(weights, labels)) / sum(weights)
+    score = bias_score([(post, cache.get(headline_key(post), now)) for post in posts], now)
+    assert score == pytest.approx(want, abs=1e-12)
+    assert sum(labels) < 0, "the stand-in headlines should be bearish unweighted"
+
+def test_failed_update_keeps_the_previous_bias(sentinel, monkeypatch):
+    """A news fetch or LLM failure must not publish a fresh bias: the old one ages until it goes stale."""
+    _, posts = sentinel
+    worker = SentinelWorker(interval=60, cache=HeadlineCache(path=None))
+    worker._snapshot = previous = BiasSnapshot("BEARISH", 1000.0, 1.0)
+    monkeypatch.setattr(sentinel_agent, 'get_news_posts', lambda: None)
+    with pytest.raises(RuntimeError, match="news fetch failed"):
+        worker.update_once()
+    monkeypatch.setattr(sentinel_agent, 'get_news_posts', lambda: posts)
+    monkeypatch.setattr(sentinel_agent, 'score_batch', lambda batch: None)
+    with pytest.raises(RuntimeError, match="LLM scoring"):
+        worker.update_once()
+    assert worker.snapshot() is previous
+    assert worker.read(now=1000.0 + 121) == ("BEARISH", 121, True)
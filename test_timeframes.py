@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from candle_buffer import TimeframeRollup
+from market_data import PRICE_COLUMNS, index_to_ms
+from timeframes import ROLLUP_TIMEFRAMES, timeframe_ms, rollup_arrays, update_rollups, load_rollup
+from stand_ins import candle_rows, to_frame
+
+def columns(df):
+    return df['timestamp'].to_numpy(dtype=np.int64), [df[col].to_numpy() for col in PRICE_COLUMNS]
+
+@pytest.mark.parametrize('tf', ROLLUP_TIMEFRAMES)
+def test_rollup_matches_pandas_resample(df, tf):
+    ts, cols = columns(df)
+    bucket_ts, *ohlcv = rollup_arrays(ts, *cols, timeframe_ms(tf))
+    agg = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+    resampled = to_frame(df).resample(pd.Timedelta(timeframe_ms(tf), 'ms')).agg(agg).dropna()
+    assert np.array_equal(index_to_ms(resampled.index), bucket_ts)
+    for i, col in enumerate(['open', 'high', 'low', 'close']):
+        assert np.array_equal(resampled[col].to_numpy(), ohlcv[i]), col
+    # pandas sums volume pairwise, the rollup candle by candle
+    assert np.allclose(resampled['volume'].to_numpy(), ohlcv[4], rtol=1e-12)
+
+def test_live_rollup_matches_vectorized(df):
+    """One candle at a time, forming updates included: the open bucket and the final series, bit for bit."""
+    rows = candle_rows(df)
+    ts, cols = columns(df)
+    rollup = TimeframeRollup(ROLLUP_TIMEFRAMES, capacity=len(rows))
+    checks = set(np.linspace(200, len(rows) - 1, 500).astype(int).tolist())
+    for t, row in enumerate(rows):
+        rollup.update(row[:4] + [row[1], row[5] / 3])            # Forming: close still at the open
+        rollup.update(row)
+        if t in checks:
+            for tf in ROLLUP_TIMEFRAMES:
+                recent = rollup_arrays(ts[t - 199:t + 1], *(col[t - 199:t + 1] for col in cols), timeframe_ms(tf))
+                live = rollup[tf]
+                assert live.timestamp[-1] == recent[0][-1], f"{tf} at bar {t}"
+                assert live.ohlcv[-1].tobytes() == np.array([a[-1] for a in recent[1:]]).tobytes(), f"{tf} at bar {t}"
+    for tf in ROLLUP_TIMEFRAMES:
+        bucket_ts, *ohlcv = rollup_arrays(ts, *cols, timeframe_ms(tf))
+        assert np.array_equal(rollup[tf].timestamp, bucket_ts), tf
+        assert rollup[tf].ohlcv.tobytes() == np.column_stack(ohlcv).tobytes(), tf
+
+def test_incremental_cache_matches_full_rebuild(df, tmp_path):
+    ts, cols = columns(df)
+    csv_path = str(tmp_path / 'candles.csv')
+    frame = to_frame(df)
+    cut = len(frame) - 500
+    update_rollups(frame.iloc[:cut], csv_path)
+    update_rollups(frame, csv_path, since=int(ts[cut - 1]))          # The last stored candle is re-fetched
+    for tf in ROLLUP_TIMEFRAMES:
+        cached = load_rollup(csv_path, tf)
+        bucket_ts, *ohlcv = rollup_arrays(ts, *cols, timeframe_ms(tf))
+        assert np.array_equal(index_to_ms(cached.index), bucket_ts), tf
+        assert cached.to_numpy().tobytes() == np.column_stack(ohlcv).tobytes(), tf
+        del cached      # Unmap before the folder goes
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from train_risk_agent import TradingEnv, LaneVecEnv
+from stand_ins import legacy_observation, legacy_pct_change
+
+def test_observations_match_legacy_env(df):
+    """Precomputed observations must be bit-identical to the legacy .iloc path."""
+    env = TradingEnv(df)
+    for step in np.linspace(100, env.MAX_STEPS, 2000).astype(int):
+        assert env.features[step].tobytes() == legacy_observation(df, step).tobytes(), f"observation at step {step}"
+        assert env.pct_change[step] == legacy_pct_change(df, step), f"pct_change at step {step}"
+
+def test_lanes_match_trading_env(df):
+    """Every lane must earn the same rewards as its own TradingEnv for the same actions."""
+    df, n_lanes = df.iloc[:3000], 8
+    lane_env = LaneVecEnv(df, n_lanes)
+    envs = [TradingEnv(df) for _ in range(n_lanes)]
+    lane_env.reset()
+    # Run past the end of the data so auto-reset is covered too
+    n_steps = (lane_env.MAX_STEPS - 100) + 500
+    actions = np.random.default_rng(1).integers(0, 4, (n_steps, n_lanes))
+    for t in range(n_steps):
+        _, rewards, dones, infos = lane_env.step(actions[t])
+        for lane, env in enumerate(envs):
+            _, reward, done, _, info = env.step(int(actions[t, lane]))
+            assert (np.float32(reward), done, info['balance']) == (rewards[lane], dones[lane], infos[lane]['balance']), \
+                f"lane {lane} diverged from TradingEnv at step {t}"
+            if done:
+                env.reset()
+
+def test_lane_attributes_are_per_lane(df):
+    """get_attr / set_attr act on each lane's own state; per-env method calls are refused."""
+    lane_env = LaneVecEnv(df.iloc[:3000], 4)
+    lane_env.set_attr('balance', 500.0, indices=[1, 3])
+    assert lane_env.get_attr('balance') == [10000.0, 500.0, 10000.0, 500.0]
+    assert lane_env.get_attr('balance', indices=3) == [500.0]
+    assert lane_env.get_attr('MAX_STEPS') == [2999] * 4
+    with pytest.raises(NotImplementedError):
+        lane_env.set_attr('episode_length', 100, indices=0)
+    with pytest.raises(NotImplementedError):
+        lane_env.env_method('reset')
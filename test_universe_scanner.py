@@ -0,0 +1,31 @@
+import numpy as np
+import main_swarm
+from universe_scanner import UniverseScanner
+from stand_ins import UniverseReplayExchange, universe_rows
+
+def test_batched_scan_matches_per_symbol_checks():
+    """The batched scan must flag the same symbols, levels and observations as sniper_check per symbol."""
+    n_symbols, n_steps = 64, 300
+    rows = universe_rows(n_symbols, 1000 + n_steps)
+    exchange = UniverseReplayExchange({s: r[:1000] for s, r in rows.items()})
+    scanner = UniverseScanner(lambda: exchange, rows, '15m', capacity=500)
+    scanner.update()
+
+    signals = 0
+    try:
+        for step in range(n_steps):
+            for has_forming_bar in (True, False):
+                batch = {symbol: (level, obs) for symbol, level, obs in scanner.scan(has_forming_bar=has_forming_bar)}
+                for symbol, candles in scanner.buffers.items():
+                    signal, level = main_swarm.sniper_check(candles, has_forming_bar)
+                    assert (signal == "BUY") == (symbol in batch), f"{symbol} at step {step}"
+                    if signal == "BUY":
+                        assert batch[symbol][0] == level, f"{symbol} level at step {step}"
+                        assert np.array_equal(batch[symbol][1], main_swarm.build_risk_observation(candles)), \
+                            f"{symbol} features at step {step}"
+                        signals += 1
+            for symbol, candles in scanner.buffers.items():
+                candles.update([rows[symbol][1000 + step]])
+    finally:
+        scanner.close()
+    assert signals > 0
@@ -0,0 +1,43 @@
+import numpy as np
+import backtrader as bt
+from sniper_backtest import FVGStrategy
+from vector_backtest import backtest_frame
+from stand_ins import make_synthetic_candles, to_frame
+
+class RecordingFVGStrategy(FVGStrategy):
+    def __init__(self):
+        super().__init__()
+        self.fills = []
+
+    def log(self, txt, dt=None):
+        pass
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.fills.append((len(self) - 1, order.executed.price, order.executed.size))
+        super().notify_order(order)
+
+def test_vector_backtest_matches_backtrader():
+    """The NumPy FVG engine must reproduce backtrader's fills and final value on the same candles."""
+    # Volatile enough to produce hundreds of trades
+    frame = to_frame(make_synthetic_candles(20_000, seed=2, volatility=0.01))
+
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(RecordingFVGStrategy)
+    cerebro.adddata(bt.feeds.PandasData(dataname=frame, openinterest=None,
+                                        timeframe=bt.TimeFrame.Minutes, compression=15))
+    cerebro.broker.setcash(10000)
+    strategy = cerebro.run()[0]
+    result = backtest_frame(frame)
+
+    fills = []
+    for trade in result.trades:
+        fills.append((trade.entry_bar, trade.entry_price, trade.size))
+        if trade.exit_bar is not None:
+            fills.append((trade.exit_bar, trade.exit_price, -trade.size))
+    assert len(result.trades) > 100
+    assert len(fills) == len(strategy.fills)
+    # backtrader averages execution prices, which can move the last bit
+    for a, b in zip(fills, strategy.fills):
+        assert a[0] == b[0] and np.isclose(a[1], b[1], rtol=1e-12) and np.isclose(a[2], b[2], rtol=1e-12), (a, b)
+    assert np.isclose(cerebro.broker.getvalue(), result.final_value, rtol=1e-12)
@@ -0,0 +1,108 @@
+import os
+import numpy as np
+
+# ==========================================
+#        MULTI-TIMEFRAME ROLLUPS
+# ==========================================
+# 1h / 4h / 1d candles derived from the stored 15m series instead of fetched:
+# no extra klines calls, no full resample. A bucket is [start, start + timeframe)
+# in UTC (Binance's own kline boundaries):
+#   open = first base open, high / low = extremes, close = last base close,
+#   volume = base volumes added one after another in time order.
+# The same rules run vectorized over the historical dataset (rollup_arrays) and
+# one candle at a time in the live buffer (candle_buffer.TimeframeRollup), so the
+# two give the same bars bit for bit.
+#   btc_futures_15m_3years.csv -> btc_futures_15m_3years.4h.cols (cached by data_miner)
+# The live loop imports this module through candle_buffer: the dataset helpers
+# import market_data (and so pandas) only when they are called.
+
+BASE_TIMEFRAME = '15m'
+ROLLUP_TIMEFRAMES = ('1h', '4h', '1d')
+UNIT_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000}
+
+def timeframe_ms(timeframe):
+    """'15m' -> 900000 (minutes, hours and days: the buckets that align with epoch time)."""
+    return int(timeframe[:-1]) * UNIT_MS[timeframe[-1]]
+
+def bucket_start(ts, tf_ms):
+    """Start (ms) of the bucket a timestamp falls in. Works on ints and int64 arrays."""
+    return ts - ts % tf_ms
+
+def rollup_arrays(ts, open_, high, low, close, volume, tf_ms):
+    """
+    Base candles (sorted by time) -> (bucket_ts, open, high, low, close, volume) arrays,
+    one row per bucket that has at least one base candle. The last bucket may be partial.
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    high, low, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, volume))
+    if len(ts) == 0:
+        return ts, *(np.zeros(0) for _ in range(5))
+    buckets = bucket_start(ts, tf_ms)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    sizes = np.diff(np.r_[starts, len(ts)])
+
+    # Volume: added candle by candle in time order like the live rollup (np.add.reduceat sums pairwise)
+    total = volume[starts].copy()
+    for k in range(1, sizes.max()):
+        rows = np.flatnonzero(sizes > k)
+        total[rows] += volume[starts[rows] + k]
+    return (buckets[starts], np.asarray(open_, dtype=np.float64)[starts], np.maximum.reduceat(high, starts),
+            np.minimum.reduceat(low, starts), np.asarray(close, dtype=np.float64)[starts + sizes - 1], total)
+
+def arrays_to_frame(ts, *ohlcv):
+    from market_data import PRICE_COLUMNS, columns_to_frame
+    return columns_to_frame(dict(zip(['timestamp'] + PRICE_COLUMNS, (ts, *ohlcv))))
+
+def rollup_frame(df, timeframe):
+    """Datetime-indexed OHLCV frame -> the same layout at `timeframe`."""
+    from market_data import PRICE_COLUMNS, index_to_ms
+    arrays = rollup_arrays(index_to_ms(df.index), *(df[col].to_numpy() for col in PRICE_COLUMNS),
+                           timeframe_ms(timeframe))
+    return arrays_to_frame(*arrays)
+
+# --- Dataset cache ---
+def rollup_path(csv_path, timeframe):
+    """'btc_futures_15m_3years.csv', '4h' -> 'btc_futures_15m_3years.4h.cols'"""
+    return os.path.splitext(csv_path)[0] + f'.{timeframe}.cols'
+
+def update_rollups(df, csv_path, since=None, timeframes=ROLLUP_TIMEFRAMES):
+    """
+    Brings the cached rollups of `df` (the dataset just saved to csv_path) up to date.
+    Base candles before `since` (ms) are unchanged: cached buckets that end before it
+    are kept and only the bucket holding `since` onwards is rolled up again.
+    since=None rebuilds everything.
+    """
+    from market_data import PRICE_COLUMNS, index_to_ms, load_columns, save_columnar
+    ts = index_to_ms(df.index)
+    columns = [df[col].to_numpy() for col in PRICE_COLUMNS]
+    for timeframe in timeframes:
+        tf_ms = timeframe_ms(timeframe)
+        path = rollup_path(csv_path, timeframe)
+        kept = None
+        if since is not None and os.path.isdir(path):
+            cached = load_columns(path)
+            cut = bucket_start(int(since), tf_ms)
+            n_kept = int(np.searchsorted(cached['timestamp'], cut))
+            # Copies: the mapped files are about to be replaced (and Windows won't while they're open)
+            kept = [np.array(cached[col][:n_kept]) for col in ['timestamp'] + PRICE_COLUMNS]
+            del cached
+            start = int(np.searchsorted(ts, cut))
+        else:
+            start = 0
+        fresh = rollup_arrays(ts[start:], *(col[start:] for col in columns), tf_ms)
+        if kept is not None:
+            fresh = [np.concatenate([old, new]) for old, new in zip(kept, fresh)]
+        save_columnar(arrays_to_frame(*fresh), path)
+
+def load_rollup(csv_path, timeframe):
+    """
+    The dataset at `timeframe`: the cached rollup when it is at least as new as the
+    base data, otherwise rolled up in memory from the base candles.
+    """
+    from market_data import columnar_path, columns_to_frame, load_candles, load_columns
+    path = rollup_path(csv_path, timeframe)
+    base_mtime = max((os.path.getmtime(p) for p in (csv_path, columnar_path(csv_path)) if os.path.exists(p)), default=0)
+    if os.path.isdir(path) and os.path.getmtime(path) >= base_mtime:
+        return columns_to_frame(load_columns(path))
+    df = load_candles(csv_path)
+    return None if df is None else rollup_frame(df, timeframe)
@@ -1,14 +1,71 @@
 import gymnasium as gym
 from gymnasium import spaces
-import pandas as pd
 import numpy as np
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv
 import os
+import time
+import argparse
+from market_data import load_candles, data_exists
+from indicators import sma_before, SMA_PERIOD
+from risk_policy import export_policy, RISK_POLICY_PATH
 
 # --- CONFIGURATION ---
 DATA_FILE = 'btc_futures_15m_3years.csv' # MUST match the file from data_miner.py
 MODEL_NAME = "risk_agent_v1"
+RISK_MULTIPLIERS = np.array([0.0, 0.5, 1.0, 2.0]) # Action -> bet multiplier (0=SKIP)
+WARMUP_STEPS = 100      # First bar an episode may start on (SMA needs history)
+EPISODE_LENGTH = 2000   # Bars per episode in randomized-window mode (~3 weeks of 15m)
+TOTAL_TIMESTEPS = 50000
+
+def build_feature_matrix(df):
+    """
+    Precomputes the agent's observation for every bar in one vectorized pass.
+    Returns (features, pct_change): a float32 [N, 4] matrix of
+    [Norm_Price, Norm_Vol, Norm_Momentum, Norm_Volatility] and the float64
+    bar-to-bar % change used by the reward.
+    """
+    close = np.asarray(df['close'], dtype=np.float64)
+    high = np.asarray(df['high'], dtype=np.float64)
+    low = np.asarray(df['low'], dtype=np.float64)
+    volume = np.asarray(df['volume'], dtype=np.float64)
+    n = len(close)
+
+    # 1. Price: Close vs SMA of the 20 bars BEFORE the current one (same window the env always used,
+    #    computed exactly like the live StreamingFeatures so both give the same observation)
+    sma_20 = sma_before(close, SMA_PERIOD)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        norm_price = np.where(sma_20 > 0, close / sma_20, 1.0)
+
+    # 2. Volume: Log Volume
+    norm_vol = np.log(volume + 1) / 10.0
+
+    # 3. Momentum: % change vs previous close (first bar has no previous close)
+    prev_close = np.empty(n)
+    prev_close[0] = close[0]
+    prev_close[1:] = close[:-1]
+    pct_change = (close - prev_close) / prev_close
+    norm_mom = (close - prev_close) / prev_close * 100
+
+    # 4. Volatility: High - Low as % of price
+    norm_volat = (high - low) / close * 100
+
+    features = np.column_stack([norm_price, norm_vol, norm_mom, norm_volat]).astype(np.float32)
+    return features, pct_change
+
+def compute_rewards(actions, pct_change):
+    """
+    Vectorized TradingEnv.step reward: profit, 2x loss penalty, +5 for skipping a >0.5% drop.
+    Returns (rewards, profit) where profit is the balance change (0 when skipping).
+    """
+    trading = actions > 0
+    profit = np.where(trading, RISK_MULTIPLIERS[actions] * 1000 * pct_change, 0.0)
+    rewards = np.where(
+        trading,
+        np.where(profit > 0, profit, profit * 2.0),
+        np.where(pct_change < -0.005, 5.0, 0.0),
+    )
+    return rewards, profit
 
 class TradingEnv(gym.Env):
     """
@@ -17,10 +74,19 @@ class TradingEnv(gym.Env):
     """
     metadata = {'render.modes': ['human']}
 
-    def __init__(self, df):
+    def __init__(self, df, episode_length=None):
         super(TradingEnv, self).__init__()
         self.df = df
         self.MAX_STEPS = len(df) - 1
+
+        # episode_length=None -> classic mode: every episode runs bar 100 -> end of file.
+        # Otherwise each reset picks a random start and runs a fixed number of bars.
+        if episode_length is not None and episode_length >= self.MAX_STEPS - WARMUP_STEPS:
+            episode_length = None
+        self.episode_length = episode_length
+
+        # --- SPEED FIX: Build every observation once, step() is just an array index ---
+        self.features, self.pct_change = build_feature_matrix(df)
         
         # ACTIONS: 0=SKIP, 1=0.5% Risk, 2=1.0% Risk, 3=2.0% Risk
         self.action_space = spaces.Discrete(4)
@@ -35,56 +101,30 @@ class TradingEnv(gym.Env):
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        self.current_step = 100 
+        if self.episode_length is None:
+            self.current_step = WARMUP_STEPS
+            self.end_step = self.MAX_STEPS
+        else:
+            last_start = self.MAX_STEPS - self.episode_length
+            self.current_step = int(self.np_random.integers(WARMUP_STEPS, last_start + 1))
+            self.end_step = self.current_step + self.episode_length
         self.balance = 10000.0
         self.positions = []
         return self._next_observation(), {}
 
     def _next_observation(self):
-        # --- CRITICAL FIX: NORMALIZATION ---
-        # Instead of raw $95,000, we use % change or scaled values relative to recent history.
-        
-        current_close = self.df.iloc[self.current_step]['close']
-        prev_close = self.df.iloc[self.current_step-1]['close']
-        
-        # 1. Price: Use Relative Strength (Close vs Simple Moving Average of 20)
-        # If result is 1.01, price is 1% above average. If 0.99, it's 1% below. Perfect for AI.
-        # We calculate SMA on the fly for the specific window
-        window = self.df.iloc[self.current_step-20:self.current_step]['close']
-        sma_20 = window.mean()
-        
-        norm_price = current_close / sma_20 if sma_20 > 0 else 1.0
-
-        # 2. Volume: Log Volume to smash huge spikes down to readable numbers
-        norm_vol = np.log(self.df.iloc[self.current_step]['volume'] + 1) / 10.0
-        
-        # 3. Momentum: Raw $ change is bad. Use % change.
-        norm_mom = (current_close - prev_close) / prev_close * 100 
-
-        # 4. Volatility: High - Low as % of price
-        high = self.df.iloc[self.current_step]['high']
-        low = self.df.iloc[self.current_step]['low']
-        norm_volat = (high - low) / current_close * 100
-
-        obs = np.array([
-            norm_price,
-            norm_vol,
-            norm_mom,
-            norm_volat
-        ], dtype=np.float32)
-        
-        return obs
+        # Normalized features are precomputed in build_feature_matrix()
+        # (SMA-20 relative price, log volume, % momentum, range volatility).
+        return self.features[self.current_step].copy()
 
     def step(self, action):
         self.current_step += 1
-        current_price = self.df.iloc[self.current_step]['close']
-        prev_price = self.df.iloc[self.current_step-1]['close']
         
         reward = 0
         risk_multipliers = {0: 0.0, 1: 0.5, 2: 1.0, 3: 2.0} 
         
-        # Calculate market movement %
-        pct_change = (current_price - prev_price) / prev_price
+        # Market movement % (precomputed)
+        pct_change = self.pct_change[self.current_step]
         
         if action > 0:
             bet_size = risk_multipliers[action] * 1000 # Base bet $1000
@@ -106,35 +146,221 @@ class TradingEnv(gym.Env):
                 reward = 5.0 
 
         done = self.current_step >= self.MAX_STEPS
-        truncated = False
+        # Hitting the end of a random window is a time limit, not a terminal state
+        truncated = (not done) and self.current_step >= self.end_step
         info = {'balance': self.balance}
         
         return self._next_observation(), reward, done, truncated, info
 
-def train_brain():
-    # 1. Load Data
-    if not os.path.exists(DATA_FILE):
+class LaneVecEnv(VecEnv):
+    """
+    K independent TradingEnv trajectories ("lanes") stepped together with NumPy.
+    All lanes share one feature matrix; each lane only keeps a cursor and a balance,
+    so a step of K lanes is a handful of array ops instead of K Python env.step() calls.
+    Rewards, balances and done flags match TradingEnv.step for the same actions.
+    """
+
+    # Per-lane state; every other attribute is shared by all lanes
+    LANE_ATTRS = ('current_step', 'end_step', 'balance', 'actions')
+
+    def __init__(self, df, n_lanes, episode_length=None, seed=0):
+        self.features, self.pct_change = build_feature_matrix(df)
+        self.MAX_STEPS = len(df) - 1
+        if episode_length is not None and episode_length >= self.MAX_STEPS - WARMUP_STEPS:
+            episode_length = None
+        self.episode_length = episode_length
+        self.rng = np.random.default_rng(seed)
+
+        observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(4,), dtype=np.float32)
+        super().__init__(n_lanes, observation_space, spaces.Discrete(4))
+
+        self.current_step = np.zeros(n_lanes, dtype=np.int64)
+        self.end_step = np.zeros(n_lanes, dtype=np.int64)
+        self.balance = np.zeros(n_lanes)
+        self.actions = np.zeros(n_lanes, dtype=np.int64)
+        self._reset_lanes(np.arange(n_lanes))
+
+    def _reset_lanes(self, lanes):
+        if self.episode_length is None:
+            self.current_step[lanes] = WARMUP_STEPS
+            self.end_step[lanes] = self.MAX_STEPS
+        else:
+            last_start = self.MAX_STEPS - self.episode_length
+            self.current_step[lanes] = self.rng.integers(WARMUP_STEPS, last_start + 1, size=len(lanes))
+            self.end_step[lanes] = self.current_step[lanes] + self.episode_length
+        self.balance[lanes] = 10000.0
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self.rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_lanes(np.arange(self.num_envs))
+        return self.features[self.current_step]
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        self.current_step += 1
+        pct_change = self.pct_change[self.current_step]
+
+        rewards, profit = compute_rewards(self.actions, pct_change)
+        self.balance += profit
+
+        terminated = self.current_step >= self.MAX_STEPS
+        truncated = ~terminated & (self.current_step >= self.end_step)
+        dones = terminated | truncated
+
+        obs = self.features[self.current_step]
+        infos = [{'balance': balance} for balance in self.balance.tolist()]
+
+        # Auto-reset finished lanes, like DummyVecEnv does
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            for lane in finished:
+                infos[lane]['terminal_observation'] = obs[lane].copy()
+                infos[lane]['TimeLimit.truncated'] = bool(truncated[lane])
+            self._reset_lanes(finished)
+            obs[finished] = self.features[self.current_step[finished]]
+
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        lanes = self._lane_indices(indices)
+        if attr_name in self.LANE_ATTRS:
+            return getattr(self, attr_name)[lanes].tolist()
+        return [getattr(self, attr_name)] * len(lanes)
+
+    def set_attr(self, attr_name, value, indices=None):
+        lanes = self._lane_indices(indices)
+        if attr_name in self.LANE_ATTRS:
+            getattr(self, attr_name)[lanes] = value
+        elif sorted(lanes) == list(range(self.num_envs)):
+            setattr(self, attr_name, value)
+        else:
+            raise NotImplementedError(f"LaneVecEnv: '{attr_name}' is shared by all lanes, it can't be set per lane")
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        raise NotImplementedError(f"LaneVecEnv has no per-lane env objects to call '{method_name}' on")
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._lane_indices(indices))
+
+    def _lane_indices(self, indices):
+        if indices is None:
+            return list(range(self.num_envs))
+        if isinstance(indices, int):
+            return [indices]
+        return list(indices)
+
+def make_env(data, rank, episode_length=None, seed=0):
+    """
+    Env factory for (Subproc|Dummy)VecEnv. Each worker gets its own seed.
+    `data` is a DataFrame, or a dataset path: then every worker maps the columnar
+    store itself, so all workers share the same pages instead of a pickled copy each.
+    """
+    def _init():
+        df = load_candles(data) if isinstance(data, str) else data
+        env = TradingEnv(df, episode_length=episode_length)
+        env.reset(seed=seed + rank)
+        return env
+    return _init
+
+def make_vec_env(df, n_envs=1, episode_length=None, seed=0, lanes=0, data_path=None):
+    """
+    lanes > 0 -> one LaneVecEnv stepping that many trajectories with NumPy.
+    Otherwise one env runs in-process; more than one runs each env in its own worker process
+    (workers load `data_path` themselves when given, instead of receiving a pickled `df`).
+    """
+    if lanes > 0:
+        return LaneVecEnv(df, lanes, episode_length, seed)
+    if n_envs == 1:
+        return DummyVecEnv([make_env(df, 0, episode_length, seed)])
+    env_fns = [make_env(data_path or df, rank, episode_length, seed) for rank in range(n_envs)]
+    return SubprocVecEnv(env_fns)
+
+def load_data():
+    if not data_exists(DATA_FILE):
         print(f"❌ Error: {DATA_FILE} not found. Please run data_miner.py first!")
-        return
+        return None
 
     print("Loading data...")
-    df = pd.read_csv(DATA_FILE)
+    df = load_candles(DATA_FILE)
     print(f"✅ Loaded {len(df)} rows of data.")
+    return df
 
-    # 2. Create Environment
-    env = DummyVecEnv([lambda: TradingEnv(df)])
+def train_brain(n_envs=1, episode_length=None, total_timesteps=TOTAL_TIMESTEPS, lanes=0):
+    # 1. Load Data
+    df = load_data()
+    if df is None:
+        return
+
+    # 2. Create Environment(s)
+    env = make_vec_env(df, n_envs, episode_length, lanes=lanes, data_path=DATA_FILE)
+    mode = "full history" if episode_length is None else f"random {episode_length}-bar windows"
+    if lanes > 0:
+        print(f"Environments: {lanes} NumPy lanes ({mode})")
+    else:
+        print(f"Environments: {n_envs} ({mode})")
 
     # 3. Initialize The Agent
     # 'MlpPolicy' is standard for simple data arrays. 
     model = PPO("MlpPolicy", env, verbose=1, learning_rate=0.0003)
 
-    print("--- 🧠 TRAINING BRAIN (Steps: 50,000) ---")
-    model.learn(total_timesteps=50000) 
+    print(f"--- 🧠 TRAINING BRAIN (Steps: {total_timesteps:,}) ---")
+    model.learn(total_timesteps=total_timesteps) 
     print("--- TRAINING FINISHED ---")
+    env.close()
 
-    # 4. Save the Brain
+    # 4. Save the Brain (and the torch-free export the live loop loads)
     model.save(MODEL_NAME)
     print(f"✅ Model saved as {MODEL_NAME}.zip")
+    export_policy(f"{MODEL_NAME}.zip", RISK_POLICY_PATH)
+    print(f"✅ Policy exported to {RISK_POLICY_PATH}")
+
+def report_worker_scaling(worker_counts=(1, 2, 4, 8), episode_length=EPISODE_LENGTH, total_timesteps=20000):
+    """Times a short PPO run per worker count so we can size training boxes."""
+    df = load_data()
+    if df is None:
+        return
+
+    print("--- ⏱️ WORKER SCALING ---")
+    print(f"{'workers':>8} | {'steps/sec':>10} | {'speedup':>7}")
+    baseline = None
+    for n_envs in worker_counts:
+        env = make_vec_env(df, n_envs, episode_length, data_path=DATA_FILE)
+        model = PPO("MlpPolicy", env, verbose=0, learning_rate=0.0003)
+        start = time.perf_counter()
+        model.learn(total_timesteps=total_timesteps)
+        # PPO only stops after whole rollouts (n_envs * n_steps), so it runs past total_timesteps
+        steps_per_sec = model.num_timesteps / (time.perf_counter() - start)
+        env.close()
+
+        baseline = baseline or steps_per_sec
+        print(f"{n_envs:>8} | {steps_per_sec:>10,.0f} | {steps_per_sec / baseline:>6.2f}x")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the PPO Risk Agent.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f"Parallel env worker processes (default 1; this machine has {os.cpu_count()} cores)")
+    parser.add_argument('--episode-length', type=int, default=0,
+                        help=f"Bars per episode, each starting at a random offset, e.g. {EPISODE_LENGTH} "
+                             f"(default 0 = one episode over the full history from bar {WARMUP_STEPS})")
+    parser.add_argument('--timesteps', type=int, default=TOTAL_TIMESTEPS)
+    parser.add_argument('--lanes', type=int, default=0,
+                        help="Step this many trajectories in one batched NumPy env (overrides --workers)")
+    parser.add_argument('--scaling', action='store_true',
+                        help=f"Report training throughput for 1/2/4/8 workers instead of training "
+                             f"(on {EPISODE_LENGTH}-bar windows unless --episode-length is given)")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    train_brain()
\ No newline at end of file
+    args = parse_args()
+    episode_length = args.episode_length or None
+    if args.scaling:
+        report_worker_scaling(episode_length=episode_length or EPISODE_LENGTH)
+    else:
+        train_brain(args.workers, episode_length, args.timesteps, args.lanes)
\ No newline at end of file
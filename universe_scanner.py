@@ -0,0 +1,127 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from candle_buffer import CandleBuffer, OPEN, HIGH, LOW, CLOSE
+from request_layer import klines_weight
+
+# ==========================================
+#        UNIVERSE SCANNER
+# ==========================================
+# Watches many USDT-M perpetuals at once:
+#   1. Every symbol keeps its own CandleBuffer, synced concurrently by a thread
+#      pool (paced by the exchanges' shared PriorityScheduler, or by `limiter`).
+#   2. The last FEATURE_BARS candles of every symbol are stacked into one
+#      (symbols, bars, OHLCV) array.
+#   3. The Sniper's FVG rule runs over that array in one vectorized pass
+#      (bit-identical to the per-symbol code); only the symbols it flags read
+#      their Risk Brain observation from their buffer's StreamingFeatures.
+
+FEATURE_BARS = 5           # sniper_check's minimum history (its 3 candles + the forming one + 1)
+FETCH_WORKERS = 16
+FVG_MIN_GAP = 0.0005       # Same 0.05% noise filter as sniper_check
+
+DEFAULT_UNIVERSE = [
+    'BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BNB/USDT', 'XRP/USDT', 'DOGE/USDT',
+    'ADA/USDT', 'AVAX/USDT', 'LINK/USDT', 'DOT/USDT', 'LTC/USDT', 'BCH/USDT',
+]
+
+def top_usdt_perpetuals(exchange, n):
+    """The n most traded (24h quote volume) active USDT-margined perpetuals, as 'BASE/USDT'."""
+    markets = exchange.load_markets()
+    perpetuals = {
+        m['symbol']: f"{m['base']}/{m['quote']}" for m in markets.values()
+        if m.get('swap') and m.get('linear') and m.get('quote') == 'USDT' and m.get('active', True)
+    }
+    tickers = exchange.fetch_tickers(list(perpetuals))
+    ranked = sorted(perpetuals, key=lambda s: (tickers.get(s) or {}).get('quoteVolume') or 0, reverse=True)
+    return [perpetuals[s] for s in ranked[:n]]
+
+# --- BATCHED SIGNAL + FEATURES ---
+def batch_sniper_check(window, has_forming_bar=True):
+    """
+    sniper_check over a (symbols, bars, OHLCV) window in one pass.
+    Returns (is_buy bool[S], level float[S]); level is 0 where there is no signal.
+    """
+    shift = 1 if has_forming_bar else 0
+    c1, c2, c3 = -3 - shift, -2 - shift, -1 - shift
+
+    is_green_momentum = window[:, c2, CLOSE] > window[:, c2, OPEN]
+    fvg_high = window[:, c1, HIGH]
+    fvg_top = window[:, c3, LOW]
+    gap_size = fvg_top - fvg_high
+    is_buy = is_green_momentum & (fvg_top > fvg_high) & (gap_size > window[:, c3, CLOSE] * FVG_MIN_GAP)
+    return is_buy, np.where(is_buy, fvg_high, 0.0)
+
+class UniverseScanner:
+    """
+    Candle buffers for a list of symbols, refreshed concurrently.
+    `exchange_factory` builds one exchange per worker thread (ccxt instances are
+    not meant to be shared between threads). Pacing is the exchanges' job when they
+    are ScheduledExchanges; otherwise pass a `limiter` with acquire(weight).
+    """
+
+    def __init__(self, exchange_factory, symbols, timeframe, capacity=1000,
+                 workers=FETCH_WORKERS, limiter=None):
+        self.exchange_factory = exchange_factory
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.buffers = {symbol: CandleBuffer(capacity) for symbol in self.symbols}
+        self.limiter = limiter
+        self.pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(self.symbols))))
+        self._local = threading.local()
+        self.errors = {}
+        self.last_cycle_seconds = None
+
+    def _exchange(self):
+        if not hasattr(self._local, 'exchange'):
+            self._local.exchange = self.exchange_factory()
+        return self._local.exchange
+
+    def _sync(self, symbol):
+        candles = self.buffers[symbol]
+        if self.limiter is not None:
+            self.limiter.acquire(klines_weight(candles.capacity))
+        return candles.sync(self._exchange(), symbol, self.timeframe)
+
+    def update(self):
+        """Syncs every buffer at once. Returns the symbols that refreshed; failures land in self.errors."""
+        start = time.perf_counter()
+        futures = {symbol: self.pool.submit(self._sync, symbol) for symbol in self.symbols}
+        updated = []
+        self.errors = {}
+        for symbol, future in futures.items():
+            try:
+                future.result()
+                updated.append(symbol)
+            except Exception as e:
+                self.errors[symbol] = e
+        self.last_cycle_seconds = time.perf_counter() - start
+        return updated
+
+    def stack(self, symbols=None, bars=FEATURE_BARS):
+        """
+        (symbols, window) with window = the last `bars` candles of every symbol as one
+        (S, bars, 5) array. Symbols with less history than that are left out.
+        """
+        symbols = [s for s in (symbols or self.symbols) if len(self.buffers[s]) >= bars]
+        if not symbols:
+            return [], np.empty((0, bars, 5))
+        return symbols, np.stack([self.buffers[s].ohlcv[-bars:] for s in symbols])
+
+    def scan(self, symbols=None, has_forming_bar=True):
+        """
+        FVG signals across the universe in one pass.
+        Returns [(symbol, level, observation)] for every symbol with a BUY.
+        """
+        symbols, window = self.stack(symbols)
+        if not symbols:
+            return []
+        is_buy, levels = batch_sniper_check(window, has_forming_bar)
+        hits = np.flatnonzero(is_buy)
+        if not len(hits):
+            return []
+        return [(symbols[i], float(levels[i]), self.buffers[symbols[i]].features.observation()) for i in hits]
+
+    def close(self):
+        self.pool.shutdown(wait=False)
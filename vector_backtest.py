@@ -0,0 +1,139 @@
+import math
+from collections import namedtuple
+import numpy as np
+
+# ==========================================
+#        VECTORIZED FVG BACKTEST
+# ==========================================
+# Same rules as sniper_backtest.FVGStrategy under backtrader's default broker
+# (no commission, no slippage, market entry on the next bar's open), without
+# the bar-by-bar event loop:
+#   1. All bullish-FVG + SMA-trend entry bars are found with array ops.
+#   2. Signals are walked in order; each taken trade resolves its bracket
+#      exit with a forward scan over the high/low arrays.
+
+MIN_GAP = 0.0005    # Gap must exceed 0.05% of price (FVGStrategy's noise filter)
+
+Trade = namedtuple('Trade', [
+    'signal_bar', 'entry_bar', 'exit_bar', 'entry_price', 'exit_price',
+    'size', 'stop_price', 'target_price', 'pnl', 'exit_reason',
+])
+BacktestResult = namedtuple('BacktestResult', ['trades', 'equity', 'final_value'])
+
+def sma_fsum(close, period):
+    """
+    SMA matching backtrader's SimpleMovingAverage bit for bit.
+    Rolling cumsum first; math.fsum (backtrader's exact sum) only where the
+    fast value is close enough to `close` for the last bits to matter.
+    """
+    n = len(close)
+    sma = np.full(n, np.nan)
+    if n < period:
+        return sma
+    csum = np.cumsum(close)
+    sma[period - 1] = csum[period - 1] / period
+    sma[period:] = (csum[period:] - csum[:-period]) / period
+    # The trend filter is `close > sma`: recompute exactly anywhere that could flip
+    close_call = np.flatnonzero(np.abs(close - sma) <= np.abs(close) * 1e-9)
+    for i in close_call:
+        sma[i] = math.fsum(close[i - period + 1:i + 1]) / period
+    return sma
+
+def find_signals(open_, high, low, close, sma_period=50, min_gap=MIN_GAP):
+    """Bars where FVGStrategy.next() would submit a bracket (ignoring whether it is in a trade)."""
+    n = len(close)
+    signal = np.zeros(n, dtype=bool)
+    start = max(sma_period - 1, 3)     # backtrader starts calling next() once the SMA is ready
+    if n <= start:
+        return np.flatnonzero(signal)
+    i = np.arange(start, n)
+
+    sma = sma_fsum(close, sma_period)
+    cA_high = high[i - 3]
+    cC_low = low[i - 1]
+    is_uptrend = close[i] > sma[i]
+    gap_size = cC_low - cA_high
+    risk = close[i] - low[i - 2]
+    signal[i] = is_uptrend & (cC_low > cA_high) & (gap_size > close[i] * min_gap) & (risk > 0)
+    return np.flatnonzero(signal)
+
+def _first_exit(high, low, start, stop_price, target_price, chunk=256):
+    """First bar >= start where the stop or the target is touched (None if never)."""
+    n = len(high)
+    while start < n:
+        end = min(n, start + chunk)
+        hit = (low[start:end] <= stop_price) | (high[start:end] >= target_price)
+        if hit.any():
+            return start + int(hit.argmax())
+        start = end
+        chunk *= 2
+    return None
+
+def run_vector_backtest(open_, high, low, close, cash=10000.0, risk_reward=2.0,
+                        risk_per_trade=0.02, sma_period=50, min_gap=MIN_GAP):
+    """Runs the FVG strategy over OHLC arrays and returns trades, equity curve and final value."""
+    open_, high, low, close = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    n = len(close)
+    signals = find_signals(open_, high, low, close, sma_period, min_gap)
+
+    trades = []
+    equity = np.full(n, cash)
+    free_from = 0          # First bar a new signal may be acted on
+    open_size = 0.0
+
+    for i in signals.tolist():
+        if i < free_from:
+            continue
+        entry_bar = i + 1
+        if entry_bar >= n:
+            break
+
+        stop_price = low[i - 2]
+        risk = close[i] - stop_price
+        size = (cash * risk_per_trade) / risk
+        target_price = close[i] + (risk * risk_reward)
+
+        # Broker cash checks: at submission (signal close) and at execution (next open).
+        # Either failing rejects the bracket and the strategy can fire again next bar.
+        if cash - abs(size) * close[i] < 0.0 or cash - abs(size) * open_[entry_bar] < 0.0:
+            free_from = entry_bar
+            continue
+
+        entry_price = open_[entry_bar]
+        cash_after_entry = cash - abs(size) * entry_price
+
+        # Stop/target orders only become active the bar after the entry fills
+        exit_bar = _first_exit(high, low, entry_bar + 1, stop_price, target_price)
+        end = n if exit_bar is None else exit_bar
+        equity[entry_bar:end] = cash_after_entry + size * close[entry_bar:end]
+
+        if exit_bar is None:
+            open_size = size
+            trades.append(Trade(i, entry_bar, None, entry_price, None, size,
+                                stop_price, target_price, None, 'OPEN'))
+            cash = cash_after_entry
+            free_from = n
+            break
+
+        bar_open = open_[exit_bar]
+        if bar_open <= stop_price:
+            exit_price, reason = bar_open, 'STOP'        # Gapped through the stop
+        elif low[exit_bar] <= stop_price:
+            exit_price, reason = stop_price, 'STOP'      # Stop is checked before the target
+        elif bar_open >= target_price:
+            exit_price, reason = bar_open, 'TARGET'
+        else:
+            exit_price, reason = target_price, 'TARGET'
+
+        pnl = size * (exit_price - entry_price) * 1.0
+        cash = cash_after_entry + (abs(size) * entry_price + pnl)
+        equity[exit_bar:] = cash
+        trades.append(Trade(i, entry_bar, exit_bar, entry_price, exit_price, size,
+                            stop_price, target_price, pnl, reason))
+        free_from = exit_bar
+
+    final_value = cash + open_size * close[-1] if n else cash
+    return BacktestResult(trades, equity, final_value)
+
+def backtest_frame(df, **params):
+    return run_vector_backtest(df['open'], df['high'], df['low'], df['close'], **params)
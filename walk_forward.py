@@ -0,0 +1,147 @@
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from market_data import load_candles, data_exists
+from train_risk_agent import (
+    DATA_FILE, WARMUP_STEPS, EPISODE_LENGTH, TOTAL_TIMESTEPS,
+    build_feature_matrix, compute_rewards, make_vec_env,
+)
+
+# --- CONFIGURATION ---
+TRAIN_BARS = 4 * 24 * 365        # 1 year of 15m candles per training window
+TEST_BARS = 4 * 24 * 90          # Then 3 months out-of-sample
+BASELINE_ACTION = 2              # Fixed 1.0% risk on every bar
+MODELS_DIR = 'walk_forward_models'
+RESULTS_FILE = 'walk_forward_results.csv'
+
+def plan_folds(n_rows, train_bars=TRAIN_BARS, test_bars=TEST_BARS):
+    """Rolling windows: [train_start, test_start) to train, [test_start, test_end) to score."""
+    folds = []
+    train_start = 0
+    while train_start + train_bars + test_bars <= n_rows:
+        test_start = train_start + train_bars
+        folds.append((train_start, test_start, test_start + test_bars))
+        train_start += test_bars
+    return folds
+
+def score_actions(actions, pct_change, start_balance=10000.0):
+    """Replays TradingEnv's reward/PnL for a whole action sequence at once."""
+    rewards, profit = compute_rewards(actions, pct_change)
+    balance = start_balance + np.cumsum(profit)
+    peak = np.maximum.accumulate(np.concatenate([[start_balance], balance]))[1:]
+    return {
+        'reward': float(rewards.sum()),
+        'pnl': float(balance[-1] - start_balance) if len(balance) else 0.0,
+        'max_drawdown': float(np.max(peak - balance)) if len(balance) else 0.0,
+        'trade_rate': float(np.mean(actions > 0)) if len(actions) else 0.0,
+    }
+
+def evaluate_out_of_sample(model, df, test_start, test_end, baseline_action=BASELINE_ACTION):
+    """
+    Scores a model on [test_start, test_end). Observations do not depend on the agent's
+    actions, so the whole slice is one batched predict instead of an env loop.
+    """
+    # Keep WARMUP_STEPS bars of history in front so the SMA feature is valid at test_start
+    history_start = max(0, test_start - WARMUP_STEPS)
+    features, pct_change = build_feature_matrix(df.iloc[history_start:test_end])
+    first = test_start - history_start
+
+    # Action at bar t is paid by the move from t to t+1 (same as TradingEnv.step)
+    actions, _ = model.predict(features[first:-1], deterministic=True)
+    actions = np.asarray(actions, dtype=np.int64)
+    moves = pct_change[first + 1:]
+
+    agent = score_actions(actions, moves)
+    baseline = score_actions(np.full(len(moves), baseline_action), moves)
+    return agent, baseline
+
+def run_fold(fold_id, train_start, test_start, test_end, timesteps, episode_length, lanes, models_dir):
+    """Worker: train one PPO on the fold's window, save it, score it out-of-sample."""
+    import torch
+    from stable_baselines3 import PPO
+
+    torch.set_num_threads(1)   # One core per fold; the pool provides the parallelism
+    df = load_candles(DATA_FILE)
+    train_df = df.iloc[train_start:test_start]
+
+    start = time.perf_counter()
+    env = make_vec_env(train_df, 1, episode_length, seed=fold_id, lanes=lanes)
+    model = PPO("MlpPolicy", env, verbose=0, learning_rate=0.0003, seed=fold_id)
+    model.learn(total_timesteps=timesteps)
+    env.close()
+    train_seconds = time.perf_counter() - start
+
+    os.makedirs(models_dir, exist_ok=True)
+    model.save(os.path.join(models_dir, f"fold_{fold_id:02d}"))
+
+    agent, baseline = evaluate_out_of_sample(model, df, test_start, test_end)
+    index = df.index
+    row = {
+        'fold': fold_id,
+        'train_from': index[train_start], 'test_from': index[test_start], 'test_to': index[test_end - 1],
+        'train_seconds': train_seconds,
+    }
+    row.update({f'agent_{k}': v for k, v in agent.items()})
+    row.update({f'baseline_{k}': v for k, v in baseline.items()})
+    return row
+
+def walk_forward(train_bars=TRAIN_BARS, test_bars=TEST_BARS, timesteps=TOTAL_TIMESTEPS,
+                 episode_length=EPISODE_LENGTH, lanes=0, workers=None, models_dir=MODELS_DIR):
+    if not data_exists(DATA_FILE):
+        print(f"❌ Error: {DATA_FILE} not found. Please run data_miner.py first!")
+        return None
+
+    n_rows = len(load_candles(DATA_FILE))
+    folds = plan_folds(n_rows, train_bars, test_bars)
+    if not folds:
+        print(f"❌ Not enough data ({n_rows} rows) for one {train_bars}+{test_bars} bar fold.")
+        return None
+
+    print(f"--- 🧠 WALK-FORWARD: {len(folds)} folds, {timesteps:,} steps each ---")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_fold, i, *fold, timesteps, episode_length, lanes, models_dir)
+            for i, fold in enumerate(folds)
+        ]
+        rows = []
+        for future in futures:
+            row = future.result()
+            rows.append(row)
+            print(f"Fold {row['fold']:>2} | test from {row['test_from']} | "
+                  f"agent PnL ${row['agent_pnl']:>9.2f} vs baseline ${row['baseline_pnl']:>9.2f}")
+
+    return pd.DataFrame(rows)
+
+def print_summary(results):
+    beat = (results['agent_pnl'] > results['baseline_pnl']).sum()
+    print("\n--- OUT-OF-SAMPLE SUMMARY ---")
+    print(f"Folds beating baseline: {beat}/{len(results)}")
+    for who in ['agent', 'baseline']:
+        print(f"{who:>8}: total PnL ${results[f'{who}_pnl'].sum():.2f} | "
+              f"mean PnL/fold ${results[f'{who}_pnl'].mean():.2f} | "
+              f"worst drawdown ${results[f'{who}_max_drawdown'].max():.2f} | "
+              f"total reward {results[f'{who}_reward'].sum():.1f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Walk-forward (rolling out-of-sample) evaluation of the Risk Agent.")
+    parser.add_argument('--train-bars', type=int, default=TRAIN_BARS)
+    parser.add_argument('--test-bars', type=int, default=TEST_BARS)
+    parser.add_argument('--timesteps', type=int, default=TOTAL_TIMESTEPS)
+    parser.add_argument('--episode-length', type=int, default=EPISODE_LENGTH,
+                        help="Bars per training episode (0 = full window)")
+    parser.add_argument('--lanes', type=int, default=0, help="Train each fold on a LaneVecEnv with this many lanes")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel folds (default: CPU core count)")
+    parser.add_argument('--out', default=RESULTS_FILE)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = walk_forward(args.train_bars, args.test_bars, args.timesteps,
+                           args.episode_length or None, args.lanes, args.workers)
+    if results is not None:
+        results.to_csv(args.out, index=False)
+        print_summary(results)
+        print(f"✅ Per-fold results saved to: {args.out}")